@@ -0,0 +1,429 @@
+"""Benchmarks of the finite state automata recognizer.
+
+Every benchmark runs a random automaton with a partial transition function and a single final
+state, on a corpus of random strings half of which it accepts, see generate.generate_corpus.
+Recognizers stop reading once the answer is settled, and skip stretches of the input found by
+native regex scans, so throughput is measured both in the characters they actually ran through
+the automaton, chars_per_sec, and in the length of the strings, input_chars_per_sec. The former
+says how fast the automaton runs, and the latter how fast the input is answered, which is what
+counts when a prefilter skips most of it. Both counts are saved with every result.
+
+Usage
+-----
+To run the benchmarks and save the results:
+    > python bench.py --output=<output>
+where
+    <output> is a JSON file to save the results into
+
+The full set of benchmarks, on strings of up to 10^6 characters and automata of up to 10^5
+states, takes about 15 minutes on one CPU, most of it generating the corpora one random walk at a
+time. Its memory is bounded by the corpus, the automaton, and CompiledFSA.search_cache_size, about
+a hundred megabytes in all.
+
+To run a smaller set of benchmarks, e.g., before every commit:
+    > python bench.py --quick --output=<output>
+
+To also measure how parallel recognition scales with the number of worker processes, on a long
+input and an automaton of PARALLEL_NUM_STATES states, add:
+    --parallel
+
+To compare the results against an earlier run, reporting regressions:
+    > python bench.py --output=<output> --compare=<baseline>
+where
+    <baseline> is a JSON file saved by an earlier run
+
+For help with the program:
+    > python bench.py -h
+"""
+
+from __future__ import annotations
+import argparse
+from datetime import datetime, timezone
+import json
+import os
+from pathlib import Path
+import pickle
+import platform
+import random
+import statistics
+import sys
+from tempfile import TemporaryDirectory
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from fsa import FSA, Profile
+from generate import generate_corpus, generate_fsa, make_alphabet, write_fsa
+
+INPUT_LENGTHS = [10, 10**3, 10**5, 10**6]
+NUM_STATES = [2, 10**2, 10**4, 10**5]
+QUICK_INPUT_LENGTHS = [10, 10**3, 10**5]
+QUICK_NUM_STATES = [2, 10**2, 10**4]
+ALPHABET_SIZE = 4
+
+# Half of the transitions are missing and one state is final, which keeps the sets of live runs
+# small enough for random walks to find strings rejected in every mode
+DENSITY = 0.5
+FINAL_RATIO = 0.0
+ACCEPT_RATE = 0.5
+
+# Number of strings of every corpus, fewer for longer strings
+MIN_STRINGS = 2
+MAX_STRINGS = 16
+
+PARALLEL_INPUT_LENGTH = 10**7
+PARALLEL_NUM_STATES = 10**3
+PARALLEL_CHUNK_SIZE = 1 << 20
+
+# Minimum number of measurements of every benchmark, and the number of characters to read in total
+# before stopping to measure a benchmark
+MIN_REPEATS = 3
+MAX_REPEATS = 1000
+CHARACTER_BUDGET = 10**6
+
+RECOGNIZERS = {"D1": "recognize_member", "D2": "recognize_endswith", "D3": "recognize_substring"}
+
+
+def random_string(length: int, alphabet: str, seed: int) -> str:
+    """Create a random string.
+
+    Parameters
+    ----------
+    length : int
+        Length of the string
+    alphabet : str
+        Symbols to draw from
+    seed : int
+        Seed of the random number generator
+
+    Returns
+    -------
+    str
+        The random string
+    """
+
+    rng = random.Random(seed)
+    return "".join(rng.choices(alphabet, k=length))
+
+
+def measure(
+    setup: Callable[[], Callable[[Any], object]],
+    inputs: Sequence[Any],
+    characters: int,
+    input_characters: Optional[int] = None,
+) -> Dict[str, float]:
+    """Measure the latency, throughput, and peak memory of a benchmark.
+
+    The benchmark is set up anew before it is timed and again before its memory is traced, so both
+        start cold. There is no warm-up run, so the cost of expanding the lazy search tables on the
+        first pass over the inputs shows up in the tail of the latencies and in the peak memory.
+
+    Parameters
+    ----------
+    setup : Callable[[], Callable[[Any], object]]
+        Create the benchmark, a function run on every input
+    inputs : Sequence[Any]
+        The inputs
+    characters : int
+        Number of characters read by one pass of the benchmark over every input
+    input_characters : Optional[int]
+        Number of characters of every input together, by default characters
+
+    Returns
+    -------
+    Dict[str, float]
+        Latency percentiles in seconds of the runs on one input, characters read and characters
+            of input per second, and peak memory in bytes allocated by one pass over every input
+    """
+
+    if input_characters is None:
+        input_characters = characters
+    repeats = max(MIN_REPEATS, min(MAX_REPEATS, CHARACTER_BUDGET // max(input_characters, 1)))
+    run = setup()
+    latencies = []
+    for _ in range(repeats):
+        for item in inputs:
+            start = time.perf_counter()
+            run(item)
+            latencies.append(time.perf_counter() - start)
+
+    # Memory is traced in a separate pass, since tracing slows down the benchmark
+    run = setup()
+    tracemalloc.start()
+    for item in inputs:
+        run(item)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    seconds = sum(latencies)
+    return {
+        "repeats": repeats,
+        "latency_p50": statistics.median(latencies),
+        "latency_p90": percentiles[89],
+        "latency_p99": percentiles[98],
+        "latency_max": max(latencies),
+        "chars_per_sec": characters * repeats / seconds if seconds > 0 else float("inf"),
+        "input_chars_per_sec": (
+            input_characters * repeats / seconds if seconds > 0 else float("inf")
+        ),
+        "peak_memory_bytes": peak_memory,
+    }
+
+
+def run_benchmarks(input_lengths: List[int], num_states: List[int]) -> List[Dict[str, object]]:
+    """Run every benchmark.
+
+    Every recognize benchmark starts from a copy of the FSA as it was compiled, before any of its
+        lazy search tables were built, and reads a corpus made for its mode.
+
+    Parameters
+    ----------
+    input_lengths : List[int]
+        Lengths of the input strings
+    num_states : List[int]
+        Numbers of states of the automata
+
+    Returns
+    -------
+    List[Dict[str, object]]
+        One result per benchmark, keyed by benchmark, num_states, and input_length
+    """
+
+    results = []
+    for states in num_states:
+        fsa = generate_fsa(states, ALPHABET_SIZE, DENSITY, FINAL_RATIO, seed=states)
+
+        with TemporaryDirectory() as directory:
+            write_fsa(fsa, Path(directory))
+            num_characters = sum(
+                (Path(directory) / name).stat().st_size
+                for name in (FSA.trans_func_file_name, FSA.states_file_name)
+            )
+            result = measure(
+                lambda: lambda path: FSA.from_file(path).compile(), [directory], num_characters
+            )
+            results.append({"benchmark": "from_file", "num_states": states, **result})
+            print(_format(results[-1]), file=sys.stderr)
+
+        compiled = pickle.dumps(fsa.compile())
+        for length in input_lengths:
+            num_strings = max(MIN_STRINGS, min(MAX_STRINGS, CHARACTER_BUDGET // length))
+            for mode, name in RECOGNIZERS.items():
+                try:
+                    corpus = generate_corpus(fsa, num_strings, length, ACCEPT_RATE, mode, length)
+                except ValueError as error:
+                    # Some automata accept every string or no string of a length in a mode
+                    size = f"{states:>6} states, {length:>8} chars"
+                    print(f"{name:<20} {size:<26} skipped: {error}", file=sys.stderr)
+                    continue
+
+                # The characters actually read are counted once, by a profiled copy of the FSA
+                profile = Profile(pickle.loads(compiled))
+                accepted = sum(profile.recognize(string, mode) for string in corpus)
+                result = measure(
+                    lambda: getattr(pickle.loads(compiled), name),
+                    corpus,
+                    profile.characters[mode],
+                    profile.lengths[mode],
+                )
+                results.append(
+                    {
+                        "benchmark": name,
+                        "num_states": states,
+                        "input_length": length,
+                        "num_strings": len(corpus),
+                        "accept_rate": accepted / len(corpus),
+                        "input_characters": profile.lengths[mode],
+                        "characters": profile.characters[mode],
+                        **result,
+                    }
+                )
+                print(_format(results[-1]), file=sys.stderr)
+
+    return results
+
+
+def run_parallel_benchmarks(input_length: int, num_states: int) -> List[Dict[str, object]]:
+    """Measure how parallel recognition scales with the number of worker processes.
+
+    Member mode runs a random automaton. Endswith and substring modes run the automaton of a long
+        literal over the whole alphabet, which a random input almost never contains, so
+        substring mode reads the whole input rather than stopping at the first match.
+
+    Parameters
+    ----------
+    input_length : int
+        Length of the input string
+    num_states : int
+        Number of states of the random automaton
+
+    Returns
+    -------
+    List[Dict[str, object]]
+        One result per mode and number of workers, from one worker up to the number of CPUs,
+            keyed by benchmark, num_states, input_length, and workers
+    """
+
+    alphabet = "".join(make_alphabet(ALPHABET_SIZE))
+    string = random_string(input_length, alphabet, seed=input_length)
+    literal = FSA.from_regex(alphabet * (16 // len(alphabet)))
+    cpus = os.cpu_count() or 1
+    workers = sorted({1 << power for power in range(cpus.bit_length())} | {cpus})
+
+    results = []
+    for mode, fsa in (
+        ("D1", generate_fsa(num_states, ALPHABET_SIZE, seed=num_states)),
+        ("D2", literal),
+        ("D3", literal),
+    ):
+        compiled = fsa.compiled
+        for count in workers:
+            result = measure(
+                lambda: lambda data: compiled.recognize_parallel(
+                    data, mode, count, PARALLEL_CHUNK_SIZE
+                ),
+                [string],
+                input_length,
+            )
+            results.append(
+                {
+                    "benchmark": f"recognize_parallel_{mode}",
+                    "num_states": compiled.num_states - 1,
+                    "input_length": input_length,
+                    "workers": count,
+                    **result,
+                }
+            )
+            print(_format(results[-1]), file=sys.stderr)
+
+    return results
+
+
+def compare(results: List[Dict[str, object]], baseline: List[Dict[str, object]], threshold: float):
+    """Report the benchmarks whose median latency regressed against a baseline.
+
+    Parameters
+    ----------
+    results : List[Dict[str, object]]
+        Results of this run
+    baseline : List[Dict[str, object]]
+        Results of an earlier run
+    threshold : float
+        Ratio of the median latencies above which a benchmark is reported as a regression
+
+    Returns
+    -------
+    List[str]
+        A description of every regression
+    """
+
+    def key(result):
+        return (
+            result["benchmark"],
+            result["num_states"],
+            result.get("input_length"),
+            result.get("workers"),
+        )
+
+    previous = {key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        if key(result) not in previous:
+            continue
+        ratio = result["latency_p50"] / max(previous[key(result)]["latency_p50"], 1e-12)
+        print(f"{_format(result)}  x{ratio:.2f} of baseline", file=sys.stderr)
+        if ratio > threshold:
+            regressions.append(f"{_format(result)} is x{ratio:.2f} slower than the baseline")
+    return regressions
+
+
+def _format(result: Dict[str, object]) -> str:
+    """Format a result on one line."""
+
+    length = result.get("input_length")
+    size = f"{result['num_states']:>6} states" + (f", {length:>8} chars" if length else "")
+    if "workers" in result:
+        size += f", {result['workers']} workers"
+    read = ""
+    if "characters" in result:
+        read = (
+            f"  read={result['characters']}/{result['input_characters']}"
+            f"  input={result['input_chars_per_sec']:.0f} chars/s"
+        )
+    return (
+        f"{result['benchmark']:<20} {size:<26} "
+        f"{result['chars_per_sec']:>12.0f} chars/s  p50={result['latency_p50']:.2e}s  "
+        f"p99={result['latency_p99']:.2e}s  peak={result['peak_memory_bytes']}B{read}"
+    )
+
+
+def main(
+    output: Path, quick: bool, parallel: bool, baseline: Optional[Path], threshold: float
+) -> int:
+    """Run the benchmarks, save the results, and compare them against a baseline.
+
+    Parameters
+    ----------
+    output : Path
+        JSON file to save the results into
+    quick : bool
+        Whether or not to run the smaller set of benchmarks
+    parallel : bool
+        Whether or not to also measure the scaling of parallel recognition
+    baseline : Optional[Path]
+        JSON file saved by an earlier run to compare against
+    threshold : float
+        Ratio of the median latencies above which a benchmark is reported as a regression
+
+    Returns
+    -------
+    int
+        Exit status, 1 if any benchmark regressed and 0 otherwise
+    """
+
+    results = run_benchmarks(
+        QUICK_INPUT_LENGTHS if quick else INPUT_LENGTHS, QUICK_NUM_STATES if quick else NUM_STATES
+    )
+    if parallel:
+        results += run_parallel_benchmarks(PARALLEL_INPUT_LENGTH, PARALLEL_NUM_STATES)
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    if baseline is None:
+        return 0
+    with open(baseline) as f:
+        regressions = compare(results, json.load(f)["results"], threshold)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", type=Path, required=True, help="Enter a JSON file to save.")
+    parser.add_argument("--quick", action="store_true", default=False, help="Run fewer benchmarks.")
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        default=False,
+        help="Also measure parallel recognition with 1 worker up to the number of CPUs.",
+    )
+    parser.add_argument("--compare", type=Path, help="Enter a JSON file of an earlier run.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="Enter the latency ratio above which a benchmark regressed.",
+    )
+    args = parser.parse_args()
+
+    sys.exit(main(args.output, args.quick, args.parallel, args.compare, args.threshold))
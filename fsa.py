@@ -9,15 +9,68 @@ where
     <string> is a string to run through the FSA
     <task> is a task to run the FSA on. One of {'D1', 'D2', or 'D3'}
 
+To run the contents of a large file through the FSA without loading it into memory:
+    > python fsa.py --path=<path> --input-file=<file> --task=<task>
+
+To run every line of a file, or of stdin for <file> = -, through the FSA, printing one result per
+line:
+    > python fsa.py --path=<path> --strings-from=<file> --task=<task>
+
+To serve recognize requests for every automaton under <registry>, on a Unix socket or on a
+localhost TCP port:
+    > python fsa.py --serve --registry=<registry> [--socket=<socket> | --port=<port>]
+where every request is a line <automaton><TAB><task><TAB><string> naming a directory of <registry>,
+and every answer is a line holding 1, 0, or E followed by an error message
+
+To also write a report of the symbols read, transitions, and time of the FSA to stderr, add:
+    --profile
+
 For help with the program:
     > python fsa.py -h
 """
 
 from __future__ import annotations
 import argparse
+import asyncio
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from itertools import chain, repeat
+import mmap
+import os
 from pathlib import Path
 from pprint import pformat
-from typing import Dict, Set
+import re
+import struct
+import sys
+import time
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    TextIO,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+BytesLike = Union[bytes, bytearray, memoryview, mmap.mmap]
+Symbol = TypeVar("Symbol", str, int)
 
 
 class FSA:
@@ -35,6 +88,8 @@ class FSA:
         Name and suffix of file containing the FSA alphabet
     trans_func_file_name : str
         Name and suffix of file containing the FSA transition function
+    compiled_file_name : str
+        Name and suffix of file containing the compiled FSA, see save_compiled
 
     Attributes
     ----------
@@ -50,17 +105,54 @@ class FSA:
         FSA transition function, where trans_func[<state>][<symbol>] is the state the FSA should
             enter if the FSA is currently in state <state> and the input symbol on the tape is
             <symbol>
+    profile : Optional[Profile]
+        Counters of the work done by recognize_member, recognize_endswith, recognize_substring,
+            recognize_bytes, and recognize_file, or None while profiling is disabled
 
     Methods
     -------
     from_file(path: Path) -> FSA
         Instantiate a FSA from files inside of the directory, path
+    from_regex(pattern: str) -> FSA
+        Instantiate a minimal FSA from a regex
+    load_catalog(root: Path, workers: int, report: Callable) -> Dict[str, Union[FSA, NFA]]
+        Load and compile every automaton directory under a directory using a pool of processes
+    save_compiled(path: Path) -> Path
+        Write the compiled form of the FSA into a directory, to be loaded by from_file
+    compile() -> CompiledFSA
+        Intern the states and symbols of the FSA to small integers and build a dense table
+    minimized() -> FSA
+        Build an equivalent FSA with the fewest states
+    equivalent(other: FSA) -> bool
+        Determine if two FSA recognize the same language
+    included_in(other: FSA) -> bool
+        Determine if every member of the language of this FSA is a member of another's
+    enable_profiling() -> Profile
+        Start counting the work done by the recognize methods
+    disable_profiling() -> Optional[Profile]
+        Stop counting the work done by the recognize methods
     recognize_member(string: str) -> bool
         Determine if a string is a member of the language recognized by the FSA
     recognize_endswith(string: str) -> bool
         Determine if a string ends with a member of the language recognized by the FSA
     recognize_substring(string: str) -> bool
         Determine if a string contains a member of the language recognized by the FSA
+    finditer(string: str, policy: str) -> Iterator[Tuple[int, int]]
+        Find the members of the language inside a string in a single left-to-right pass
+    find_all(string: str, policy: str) -> List[Tuple[int, int]]
+        Find the members of the language inside a string in a single left-to-right pass
+    recognize_many(strings: Sequence[str], mode: str) -> np.ndarray
+        Run a batch of strings through the FSA at once
+    recognize_shared_prefixes(strings: Sequence[str], mode: str) -> List[bool]
+        Run a batch of strings through the FSA, walking every prefix they share only once
+    recognize_bytes(data: BytesLike, mode: str) -> bool
+        Run a bytes-like object through the FSA
+    recognize_file(file: Path, mode: str) -> bool
+        Memory-map a file and run its bytes through the FSA
+    recognize_member_parallel(data: Union[str, BytesLike], workers: int, chunk_size: int) -> bool
+        Determine if a large input is a member of the language using a pool of worker processes
+    recognize_substring_parallel(data: Union[str, BytesLike], workers: int, chunk_size: int) -> bool
+        Determine if a large input contains a member of the language using a pool of workers
 
     Examples
     --------
@@ -97,6 +189,11 @@ class FSA:
     start_state_file_name = "startState.txt"
     alphabet_file_name = "alphabet.txt"
     trans_func_file_name = "transitionTable.txt"
+    compiled_file_name = "compiled.fsa"
+
+    _compiled_header = "<4sIIIIIII"
+    _compiled_magic = b"FSA\0"
+    _compiled_version = 2
 
     def __init__(
         self,
@@ -129,6 +226,9 @@ class FSA:
         self.start_state = start_state
         self.alphabet = alphabet
         self.trans_func = trans_func
+        self.profile: Optional[Profile] = None
+
+        self._compiled: Optional[CompiledFSA] = None
 
     def __repr__(self) -> str:
         return (
@@ -150,6 +250,277 @@ class FSA:
             f"Transition Function:\n--------------------\n{pformat(self.trans_func)}\n\n"
         )
 
+    def compile(self) -> CompiledFSA:
+        """Intern the states and symbols of the FSA to small integers and build a dense table.
+
+        The compiled FSA is cached and used by every recognize method. Compile the FSA again after
+            modifying any of its attributes.
+
+        Returns
+        -------
+        CompiledFSA
+            Compiled form of the FSA
+        """
+
+        self._compiled = CompiledFSA.from_fsa(self)
+        return self._compiled
+
+    @property
+    def compiled(self) -> CompiledFSA:
+        """Compiled form of the FSA, compiling it on first use."""
+
+        if self._compiled is None:
+            return self.compile()
+        return self._compiled
+
+    def enable_profiling(self) -> Profile:
+        """Start counting the work done by recognize_member, recognize_endswith,
+            recognize_substring, recognize_bytes, and recognize_file.
+
+        Profiling is opt-in: while it is disabled, the only cost to the recognize methods is
+            checking the profile attribute once per call. Enable profiling again after compiling
+            the FSA again.
+
+        Returns
+        -------
+        Profile
+            The counters, also stored in the profile attribute
+        """
+
+        self.profile = Profile(self.compiled)
+        return self.profile
+
+    def disable_profiling(self) -> Optional[Profile]:
+        """Stop counting the work done by the recognize methods.
+
+        Returns
+        -------
+        Optional[Profile]
+            The counters collected so far, or None if profiling was not enabled
+        """
+
+        profile, self.profile = self.profile, None
+        return profile
+
+    def minimized(self) -> FSA:
+        """Build an equivalent FSA with the fewest states.
+
+        Unreachable states are dropped, and the remaining states are merged with Hopcroft's
+            partition refinement in O(n * k * log n) time, for n states and k symbols. The result
+            uses a partial transition function, so states from which no final state can be reached
+            (such as the sink state of a complete transition function) are dropped as well. Every
+            state of the result is named after the smallest of the states it merges.
+
+        Returns
+        -------
+        FSA
+            Minimal FSA recognizing the same language
+        """
+
+        compiled = self.compiled
+        table, num_columns, dead = compiled.table, compiled.num_columns, compiled.dead
+        # Symbols outside of the alphabet lead every state to the dead state, so they never split
+        symbol_columns = range(compiled.other)
+
+        # Reachable states, including the dead state so that the transition function is complete
+        reachable = [compiled.start]
+        seen = {compiled.start, dead}
+        for state in reachable:
+            for column in symbol_columns:
+                next_state = table[state * num_columns + column]
+                if next_state not in seen:
+                    seen.add(next_state)
+                    reachable.append(next_state)
+        reachable.append(dead)
+
+        # Inverse transition function, where inverse[<column>][<state>] lists the states that enter
+        # <state> on the symbol of column <column>
+        inverse = [{} for _ in symbol_columns]
+        for state in reachable:
+            for column in symbol_columns:
+                next_state = table[state * num_columns + column]
+                inverse[column].setdefault(next_state, []).append(state)
+
+        # Hopcroft's partition refinement, starting from the final and non-final states
+        final_block = {state for state in reachable if compiled.final[state]}
+        blocks = [block for block in (final_block, set(reachable) - final_block) if block]
+        block_of = {state: index for index, block in enumerate(blocks) for state in block}
+        pending = {min(range(len(blocks)), key=lambda index: len(blocks[index]))}
+        while pending:
+            splitter = list(blocks[pending.pop()])
+            for column in symbol_columns:
+                touched: Dict[int, Set[int]] = {}
+                for next_state in splitter:
+                    for state in inverse[column].get(next_state, ()):
+                        touched.setdefault(block_of[state], set()).add(state)
+                for index, states in touched.items():
+                    if len(states) == len(blocks[index]):
+                        continue
+                    blocks[index] -= states
+                    blocks.append(states)
+                    for state in states:
+                        block_of[state] = len(blocks) - 1
+                    if index in pending:
+                        pending.add(len(blocks) - 1)
+                    elif len(states) <= len(blocks[index]):
+                        pending.add(len(blocks) - 1)
+                    else:
+                        pending.add(index)
+
+        # Name every block after its smallest state, and drop the block of the dead state
+        names = {}
+        for index, block in enumerate(blocks):
+            if dead not in block:
+                names[index] = min(compiled.state_names[state] for state in block)
+        start_block = block_of[compiled.start]
+        if start_block not in names:
+            # The language is empty
+            names[start_block] = compiled.state_names[compiled.start]
+
+        final_states = set()
+        trans_func: Dict[str, Dict[str, str]] = {}
+        for index, name in names.items():
+            state = next(iter(blocks[index]))
+            if compiled.final[state]:
+                final_states.add(name)
+            for column in symbol_columns:
+                next_block = block_of[table[state * num_columns + column]]
+                if next_block in names and next_block != block_of[dead]:
+                    for symbol in compiled.column_symbols[column]:
+                        trans_func.setdefault(name, {})[symbol] = names[next_block]
+
+        return FSA(
+            states=set(names.values()),
+            final_states=final_states,
+            start_state=names[start_block],
+            alphabet=set(self.alphabet),
+            trans_func=trans_func,
+        )
+
+    def equivalent(self, other: FSA) -> bool:
+        """Determine if two FSA recognize the same language.
+
+        Runs Hopcroft and Karp's algorithm on the pairs of states of the two FSA, merging the
+            states of a pair with union-find and only following pairs that were not already
+            merged, in near-linear time. Symbols in one alphabet but not the other lead that FSA to
+            its dead state.
+
+        Parameters
+        ----------
+        other : FSA
+            The FSA to compare with
+
+        Returns
+        -------
+        bool
+            Whether or not both FSA recognize the same language
+        """
+
+        compiled, other_compiled = self.compiled, other.compiled
+        table, other_table = compiled.table, other_compiled.table
+        final, other_final = compiled.final, other_compiled.final
+        num_columns, other_num_columns = compiled.num_columns, other_compiled.num_columns
+        columns = self._union_columns(other)
+
+        # States of the other FSA follow the states of this FSA in the union-find forest
+        offset = compiled.num_states
+        parent = list(range(offset + other_compiled.num_states))
+
+        def find(state: int) -> int:
+            while parent[state] != state:
+                parent[state] = parent[parent[state]]
+                state = parent[state]
+            return state
+
+        if final[compiled.start] != other_final[other_compiled.start]:
+            return False
+        parent[offset + other_compiled.start] = compiled.start
+        pairs = [(compiled.start, other_compiled.start)]
+        while pairs:
+            state, other_state = pairs.pop()
+            for column, other_column in columns:
+                next_state = table[state * num_columns + column]
+                next_other_state = other_table[other_state * other_num_columns + other_column]
+                root, other_root = find(next_state), find(offset + next_other_state)
+                if root == other_root:
+                    continue
+                if final[next_state] != other_final[next_other_state]:
+                    return False
+                parent[other_root] = root
+                pairs.append((next_state, next_other_state))
+
+        return True
+
+    def included_in(self, other: FSA) -> bool:
+        """Determine if every member of the language of this FSA is a member of another's.
+
+        Searches the pairs of states of the two FSA reachable on the same string for a final state
+            of this FSA paired with a non-final state of the other, skipping the pairs from which
+            this FSA can never accept.
+
+        Parameters
+        ----------
+        other : FSA
+            The FSA whose language may include the language of this FSA
+
+        Returns
+        -------
+        bool
+            Whether or not the language of this FSA is a subset of the language of other
+        """
+
+        compiled, other_compiled = self.compiled, other.compiled
+        table, other_table = compiled.table, other_compiled.table
+        final, other_final = compiled.final, other_compiled.final
+        num_columns, other_num_columns = compiled.num_columns, other_compiled.num_columns
+        coaccessible = compiled.coaccessible
+        columns = self._union_columns(other)
+
+        pairs = [(compiled.start, other_compiled.start)]
+        seen = set(pairs)
+        while pairs:
+            state, other_state = pairs.pop()
+            if final[state] and not other_final[other_state]:
+                return False
+            for column, other_column in columns:
+                next_state = table[state * num_columns + column]
+                if not coaccessible[next_state]:
+                    continue
+                pair = (next_state, other_table[other_state * other_num_columns + other_column])
+                if pair not in seen:
+                    seen.add(pair)
+                    pairs.append(pair)
+
+        return True
+
+    def _union_columns(self, other: FSA) -> List[Tuple[int, int]]:
+        """Pair up the columns of two compiled FSA over the union of their alphabets.
+
+        Symbols outside of both alphabets are left out, since they lead both FSA to their dead
+            states, and so are symbols whose pair of columns is already listed.
+
+        Parameters
+        ----------
+        other : FSA
+            The other FSA
+
+        Returns
+        -------
+        List[Tuple[int, int]]
+            Column of this FSA and of the other FSA for every symbol of either alphabet
+        """
+
+        compiled, other_compiled = self.compiled, other.compiled
+        return sorted(
+            {
+                (
+                    compiled.symbol_index.get(symbol, compiled.other),
+                    other_compiled.symbol_index.get(symbol, other_compiled.other),
+                )
+                for symbol in set(compiled.symbols) | set(other_compiled.symbols)
+            }
+        )
+
     def recognize_member(self, string: str) -> bool:
         """Determine if a string is a member of the language recognized by the FSA.
 
@@ -164,18 +535,9 @@ class FSA:
             Whether or not the FSA recognizes the string in member mode
         """
 
-        current_state = self.start_state
-        for index in range(len(string) + 1):
-            if index == len(string):
-                if current_state in self.final_states:
-                    return True
-                return False
-
-            # Handle FSA rejection for partial transition function
-            if string[index] not in self.trans_func[current_state]:
-                return False
-
-            current_state = self.trans_func[current_state][string[index]]
+        if self.profile is not None:
+            return self.profile.recognize(string, "D1")
+        return self.compiled.recognize_member(string)
 
     def recognize_endswith(self, string: str) -> bool:
         """Determine if a string ends with a member of the language recognized by the FSA.
@@ -191,28 +553,9 @@ class FSA:
             Whether or not the FSA recognizes the string in endswith mode
         """
 
-        # If the empty string is in the language, the string ends with empty string, so return True
-        if self.recognize_member(""):
-            return True
-
-        current_state = self.start_state
-        for index in range(len(string) + 1):
-            # If at the end of string...
-            if index == len(string):
-                # ... and FSA says to accept...
-                if current_state in self.final_states:
-                    return True
-                # ... if FSA not ready to accept and we cannot perform slicing...
-                if string == "":
-                    return False
-                # ... otherwise trim first character of string and test again
-                return self.recognize_endswith(string[1:])
-
-            # If the FSA rejects, trim first character of string and test again
-            if string[index] not in self.trans_func[current_state]:
-                return self.recognize_endswith(string[1:])
-
-            current_state = self.trans_func[current_state][string[index]]
+        if self.profile is not None:
+            return self.profile.recognize(string, "D2")
+        return self.compiled.recognize_endswith(string)
 
     def recognize_substring(self, string: str) -> bool:
         """Determine if a string contains a member of the language recognized by the FSA.
@@ -228,32 +571,181 @@ class FSA:
             Whether or not the FSA recognizes the string in substring mode
         """
 
-        # If the empty string is in the language, the empty string is a substring, so return True
-        if self.recognize_member(""):
-            return True
+        if self.profile is not None:
+            return self.profile.recognize(string, "D3")
+        return self.compiled.recognize_substring(string)
 
-        current_state = self.start_state
-        accept_status = current_state in self.final_states
-        for index in range(len(string) + 1):
-            # In substring mode, we return True if reaching an accept state at any point
-            accept_status = current_state in self.final_states
-            if accept_status:
-                return True
-            # If the string is empty, we cannot perform trimming, so just return current status
-            if string == "":
-                return accept_status
-            # If at the end of string or FSA rejects, trim first character of string and test again
-            if index == len(string) or string[index] not in self.trans_func[current_state]:
-                return self.recognize_substring(string[1:])
+    def finditer(self, string: str, policy: str = "leftmost-longest") -> Iterator[Tuple[int, int]]:
+        """Find the members of the language inside a string in a single left-to-right pass.
+
+        Parameters
+        ----------
+        string : str
+            The string to search
+        policy : str
+            One of {'leftmost-longest', 'overlapping'}, see CompiledFSA.finditer
+
+        Yields
+        ------
+        Tuple[int, int]
+            The start and end of a span, such that string[<start>:<end>] is a member of the
+                language
+        """
+
+        return self.compiled.finditer(string, policy)
+
+    def find_all(self, string: str, policy: str = "leftmost-longest") -> List[Tuple[int, int]]:
+        """Find the members of the language inside a string in a single left-to-right pass.
+
+        Parameters
+        ----------
+        string : str
+            The string to search
+        policy : str
+            One of {'leftmost-longest', 'overlapping'}, see CompiledFSA.finditer
+
+        Returns
+        -------
+        List[Tuple[int, int]]
+            The start and end of every span, such that string[<start>:<end>] is a member of the
+                language
+        """
+
+        return list(self.finditer(string, policy))
+
+    def recognize_many(self, strings: Sequence[str], mode: str = "D1") -> np.ndarray:
+        """Run a batch of strings through the FSA at once. Requires NumPy.
+
+        Parameters
+        ----------
+        strings : Sequence[str]
+            The strings to run through the FSA
+        mode : str
+            The task to perform, one of {'D1', 'D2', 'D3'}
+
+        Returns
+        -------
+        np.ndarray
+            Boolean array, where element <i> is whether or not the FSA recognizes strings[<i>]
+        """
+
+        return self.compiled.recognize_many(strings, mode)
+
+    def recognize_shared_prefixes(self, strings: Sequence[str], mode: str = "D1") -> List[bool]:
+        """Run a batch of strings through the FSA, walking every prefix they share only once.
 
-            current_state = self.trans_func[current_state][string[index]]
+        Parameters
+        ----------
+        strings : Sequence[str]
+            The strings to run through the FSA
+        mode : str
+            The task to perform, one of {'D1', 'D2', 'D3'}
+
+        Returns
+        -------
+        List[bool]
+            Whether or not the FSA recognizes every string, in the order of strings
+        """
+
+        return self.compiled.recognize_shared_prefixes(strings, mode)
+
+    def recognize_bytes(self, data: BytesLike, mode: str = "D1") -> bool:
+        """Run a bytes-like object through the FSA, reading every byte as the symbol with the same
+            code point.
+
+        Parameters
+        ----------
+        data : BytesLike
+            The bytes, bytearray, memoryview, or mmap to run through the FSA
+        mode : str
+            The task to perform, one of {'D1', 'D2', 'D3'}
+
+        Returns
+        -------
+        bool
+            Whether or not the FSA recognizes the data in the given mode
+        """
+
+        if self.profile is not None:
+            return self.profile.recognize_bytes(data, mode)
+        return self.compiled.recognize_bytes(data, mode)
+
+    def recognize_file(self, file: Path, mode: str = "D1") -> bool:
+        """Memory-map a file and run its bytes through the FSA.
+
+        Parameters
+        ----------
+        file : Path
+            The file to run through the FSA
+        mode : str
+            The task to perform, one of {'D1', 'D2', 'D3'}
+
+        Returns
+        -------
+        bool
+            Whether or not the FSA recognizes the contents of the file in the given mode
+        """
+
+        with open(file, "rb") as f:
+            # Empty files cannot be memory-mapped
+            if os.fstat(f.fileno()).st_size == 0:
+                return self.recognize_bytes(b"", mode)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return self.recognize_bytes(data, mode)
+
+    def recognize_member_parallel(
+        self, data: Union[str, BytesLike], workers: Optional[int] = None, chunk_size: int = 1 << 22
+    ) -> bool:
+        """Determine if a large input is a member of the language using a pool of worker processes.
+
+        Parameters
+        ----------
+        data : Union[str, BytesLike]
+            The string or bytes-like object to run through the FSA
+        workers : Optional[int]
+            Number of worker processes, by default the number of CPUs
+        chunk_size : int
+            Number of symbols scanned by a worker at once
 
-        return accept_status
+        Returns
+        -------
+        bool
+            Whether or not the FSA recognizes the input in member mode
+        """
+
+        return self.compiled.recognize_parallel(data, "D1", workers, chunk_size)
+
+    def recognize_substring_parallel(
+        self, data: Union[str, BytesLike], workers: Optional[int] = None, chunk_size: int = 1 << 22
+    ) -> bool:
+        """Determine if a large input contains a member of the language using a pool of worker
+            processes.
+
+        Parameters
+        ----------
+        data : Union[str, BytesLike]
+            The string or bytes-like object to run through the FSA
+        workers : Optional[int]
+            Number of worker processes, by default the number of CPUs
+        chunk_size : int
+            Number of symbols scanned by a worker at once
+
+        Returns
+        -------
+        bool
+            Whether or not the FSA recognizes the input in substring mode
+        """
+
+        return self.compiled.recognize_parallel(data, "D3", workers, chunk_size)
 
     @classmethod
     def from_file(cls: FSA, path: str) -> FSA:
         """Create a FSA from a file-based representation.
 
+        If the directory contains a compiled FSA written by save_compiled that is newer than all of
+            the text files, it is loaded instead of parsing the text files. A compiled FSA in
+            another format, such as one written by an older version, is ignored.
+
         Parameters
         ----------
         path : str
@@ -266,6 +758,9 @@ class FSA:
         """
 
         path = Path(path)
+        if cls._has_current_compiled(path):
+            return cls._load_compiled(path / cls.compiled_file_name)
+
         states = cls._extract_states(path / cls.states_file_name)
         final_states = cls._extract_final_states(path / cls.final_states_file_name)
         start_state = cls._extract_start_state(path / cls.start_state_file_name)
@@ -274,6 +769,266 @@ class FSA:
 
         return cls(states, final_states, start_state, alphabet, trans_func)
 
+    @classmethod
+    def load_catalog(
+        cls: FSA,
+        root: str,
+        workers: Optional[int] = None,
+        report: Optional[Callable[[str, float, Optional[Exception]], None]] = None,
+    ) -> Dict[str, Union[FSA, NFA]]:
+        """Load and compile every automaton directory directly under a directory using a pool of
+            worker processes.
+
+        Every directory holding a transition function is loaded with load_automaton by a worker,
+            and a FSA is also compiled, so it is returned ready to recognize. A NFA is kept as a
+            NFA, like load_registry does, since determinizing it may take exponential time and
+            space. A directory that fails to load for any reason, including a worker running out
+            of memory or dying, is reported and left out instead of aborting the load. A worker
+            that dies breaks the pool, so every directory it left unfinished is loaded again on
+            its own, in a pool of a single worker, and only the one whose worker dies again is
+            reported.
+
+        Parameters
+        ----------
+        root : str
+            Directory containing the automaton directories, e.g., ./data
+        workers : Optional[int]
+            Number of worker processes, by default the number of CPUs
+        report : Optional[Callable[[str, float, Optional[Exception]], None]]
+            Called with the name of every directory, as soon as it is done, with the seconds its
+                worker spent loading it and the error it failed with, if any. By default, a line
+                per directory is written to stderr
+
+        Returns
+        -------
+        Dict[str, Union[FSA, NFA]]
+            Automata by the name of their directory, in sorted order
+        """
+
+        if report is None:
+            report = _report_catalog_entry
+        paths = [
+            path
+            for path in sorted(Path(root).iterdir())
+            if (path / cls.trans_func_file_name).exists()
+        ]
+        workers = min(workers or os.cpu_count() or 1, len(paths))
+
+        loaded = {}
+        if workers <= 1:
+            for path in paths:
+                try:
+                    loaded[path.name], seconds = _load_catalog_entry(path)
+                except Exception as error:
+                    report(path.name, 0.0, error)
+                else:
+                    report(path.name, seconds, None)
+        else:
+            unfinished = []
+            with ProcessPoolExecutor(workers) as pool:
+                futures = {pool.submit(_load_catalog_entry, path): path for path in paths}
+                for future in as_completed(futures):
+                    path = futures[future]
+                    try:
+                        loaded[path.name], seconds = future.result()
+                    except BrokenProcessPool:
+                        # Any worker may have died, so the blame is settled below
+                        unfinished.append(path)
+                    except Exception as error:
+                        report(path.name, 0.0, error)
+                    else:
+                        report(path.name, seconds, None)
+
+            for path in sorted(unfinished):
+                with ProcessPoolExecutor(1) as pool:
+                    try:
+                        loaded[path.name], seconds = pool.submit(_load_catalog_entry, path).result()
+                    except Exception as error:
+                        report(path.name, 0.0, error)
+                    else:
+                        report(path.name, seconds, None)
+
+        return {path.name: loaded[path.name] for path in paths if path.name in loaded}
+
+    def save_compiled(self, path: str) -> Path:
+        """Write the compiled form of the FSA into a directory, in a binary format that from_file
+            memory-maps instead of parsing the text files while it is newer than all of them.
+
+        The file starts with a header of little-endian 32-bit fields: the magic bytes, the format
+            version, the number of states, symbols, and columns, the start state, and the byte
+            lengths of the state and symbol names. It is followed by the newline-separated state
+            and symbol names, a byte per state marking whether it is listed in the states file, a
+            byte per symbol marking whether it is in the alphabet, the final state map, and,
+            aligned to 4 bytes, the column of every symbol and the transition table as 32-bit
+            integers.
+
+        Parameters
+        ----------
+        path : str
+            Directory to write the file into
+
+        Returns
+        -------
+        Path
+            The file written
+        """
+
+        compiled = self.compiled
+        names = "\n".join(compiled.state_names).encode()
+        symbols = "\n".join(compiled.symbols).encode()
+        header = struct.pack(
+            self._compiled_header,
+            self._compiled_magic,
+            self._compiled_version,
+            len(compiled.state_names),
+            len(compiled.symbols),
+            compiled.num_columns,
+            compiled.start,
+            len(names),
+            len(symbols),
+        )
+        listed = bytes(name in self.states for name in compiled.state_names)
+        in_alphabet = bytes(symbol in self.alphabet for symbol in compiled.symbols)
+        body = header + names + symbols + listed + in_alphabet + bytes(compiled.final)
+        typecode = CompiledFSA.table_typecode
+        table = array(typecode, compiled.symbol_columns) + array(typecode, compiled.table)
+
+        file = Path(path) / self.compiled_file_name
+        with open(file, "wb") as f:
+            f.write(body)
+            f.write(bytes(-len(body) % 4))
+            f.write(table if sys.byteorder == "little" else _byteswapped(table))
+        return file
+
+    @classmethod
+    def _has_current_compiled(cls: FSA, path: Path) -> bool:
+        """Whether or not a directory contains a compiled FSA in the format of save_compiled that
+            is newer than all of the text files.
+
+        Parameters
+        ----------
+        path : Path
+            Directory containing the FSA files
+
+        Returns
+        -------
+        bool
+            Whether or not from_file should load the compiled FSA instead of the text files
+        """
+
+        path = Path(path)
+        compiled_file = path / cls.compiled_file_name
+        if not compiled_file.exists():
+            return False
+        text_files = (
+            cls.states_file_name,
+            cls.final_states_file_name,
+            cls.start_state_file_name,
+            cls.alphabet_file_name,
+            cls.trans_func_file_name,
+        )
+        modified = compiled_file.stat().st_mtime
+        if not all(modified > (path / name).stat().st_mtime for name in text_files):
+            return False
+        with open(compiled_file, "rb") as f:
+            header = f.read(struct.calcsize("<4sI"))
+        if len(header) < struct.calcsize("<4sI"):
+            return False
+        return struct.unpack("<4sI", header) == (cls._compiled_magic, cls._compiled_version)
+
+    @classmethod
+    def _load_compiled(cls: FSA, file: Path) -> FSA:
+        """Create a FSA from the binary format written by save_compiled.
+
+        The transition table is used in place from the memory-mapped file.
+
+        Parameters
+        ----------
+        file : Path
+            File containing the compiled FSA
+
+        Returns
+        -------
+        FSA
+            FSA stored in this file, with its compiled form already set
+        """
+
+        with open(file, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version = struct.unpack_from("<4sI", data)
+        if magic != cls._compiled_magic or version != cls._compiled_version:
+            raise ValueError(f"{file} is not a compiled FSA of version {cls._compiled_version}.")
+        _, _, num_names, num_symbols, num_columns, start, names_length, symbols_length = (
+            struct.unpack_from(cls._compiled_header, data)
+        )
+
+        offset = struct.calcsize(cls._compiled_header)
+        sections = []
+        for length in (names_length, symbols_length, num_names, num_symbols, num_names + 1):
+            sections.append(data[offset : offset + length])
+            offset += length
+        names, symbols, listed, in_alphabet, final = sections
+        state_names = names.decode().split("\n") if num_names else []
+        symbol_names = symbols.decode().split("\n") if num_symbols else []
+
+        offset += -offset % 4
+        typecode = CompiledFSA.table_typecode
+        symbol_columns = array(typecode, data[offset : offset + 4 * num_symbols])
+        if sys.byteorder != "little":
+            symbol_columns.byteswap()
+        offset += 4 * num_symbols
+        table = memoryview(data)[offset : offset + 4 * (num_names + 1) * num_columns]
+        table = table.cast(typecode)
+        if sys.byteorder != "little":
+            table = _byteswapped(table)
+        compiled = CompiledFSA(
+            state_names, symbol_names, start, bytearray(final), table, symbol_columns
+        )
+
+        trans_func: Dict[str, Dict[str, str]] = {}
+        dead = compiled.dead
+        for state, name in enumerate(state_names):
+            row = state * num_columns
+            for symbol, column in zip(symbol_names, symbol_columns):
+                next_state = table[row + column]
+                if next_state != dead:
+                    trans_func.setdefault(name, {})[symbol] = state_names[next_state]
+
+        fsa = cls(
+            states={name for name, flag in zip(state_names, listed) if flag},
+            final_states={name for state, name in enumerate(state_names) if final[state]},
+            start_state=state_names[start],
+            alphabet={symbol for symbol, flag in zip(symbol_names, in_alphabet) if flag},
+            trans_func=trans_func,
+        )
+        fsa._compiled = compiled
+        return fsa
+
+    @classmethod
+    def from_regex(cls: FSA, pattern: str) -> FSA:
+        """Create a FSA from a regex.
+
+        The regex is compiled with Thompson's construction, the subset construction, and DFA
+            minimization. It may use symbols, concatenation, "|", "*", "+", "?", parentheses, '""'
+            for the empty string, and "\\" to escape an operator, e.g., '(ab*a)|(cd*c)|("")'.
+
+        Compiled FSA are cached for the whole process by pattern, so compiling the same pattern
+            again returns the same FSA, which must therefore not be modified.
+
+        Parameters
+        ----------
+        pattern : str
+            The regex to compile
+
+        Returns
+        -------
+        FSA
+            Minimal FSA recognizing the language of the regex
+        """
+
+        return _compile_regex(pattern)
+
     @staticmethod
     def _extract_states(file: Path) -> Set[str]:
         """Extract FSA states from a file.
@@ -363,6 +1118,12 @@ class FSA:
         -------
         Dict[str, Dict[str, str]]
             FSA transition function
+
+        Raises
+        ------
+        ValueError
+            If a row has several target states, an epsilon move, or the same state and symbol as
+                another row, which only a NFA may have, see load_automaton
         """
 
         with open(file) as f:
@@ -371,29 +1132,3326 @@ class FSA:
             for item in trans_func:
                 if "NULL" not in item:
                     a_list = item.split(",")
+                    if len(a_list) != 3 or a_list[1] == NFA.epsilon:
+                        raise ValueError(f"{file} holds a NFA transition: {item}")
                     if a_list[0] not in return_dic:
                         return_dic[a_list[0]] = {a_list[1]: a_list[2]}
+                    elif a_list[1] in return_dic[a_list[0]]:
+                        raise ValueError(
+                            f"{file} holds several transitions of {a_list[0]} on {a_list[1]}"
+                        )
                     else:
                         return_dic[a_list[0]][a_list[1]] = a_list[2]
             return return_dic
 
 
-def main(path: Path, test_str: str, task: str) -> None:
-    """Run the tasks described in the project description.
+class NFA:
+    """Nondeterministic finite state automata with epsilon moves, capable of performing string
+        recognition in three variations.
+
+    NFA are stored in the same directory format as FSA, except that the transition function file
+        may list several target states for the same state and symbol, either on separate rows or
+        as extra fields of one row, and may use the symbol EPSILON for moves that read no input.
+
+    Strings are recognized through a lazily built DFA, whose states are sets of NFA states. DFA
+        states are only created when the input reaches them, and at most cache_size of them are
+        kept, evicting the least recently used state first, so an NFA whose full subset
+        construction would be exponential can still recognize long strings.
+
+    Class Attributes
+    ----------------
+    epsilon : str
+        Symbol of moves that read no input in the transition function file
+    cache_size : int
+        Default maximum number of DFA states kept in each cache
+
+    Attributes
+    ----------
+    states : Set[str]
+        NFA states
+    final_states : Set[str]
+        NFA final states
+    start_state : str
+        NFA start state
+    alphabet : Set[str]
+        NFA alphabet of symbols
+    trans_func : Dict[str, Dict[str, Set[str]]]
+        NFA transition function, where trans_func[<state>][<symbol>] is the set of states the NFA
+            may enter if it is currently in state <state> and the input symbol on the tape is
+            <symbol>, and trans_func[<state>][""] is the set of states it may enter without
+            reading a symbol
+    cache_size : int
+        Maximum number of DFA states kept in each cache
+
+    Methods
+    -------
+    from_file(path: Path) -> NFA
+        Instantiate a NFA from files inside of the directory, path
+    recognize_member(string: str) -> bool
+        Determine if a string is a member of the language recognized by the NFA
+    recognize_endswith(string: str) -> bool
+        Determine if a string ends with a member of the language recognized by the NFA
+    recognize_substring(string: str) -> bool
+        Determine if a string contains a member of the language recognized by the NFA
+    determinized() -> FSA
+        Build an equivalent FSA with the subset construction
+    """
+
+    epsilon = "EPSILON"
+    cache_size = 4096
+
+    def __init__(
+        self,
+        states: Set[str],
+        final_states: Set[str],
+        start_state: str,
+        alphabet: Set[str],
+        trans_func: Dict[str, Dict[str, Set[str]]],
+        cache_size: Optional[int] = None,
+    ) -> None:
+        """Construct a NFA.
+
+        Parameters
+        ----------
+        states : Set[str]
+            NFA states
+        final_states : Set[str]
+            NFA final states
+        start_state : str
+            NFA start state
+        alphabet : Set[str]
+            NFA alphabet of symbols
+        trans_func : Dict[str, Dict[str, Set[str]]]
+            NFA transition function, where the symbol "" is used for epsilon moves
+        cache_size : Optional[int]
+            Maximum number of DFA states kept in each cache, by default NFA.cache_size
+        """
+
+        self.states = states
+        self.final_states = final_states
+        self.start_state = start_state
+        self.alphabet = alphabet
+        self.trans_func = trans_func
+        self.cache_size = cache_size or NFA.cache_size
+
+        # Lazily built DFA for member mode and for the "Σ* · L" automaton of endswith and
+        # substring modes, where cache[<DFA state>][<symbol>] is the next DFA state
+        self._member_cache: OrderedDict[FrozenSet[str], Dict[str, FrozenSet[str]]] = OrderedDict()
+        self._search_cache: OrderedDict[FrozenSet[str], Dict[str, FrozenSet[str]]] = OrderedDict()
+        self._start_closure = self._closure({start_state})
+
+    def __repr__(self) -> str:
+        return (
+            "NFA(\n"
+            f"\tstates={self.states},\n"
+            f"\tfinal_states={self.final_states},\n"
+            f"\tstart_state={self.start_state},\n"
+            f"\talphabet={self.alphabet},\n"
+            f"\ttrans_func={self.trans_func},\n"
+            ")"
+        )
+
+    def recognize_member(self, string: str) -> bool:
+        """Determine if a string is a member of the language recognized by the NFA.
+
+        Parameters
+        ----------
+        string : str
+            The string to run through the NFA
+
+        Returns
+        -------
+        bool
+            Whether or not the NFA recognizes the string in member mode
+        """
+
+        current_states = self._start_closure
+        for symbol in string:
+            current_states = self._step(self._member_cache, current_states, symbol, restart=False)
+            # Every run rejected
+            if not current_states:
+                return False
+
+        return not current_states.isdisjoint(self.final_states)
+
+    def recognize_endswith(self, string: str) -> bool:
+        """Determine if a string ends with a member of the language recognized by the NFA.
+
+        Parameters
+        ----------
+        string : str
+            The string to run through the NFA
+
+        Returns
+        -------
+        bool
+            Whether or not the NFA recognizes the string in endswith mode
+        """
+
+        current_states = self._start_closure
+        for symbol in string:
+            current_states = self._step(self._search_cache, current_states, symbol, restart=True)
+
+        return not current_states.isdisjoint(self.final_states)
+
+    def recognize_substring(self, string: str) -> bool:
+        """Determine if a string contains a member of the language recognized by the NFA.
+
+        Parameters
+        ----------
+        string : str
+            The string to run through the NFA
+
+        Returns
+        -------
+        bool
+            Whether or not the NFA recognizes the string in substring mode
+        """
+
+        current_states = self._start_closure
+        for symbol in string:
+            if not current_states.isdisjoint(self.final_states):
+                return True
+            current_states = self._step(self._search_cache, current_states, symbol, restart=True)
+
+        return not current_states.isdisjoint(self.final_states)
+
+    def determinized(self) -> FSA:
+        """Build an equivalent FSA with the subset construction.
+
+        Only the sets of states reachable from the start state are built, and every state of the
+            result is named d<i>, in the order the states were found.
+
+        Returns
+        -------
+        FSA
+            FSA recognizing the same language, with a partial transition function
+        """
+
+        alphabet = sorted(self.alphabet)
+        names = {self._start_closure: "d0"}
+        queue = [self._start_closure]
+        trans_func: Dict[str, Dict[str, str]] = {}
+        for current_states in queue:
+            for symbol in alphabet:
+                targets = set()
+                for state in current_states:
+                    targets.update(self.trans_func.get(state, {}).get(symbol, ()))
+                if not targets:
+                    continue
+                next_states = self._closure(targets)
+                if next_states not in names:
+                    names[next_states] = f"d{len(names)}"
+                    queue.append(next_states)
+                trans_func.setdefault(names[current_states], {})[symbol] = names[next_states]
+
+        return FSA(
+            states=set(names.values()),
+            final_states={
+                name for states, name in names.items() if not states.isdisjoint(self.final_states)
+            },
+            start_state="d0",
+            alphabet=set(self.alphabet),
+            trans_func=trans_func,
+        )
+
+    def _step(
+        self,
+        cache: OrderedDict[FrozenSet[str], Dict[str, FrozenSet[str]]],
+        current_states: FrozenSet[str],
+        symbol: str,
+        restart: bool,
+    ) -> FrozenSet[str]:
+        """Perform one transition of a lazily built DFA.
+
+        Parameters
+        ----------
+        cache : OrderedDict[FrozenSet[str], Dict[str, FrozenSet[str]]]
+            Cache of DFA states and their transitions, ordered from least to most recently used
+        current_states : FrozenSet[str]
+            Current DFA state, an epsilon-closed set of NFA states
+        symbol : str
+            The symbol on the tape
+        restart : bool
+            Whether or not a new run starts after every symbol, as in the "Σ* · L" automaton
+
+        Returns
+        -------
+        FrozenSet[str]
+            Next DFA state
+        """
+
+        transitions = cache.get(current_states)
+        if transitions is None:
+            if len(cache) >= self.cache_size:
+                cache.popitem(last=False)
+            transitions = cache[current_states] = {}
+        else:
+            cache.move_to_end(current_states)
+
+        next_states = transitions.get(symbol)
+        if next_states is None:
+            targets = set()
+            for state in current_states:
+                targets.update(self.trans_func.get(state, {}).get(symbol, ()))
+            next_states = self._closure(targets)
+            if restart:
+                next_states |= self._start_closure
+            transitions[symbol] = next_states
+
+        return next_states
+
+    def _closure(self, states: Set[str]) -> FrozenSet[str]:
+        """Compute the set of states reachable from a set of states through epsilon moves.
+
+        Parameters
+        ----------
+        states : Set[str]
+            The set of states to start from
+
+        Returns
+        -------
+        FrozenSet[str]
+            The epsilon closure of the states
+        """
+
+        closure = set(states)
+        stack = list(states)
+        while stack:
+            for next_state in self.trans_func.get(stack.pop(), {}).get("", ()):
+                if next_state not in closure:
+                    closure.add(next_state)
+                    stack.append(next_state)
+
+        return frozenset(closure)
+
+    @classmethod
+    def from_file(cls: NFA, path: str, cache_size: Optional[int] = None) -> NFA:
+        """Create a NFA from a file-based representation.
+
+        Parameters
+        ----------
+        path : str
+            Directory containing the NFA files
+        cache_size : Optional[int]
+            Maximum number of DFA states kept in each cache, by default NFA.cache_size
+
+        Returns
+        -------
+        NFA
+            NFA stored in this directory
+        """
+
+        path = Path(path)
+        states = FSA._extract_states(path / FSA.states_file_name)
+        final_states = FSA._extract_final_states(path / FSA.final_states_file_name)
+        start_state = FSA._extract_start_state(path / FSA.start_state_file_name)
+        alphabet = FSA._extract_alphabet(path / FSA.alphabet_file_name)
+        trans_func = cls._extract_trans_func(path / FSA.trans_func_file_name)
+
+        return cls(states, final_states, start_state, alphabet, trans_func, cache_size)
+
+    @classmethod
+    def _extract_trans_func(cls: NFA, file: Path) -> Dict[str, Dict[str, Set[str]]]:
+        """Extract NFA transition function from a file.
+
+        Parameters
+        ----------
+        file : Path
+            File containing NFA transtion function, with one or more target states per row
+
+        Returns
+        -------
+        Dict[str, Dict[str, Set[str]]]
+            NFA transition function
+        """
+
+        trans_func = {}
+        with open(file) as f:
+            for line in f:
+                fields = line.replace(" ", "").strip().split(",")
+                if len(fields) < 3:
+                    continue
+                state, symbol, targets = fields[0], fields[1], fields[2:]
+                if symbol == cls.epsilon:
+                    symbol = ""
+                trans_func.setdefault(state, {}).setdefault(symbol, set()).update(
+                    target for target in targets if target != "NULL"
+                )
+        return trans_func
+
+
+class _RegexParser:
+    """Recursive descent parser that compiles a regex into a NFA with Thompson's construction.
+
+    The grammar is
+        alternation := concatenation ("|" concatenation)*
+        concatenation := repetition*
+        repetition := atom ("*" | "+" | "?")*
+        atom := "(" alternation ")" | '""' | "\\" <symbol> | <symbol>
+    where '""' is the empty string and "\\" escapes an operator to use it as a symbol.
+
+    Attributes
+    ----------
+    pattern : str
+        The regex being parsed
+    position : int
+        Index of the next character of the pattern to parse
+    trans_func : Dict[str, Dict[str, Set[str]]]
+        Transition function of the NFA built so far
+    alphabet : Set[str]
+        Symbols used by the pattern
+    """
+
+    operators = set('|*+?()"\\')
+
+    def __init__(self, pattern: str) -> None:
+        """Construct a parser positioned at the start of the pattern.
+
+        Parameters
+        ----------
+        pattern : str
+            The regex to parse
+        """
+
+        self.pattern = pattern
+        self.position = 0
+        self.trans_func: Dict[str, Dict[str, Set[str]]] = {}
+        self.alphabet: Set[str] = set()
+        self._num_states = 0
+
+    def parse(self) -> NFA:
+        """Parse the whole pattern.
+
+        Returns
+        -------
+        NFA
+            NFA recognizing the language of the pattern
+        """
+
+        start, accept = self._alternation()
+        if self.position != len(self.pattern):
+            self._error("unbalanced parenthesis")
+
+        states = {f"q{index}" for index in range(self._num_states)}
+        return NFA(states, {accept}, start, self.alphabet, self.trans_func)
+
+    def _new_state(self) -> str:
+        """Add a state to the NFA and return its name."""
+
+        state = f"q{self._num_states}"
+        self._num_states += 1
+        return state
+
+    def _add(self, state: str, symbol: str, next_state: str) -> None:
+        """Add a transition to the NFA, where the symbol "" is an epsilon move."""
+
+        self.trans_func.setdefault(state, {}).setdefault(symbol, set()).add(next_state)
+
+    def _peek(self) -> Optional[str]:
+        """Next character of the pattern, or None at the end of the pattern."""
+
+        return self.pattern[self.position] if self.position < len(self.pattern) else None
+
+    def _error(self, message: str) -> None:
+        """Raise a ValueError locating the syntax error in the pattern."""
+
+        raise ValueError(f"Invalid regex {self.pattern!r} at position {self.position}: {message}.")
+
+    def _alternation(self) -> Tuple[str, str]:
+        """Parse an alternation and return the start and accept states of its NFA fragment."""
+
+        branches = [self._concatenation()]
+        while self._peek() == "|":
+            self.position += 1
+            branches.append(self._concatenation())
+        if len(branches) == 1:
+            return branches[0]
+
+        start, accept = self._new_state(), self._new_state()
+        for branch_start, branch_accept in branches:
+            self._add(start, "", branch_start)
+            self._add(branch_accept, "", accept)
+        return start, accept
+
+    def _concatenation(self) -> Tuple[str, str]:
+        """Parse a concatenation and return the start and accept states of its NFA fragment."""
+
+        start = accept = self._new_state()
+        while self._peek() not in (None, "|", ")"):
+            part_start, part_accept = self._repetition()
+            self._add(accept, "", part_start)
+            accept = part_accept
+        return start, accept
+
+    def _repetition(self) -> Tuple[str, str]:
+        """Parse a repetition and return the start and accept states of its NFA fragment."""
+
+        start, accept = self._atom()
+        while self._peek() in ("*", "+", "?"):
+            operator = self.pattern[self.position]
+            self.position += 1
+            outer_start, outer_accept = self._new_state(), self._new_state()
+            self._add(outer_start, "", start)
+            self._add(accept, "", outer_accept)
+            if operator in ("*", "?"):
+                self._add(outer_start, "", outer_accept)
+            if operator in ("*", "+"):
+                self._add(accept, "", start)
+            start, accept = outer_start, outer_accept
+        return start, accept
+
+    def _atom(self) -> Tuple[str, str]:
+        """Parse an atom and return the start and accept states of its NFA fragment."""
+
+        character = self._peek()
+        if character == "(":
+            self.position += 1
+            start, accept = self._alternation()
+            if self._peek() != ")":
+                self._error("expected ')'")
+            self.position += 1
+            return start, accept
+        if character == '"':
+            if self.pattern[self.position : self.position + 2] != '""':
+                self._error("expected '\"\"'")
+            self.position += 2
+            state = self._new_state()
+            return state, state
+        if character == "\\":
+            self.position += 1
+            character = self._peek()
+            if character is None:
+                self._error("nothing to escape")
+        elif character in self.operators:
+            self._error(f"unexpected {character!r}")
+
+        self.position += 1
+        self.alphabet.add(character)
+        start, accept = self._new_state(), self._new_state()
+        self._add(start, character, accept)
+        return start, accept
+
+
+@lru_cache(maxsize=1024)
+def _compile_regex(pattern: str) -> FSA:
+    """Compile a regex into a minimal FSA, caching the result for the whole process.
+
+    Parameters
+    ----------
+    pattern : str
+        The regex to compile
+
+    Returns
+    -------
+    FSA
+        Minimal FSA recognizing the language of the pattern, with its table compiled
+    """
+
+    fsa = _RegexParser(pattern).parse().determinized().minimized()
+    fsa.compile()
+    return fsa
+
+
+class CompiledFSA:
+    """FSA whose states and symbols are interned to small integers.
+
+    The transition function is stored as a flat, array-backed table with one row per state and
+        one column per symbol. Missing transitions of a partial transition function lead to an
+        explicit dead state, and symbols outside of the alphabet share a final column that leads
+        every state to the dead state.
+
+    Endswith and substring recognition run the "Σ* · L" automaton, whose states are the sets of
+        FSA runs that started at an earlier position of the input and have not rejected yet. It is
+        determinized lazily, so only the sets of runs that actually occur in the input are built,
+        and its transitions are stored in a second flat table that grows as needed. Once the
+        states built so far fill search_cache_size, they are all forgotten and built again as
+        needed. When few of the forgotten states were ever returned to, the cache is thrashing,
+        and a scan that flushes it steps the set of live runs directly for the rest of its input.
+
+    Class Attributes
+    ----------------
+    byte_block_size : int
+        Number of bytes translated to columns at once by recognize_bytes
+    search_cache_size : int
+        Largest size of the states of the "Σ* · L" automaton kept at once, counted as the number
+            of live runs in their sets plus the number of entries in their rows of the table
+    table_typecode : str
+        Type code of the arrays holding the transition table, 32-bit integers like the table of
+            the compiled file format, see FSA.save_compiled
+
+    Symbols that lead every state to the same state share one column, so the table has one column
+        per class of equivalent symbols rather than one per symbol. Symbols that lead every state
+        to the dead state share the column of the symbols outside of the alphabet.
+
+    Attributes
+    ----------
+    state_names : List[str]
+        FSA states, where state_names[<state>] is the name of the integer state <state>
+    symbols : List[str]
+        FSA alphabet of symbols
+    symbol_columns : List[int]
+        Column of every symbol, where symbol_columns[<i>] is the column of symbols[<i>]
+    symbol_index : Dict[str, int]
+        Column of every symbol in the alphabet, the lookup used by every recognize method
+    column_symbols : List[List[str]]
+        Symbols of the alphabet in every column, the inverse of symbol_index
+    start : int
+        FSA start state
+    dead : int
+        Dead state, entered when the FSA rejects
+    other : int
+        Column of the symbols outside of the alphabet
+    num_states : int
+        Number of states, including the dead state
+    num_columns : int
+        Number of columns, one per class of symbols and one for the symbols outside of the
+            alphabet
+    table : Union[array, memoryview]
+        Transition function, where table[<state> * num_columns + <column>] is the state the FSA
+            should enter if it is in state <state> and the input symbol is in column <column>. A
+            memoryview when the table is used in place from a memory-mapped file.
+    final : bytearray
+        Final state map, where final[<state>] is 1 if <state> is a final state and 0 otherwise
+    byte_column_list : List[int]
+        Column of every byte, where a byte is read as the symbol with the same code point
+    byte_columns : Optional[bytes]
+        byte_column_list as a translation table for bytes.translate, or None if there are more
+            than 256 columns
+    code_columns : array
+        Column of every code point up to the largest one in the alphabet, computed on first use
+            for vectorized encoding
+    live_symbols : FrozenSet[str]
+        Symbols of the alphabet with a column of their own, any other symbol makes every run reject
+    stops : bytearray
+        Early termination map, computed on first use, where stops[<state>] is 1 if no final state
+            can be reached from <state>, such as the dead state or a non-accepting sink, 2 if
+            <state> accepts every string of live_symbols, such as an accepting sink, and 0
+            otherwise
+    required_factors : List[str]
+        Regexes of the factors every member of the language contains, computed on first use by
+            substring recognition
+    prefilter : Optional[re.Pattern]
+        Regex of the longest required factor, searched natively before substring recognition
+    search_expansions : int
+        Number of transitions of the "Σ* · L" automaton computed so far, rather than looked up
+    search_flushes : int
+        Number of times the states of the "Σ* · L" automaton were forgotten to stay within
+            search_cache_size
+    search_thrashing : bool
+        Whether or not the last flush found that few of the forgotten states were ever returned
+            to
+
+    Methods
+    -------
+    from_fsa(fsa: FSA) -> CompiledFSA
+        Compile a FSA
+    from_file(path: str, progress: Optional[Callable[[int, int], None]]) -> CompiledFSA
+        Compile a FSA straight from a file-based representation, for very large FSA
+    recognize_member(string: str, profile: Optional[Profile]) -> bool
+        Determine if a string is a member of the language recognized by the FSA
+    recognize_endswith(string: str, profile: Optional[Profile]) -> bool
+        Determine if a string ends with a member of the language recognized by the FSA
+    recognize_substring(string: str, profile: Optional[Profile]) -> bool
+        Determine if a string contains a member of the language recognized by the FSA
+    recognize_many(strings: Sequence[str], mode: str) -> np.ndarray
+        Run a batch of strings through the FSA at once
+    recognize_shared_prefixes(strings: Sequence[str], mode: str) -> List[bool]
+        Run a batch of strings through the FSA, walking every prefix they share only once
+    recognize_bytes(data: BytesLike, mode: str, profile: Optional[Profile]) -> bool
+        Run a bytes-like object, such as a memory-mapped file, through the FSA
+    recognize_parallel(data, mode: str, workers: int, chunk_size: int) -> bool
+        Run a large input through the FSA using a pool of worker processes
+    scan_chunk(chunk, mode: str) -> Tuple[array, bytearray, FrozenSet[int], bool]
+        Compute the transition mapping of one chunk of the input
+    finditer(string: str, policy: str) -> Iterator[Tuple[int, int]]
+        Find the members of the language inside a string in a single left-to-right pass
+    """
+
+    byte_block_size = 1 << 20
+    search_cache_size = 1 << 20
+    table_typecode = "i"
+
+    def __init__(
+        self,
+        state_names: List[str],
+        symbols: List[str],
+        start: int,
+        final: bytearray,
+        table: Union[array, memoryview],
+        symbol_columns: Optional[Sequence[int]] = None,
+    ) -> None:
+        """Construct a compiled FSA from its integer tables.
+
+        Parameters
+        ----------
+        state_names : List[str]
+            FSA states, not including the dead state
+        symbols : List[str]
+            FSA alphabet of symbols
+        start : int
+            FSA start state
+        final : bytearray
+            Final state map, including the dead state
+        table : Union[array, memoryview]
+            Flat transition table, including the dead state and the column of the symbols outside
+                the alphabet
+        symbol_columns : Optional[Sequence[int]]
+            Column of every symbol, or None for one column per symbol in the order of symbols
+        """
+
+        self.state_names = state_names
+        self.symbols = symbols
+        self.start = start
+        self.dead = len(state_names)
+        self.num_states = len(state_names) + 1
+        self.num_columns = len(table) // self.num_states
+        self.other = self.num_columns - 1
+        self.table = table
+        self.final = final
+
+        if symbol_columns is None:
+            symbol_columns = range(len(symbols))
+        self.symbol_columns = list(symbol_columns)
+        self.symbol_index = dict(zip(symbols, self.symbol_columns))
+        self.column_symbols: List[List[str]] = [[] for _ in range(self.num_columns)]
+        for symbol, column in zip(symbols, self.symbol_columns):
+            self.column_symbols[column].append(symbol)
+        self.live_symbols = frozenset(chain.from_iterable(self.column_symbols[: self.other]))
+
+        # Column of every byte, as a translation table when every column fits in a byte
+        self.byte_column_list = [
+            self.symbol_index.get(chr(byte), self.other) for byte in range(256)
+        ]
+        self.byte_columns = bytes(self.byte_column_list) if self.num_columns <= 256 else None
+
+        # The "Σ* · L" automaton, where search_sets[<search state>] is the set of live runs
+        self.search_sets: List[FrozenSet[int]] = []
+        self.search_index: Dict[FrozenSet[int], int] = {}
+        self.search_table = array("l")
+        self.search_final = bytearray()
+        # Whether or not a run of every state of the "Σ* · L" automaton is in a state accepting
+        # every string of live_symbols, where 0 is not computed yet, 1 is no, and 2 is yes
+        self.search_universal = bytearray()
+        self.search_cache_used = 0
+        self.search_expansions = 0
+        self.search_flushes = 0
+        self.search_thrashing = False
+        # Number of transitions built into a state that was already in the cache
+        self._search_returns = 0
+        self.search_start = self._add_search_state(frozenset((start,)))
+
+        self._coaccessible: Optional[bytearray] = None
+        self._code_columns: Optional[array] = None
+        self._stops: Optional[bytearray] = None
+        self._dead_symbol: Optional[re.Pattern] = None
+        self._last_dead_symbol: Optional[re.Pattern] = None
+        self._required_factors: Optional[List[str]] = None
+        self._prefilter: Optional[re.Pattern] = None
+
+    def __getstate__(self) -> dict:
+        # A table used in place from a memory-mapped file is copied, since it cannot be pickled
+        state = self.__dict__.copy()
+        if isinstance(self.table, memoryview):
+            state["table"] = array(self.table_typecode, self.table)
+        return state
+
+    @classmethod
+    def from_fsa(cls, fsa: FSA) -> CompiledFSA:
+        """Compile a FSA.
+
+        Parameters
+        ----------
+        fsa : FSA
+            The FSA to compile
+
+        Returns
+        -------
+        CompiledFSA
+            Compiled form of the FSA
+        """
+
+        state_names = set(fsa.states) | {fsa.start_state} | set(fsa.trans_func)
+        symbols = set(fsa.alphabet)
+        for transitions in fsa.trans_func.values():
+            state_names.update(transitions.values())
+            symbols.update(transitions)
+        state_names = sorted(state_names)
+        symbols = sorted(symbols)
+        state_index = {state: index for index, state in enumerate(state_names)}
+
+        # Symbols with the same transitions out of every state share a column, found by grouping
+        # the symbols on their transitions without building a column per symbol
+        transitions_of: Dict[str, List[Tuple[int, int]]] = {symbol: [] for symbol in symbols}
+        for state in sorted(fsa.trans_func):
+            for symbol, next_state in fsa.trans_func[state].items():
+                transitions_of[symbol].append((state_index[state], state_index[next_state]))
+        class_index: Dict[Tuple[Tuple[int, int], ...], int] = {}
+        classes = []
+        for symbol in symbols:
+            transitions = tuple(transitions_of[symbol])
+            if transitions and transitions not in class_index:
+                class_index[transitions] = len(classes)
+                classes.append(transitions)
+        # Symbols without any transition behave like the symbols outside of the alphabet
+        other = len(classes)
+        symbol_columns = [
+            class_index.get(tuple(transitions_of[symbol]), other) for symbol in symbols
+        ]
+
+        dead = len(state_names)
+        num_columns = len(classes) + 1
+        table = array(cls.table_typecode, [dead]) * ((len(state_names) + 1) * num_columns)
+        for column, transitions in enumerate(classes):
+            for state, next_state in transitions:
+                table[state * num_columns + column] = next_state
+
+        final = bytearray(len(state_names) + 1)
+        for state in fsa.final_states:
+            if state in state_index:
+                final[state_index[state]] = 1
+
+        compiled = cls(
+            state_names, symbols, state_index[fsa.start_state], final, table, symbol_columns
+        )
+        return compiled
+
+    @classmethod
+    def from_file(
+        cls, path: str, progress: Optional[Callable[[int, int], None]] = None
+    ) -> CompiledFSA:
+        """Compile a FSA straight from a file-based representation, for very large FSA.
+
+        The transition function file is streamed twice. The first pass interns the states and
+            symbols and sums a hash of the transitions of every symbol, so symbols with identical
+            columns are found before any table exists. The second pass fills a table with one
+            column per class of such symbols, so peak memory stays close to the size of the
+            merged table and the interned names.
+
+        Parameters
+        ----------
+        path : str
+            Directory containing the FSA files
+        progress : Optional[Callable[[int, int], None]]
+            Called with the number of bytes of the transition function file read so far, across
+                both passes, and the total number of bytes to read
+
+        Returns
+        -------
+        CompiledFSA
+            Compiled form of the FSA stored in this directory
+
+        Raises
+        ------
+        ValueError
+            If a row has several target states, or the same state and symbol as another row with
+                a different target state, which only a NFA may have
+        """
+
+        path = Path(path)
+        trans_func_file = path / FSA.trans_func_file_name
+        size = trans_func_file.stat().st_size
+        total = 2 * size
+        read = 0
+
+        def rows() -> Iterator[Tuple[int, List[str]]]:
+            nonlocal read
+            with open(trans_func_file, "rb") as f:
+                for number, raw_line in enumerate(f, 1):
+                    read += len(raw_line)
+                    if progress is not None and number % 1_000_000 == 0:
+                        progress(read, total)
+                    line = raw_line.decode().replace(" ", "").rstrip("\r\n")
+                    if line and "NULL" not in line:
+                        row = line.split(",")
+                        if len(row) != 3:
+                            raise ValueError(f"{trans_func_file}:{number} is not a FSA transition.")
+                        yield number, row
+
+        def intern(names: Dict[str, int], name: str) -> int:
+            index = names.get(name)
+            if index is None:
+                index = names[name] = len(names)
+            return index
+
+        def names(file: Path) -> Iterator[str]:
+            with open(file) as f:
+                for line in f:
+                    name = line.rstrip("\r\n")
+                    if name:
+                        yield name
+
+        state_index: Dict[str, int] = {}
+        for name in names(path / FSA.states_file_name):
+            intern(state_index, name)
+        start = intern(state_index, next(names(path / FSA.start_state_file_name)))
+        symbol_index: Dict[str, int] = {}
+        for name in names(path / FSA.alphabet_file_name):
+            intern(symbol_index, name)
+
+        # The transitions of a symbol are summarized by their number and the sum of their hashes,
+        # which does not depend on the order of the rows
+        counts = [0] * len(symbol_index)
+        signatures = [0] * len(symbol_index)
+        for _, (state, symbol, next_state) in rows():
+            column = intern(symbol_index, symbol)
+            if column == len(counts):
+                counts.append(0)
+                signatures.append(0)
+            counts[column] += 1
+            signatures[column] = (
+                signatures[column]
+                + hash((intern(state_index, state), intern(state_index, next_state)))
+            ) & 0xFFFFFFFFFFFFFFFF
+
+        dead = len(state_index)
+
+        def fill(symbol_columns: List[int], num_columns: int) -> Optional[array]:
+            """Fill the table, or return None if symbols sharing a column disagree."""
+
+            symbols_per_column = [0] * num_columns
+            for column in symbol_columns:
+                symbols_per_column[column] += 1
+            table = array(cls.table_typecode, [dead]) * ((dead + 1) * num_columns)
+            filled = [0] * num_columns
+            for number, (state, symbol, next_state) in rows():
+                column = symbol_columns[symbol_index[symbol]]
+                index = state_index[state] * num_columns + column
+                value = state_index[next_state]
+                if table[index] == dead:
+                    table[index] = value
+                    filled[column] += 1
+                elif table[index] != value:
+                    if symbols_per_column[column] > 1:
+                        return None
+                    raise ValueError(
+                        f"{trans_func_file}:{number} holds another transition of {state} on "
+                        f"{symbol}."
+                    )
+            # The symbols of a column took their transitions out of the same states
+            for symbol, column in enumerate(symbol_columns):
+                if symbols_per_column[column] > 1 and filled[column] != counts[symbol]:
+                    return None
+            return table
+
+        def merge(keys: List[Optional[Hashable]]) -> Tuple[List[int], int]:
+            """Give the symbols with the same key a column, and those without a key the last one,
+            and return the columns of the symbols and the number of columns."""
+
+            key_columns: Dict[Hashable, int] = {}
+            columns = [
+                -1 if key is None else key_columns.setdefault(key, len(key_columns))
+                for key in keys
+            ]
+            other = len(key_columns)
+            return [other if column < 0 else column for column in columns], other + 1
+
+        # Symbols leading every state to the dead state share the column of the symbols outside
+        # of the alphabet
+        symbol_columns, num_columns = merge(
+            [(count, signature) if count else None for count, signature in zip(counts, signatures)]
+        )
+        table = fill(symbol_columns, num_columns)
+        if table is None:
+            # The sums of hashes collided, or a symbol repeats a row, so every symbol gets a column
+            # of its own, and a row with another target state is reported
+            total += size
+            symbol_columns, num_columns = merge(
+                [symbol if count else None for symbol, count in enumerate(counts)]
+            )
+            table = fill(symbol_columns, num_columns)
+        if progress is not None:
+            progress(total, total)
+
+        final = bytearray(dead + 1)
+        for name in names(path / FSA.final_states_file_name):
+            state = state_index.get(name)
+            if state is not None:
+                final[state] = 1
+
+        compiled = cls(list(state_index), list(symbol_index), start, final, table, symbol_columns)
+        return compiled
+
+    @property
+    def coaccessible(self) -> bytearray:
+        """Co-accessible state map, where coaccessible[<state>] is 1 if a final state can be reached
+        from <state> and 0 otherwise."""
+
+        if self._coaccessible is None:
+            inverse: Dict[int, List[int]] = {}
+            for state in range(self.num_states):
+                for column in range(self.num_columns):
+                    next_state = self.table[state * self.num_columns + column]
+                    inverse.setdefault(next_state, []).append(state)
+            coaccessible = bytearray(self.final)
+            stack = [state for state in range(self.num_states) if self.final[state]]
+            while stack:
+                for state in inverse.get(stack.pop(), ()):
+                    if not coaccessible[state]:
+                        coaccessible[state] = 1
+                        stack.append(state)
+            self._coaccessible = coaccessible
+        return self._coaccessible
+
+    @property
+    def stops(self) -> bytearray:
+        """Early termination map, where stops[<state>] is 1 if no final state can be reached from
+        <state>, 2 if <state> accepts every string of live_symbols, and 0 otherwise."""
+
+        if self._stops is None:
+            stops = bytearray(0 if live else 1 for live in self.coaccessible)
+
+            # The states accepting every string of live_symbols are the largest set of final
+            # states that every live symbol leads back into, found by removing every state that
+            # can leave the set on a live symbol
+            inverse: Dict[int, List[int]] = {}
+            for state in range(self.num_states):
+                for column in range(self.other):
+                    next_state = self.table[state * self.num_columns + column]
+                    inverse.setdefault(next_state, []).append(state)
+            universal = bytearray(self.final)
+            stack = [state for state in range(self.num_states) if not universal[state]]
+            while stack:
+                for state in inverse.get(stack.pop(), ()):
+                    if universal[state]:
+                        universal[state] = 0
+                        stack.append(state)
+
+            for state in range(self.num_states):
+                if universal[state]:
+                    stops[state] = 2
+            self._stops = stops
+        return self._stops
+
+    @property
+    def code_columns(self) -> array:
+        """Column of every code point, where code_columns[<code point>] is the column of the symbol
+            chr(<code point>), up to the largest code point of a symbol, followed by the column of
+            every larger code point. Computed on first use.
+        """
+
+        if self._code_columns is None:
+            codes = {
+                ord(symbol): column
+                for symbol, column in self.symbol_index.items()
+                if len(symbol) == 1
+            }
+            code_columns = array("i", [self.other]) * (max(codes, default=-1) + 2)
+            for code, column in codes.items():
+                code_columns[code] = column
+            self._code_columns = code_columns
+        return self._code_columns
+
+    @property
+    def dead_symbol(self) -> re.Pattern:
+        """Regex matching a symbol outside of live_symbols. Compiled on first use."""
+
+        if self._dead_symbol is None:
+            self._dead_symbol = re.compile(self._character_class(self.live_symbols, negate=True))
+        return self._dead_symbol
+
+    @property
+    def last_dead_symbol(self) -> re.Pattern:
+        """Regex matching up to and including the last symbol outside of live_symbols. Compiled on
+        first use."""
+
+        if self._last_dead_symbol is None:
+            self._last_dead_symbol = re.compile("(?s:.*)" + self.dead_symbol.pattern)
+        return self._last_dead_symbol
+
+    @property
+    def required_factors(self) -> List[str]:
+        """Regexes of the factors that every member of the language contains, longest first.
+
+        A column is required if it is on every path from the start state to a final state in the
+            graph of the useful states, those both reachable and co-accessible. The columns on
+            every path to every state are found together, as bitmasks propagated along the edges.
+            Every required column is then extended forward into a factor while every useful state
+            entered on the factor so far is not final and leaves on the same single column.
+            Computed on first use, by the first substring recognition, since member and endswith
+            recognition never need it.
+        """
+
+        if self._required_factors is None:
+            self._required_factors = self._find_required_factors()
+        return self._required_factors
+
+    @property
+    def prefilter(self) -> Optional[re.Pattern]:
+        """Regex of the longest required factor, or None if there is none. Compiled on first use."""
+
+        if self._prefilter is None and self.required_factors:
+            self._prefilter = re.compile(self.required_factors[0])
+        return self._prefilter
+
+    def _find_required_factors(self) -> List[str]:
+        """Find the factors that every member of the language contains, see required_factors.
+
+        Returns
+        -------
+        List[str]
+            Regexes of the required factors, longest first
+        """
+
+        table, num_columns, final = self.table, self.num_columns, self.final
+        coaccessible = self.coaccessible
+        if not coaccessible[self.start] or final[self.start]:
+            return []
+
+        # One depth-first search of the useful states collects their edges and a reverse
+        # postorder, where successors[<state>] and predecessors[<state>] list (<column>, <state>)
+        successors: Dict[int, List[Tuple[int, int]]] = {self.start: []}
+        predecessors: Dict[int, List[Tuple[int, int]]] = {self.start: []}
+        postorder = []
+        stack = [(self.start, 0)]
+        while stack:
+            state, column = stack.pop()
+            while column < self.other:
+                next_state = table[state * num_columns + column]
+                column += 1
+                if not coaccessible[next_state]:
+                    continue
+                successors[state].append((column - 1, next_state))
+                if next_state not in successors:
+                    successors[next_state] = []
+                    predecessors[next_state] = [(column - 1, state)]
+                    stack.append((state, column))
+                    stack.append((next_state, 0))
+                    break
+                predecessors[next_state].append((column - 1, state))
+            else:
+                postorder.append(state)
+        order = postorder[::-1]
+
+        # required[<state>] is the bitmask of the columns on every path from the start state to
+        # <state>, the intersection over its incoming edges of the columns required before the
+        # edge and the column of the edge. Passes in reverse postorder settle after as many passes
+        # as the loops of the graph are nested, plus two.
+        required: Dict[int, int] = {self.start: 0}
+        changed = True
+        while changed:
+            changed = False
+            for state in order[1:]:
+                mask = -1
+                for column, previous in predecessors[state]:
+                    if previous in required:
+                        mask &= required[previous] | 1 << column
+                if mask != required.get(state, -1):
+                    required[state] = mask
+                    changed = True
+        mask = -1
+        for state in successors:
+            if final[state]:
+                mask &= required[state]
+
+        # The states entered by every required column, in one more pass over the edges
+        targets: Dict[int, Set[int]] = {
+            column: set() for column in range(self.other) if mask >> column & 1
+        }
+        for edges in successors.values():
+            for column, next_state in edges:
+                if column in targets:
+                    targets[column].add(next_state)
+
+        factors = []
+        for column, entered in targets.items():
+            # Extend the factor while its next column is forced, following only the edges out of
+            # the states entered on the factor so far
+            factor = [column]
+            while len(factor) < 64 and not any(final[state] for state in entered):
+                columns = {
+                    edge_column for state in entered for edge_column, _ in successors[state]
+                }
+                if len(columns) != 1:
+                    break
+                next_column = columns.pop()
+                factor.append(next_column)
+                entered = {
+                    next_state
+                    for state in entered
+                    for edge_column, next_state in successors[state]
+                    if edge_column == next_column
+                }
+
+            classes = [
+                [symbol for symbol in self.column_symbols[column] if len(symbol) == 1]
+                for column in factor
+            ]
+            if all(classes):
+                factors.append(classes)
+
+        factors.sort(key=lambda classes: (-len(classes), sum(map(len, classes))))
+        return [
+            "".join(self._character_class(symbols) for symbols in classes) for classes in factors
+        ]
+
+    @staticmethod
+    def _character_class(symbols: Iterable[str], negate: bool = False) -> str:
+        """Build the regex of a character class.
+
+        Parameters
+        ----------
+        symbols : Iterable[str]
+            The single-character symbols of the class
+        negate : bool
+            Whether or not to match every other character instead
+
+        Returns
+        -------
+        str
+            Regex of the class, a plain escaped character for a single symbol
+        """
+
+        symbols = sorted(symbol for symbol in symbols if len(symbol) == 1)
+        if not symbols:
+            return "(?s:.)" if negate else "(?!)"
+        if len(symbols) == 1 and not negate:
+            return re.escape(symbols[0])
+        return f"[{'^' if negate else ''}{''.join(map(re.escape, symbols))}]"
+
+    def recognize_member(self, string: str, profile: Optional[Profile] = None) -> bool:
+        """Determine if a string is a member of the language recognized by the FSA.
+
+        Parameters
+        ----------
+        string : str
+            The string to run through the FSA
+        profile : Optional[Profile]
+            Counters of the work done, see FSA.enable_profiling, or None to count nothing
+
+        Returns
+        -------
+        bool
+            Whether or not the FSA recognizes the string in member mode
+        """
+
+        table, num_columns, stops = self.table, self.num_columns, self.stops
+        symbol_index, other = self.symbol_index, self.other
+
+        state = self.start
+        symbols = iter(string)
+        if stops[state]:
+            pass
+        elif profile is None:
+            for symbol in symbols:
+                state = table[state * num_columns + symbol_index.get(symbol, other)]
+                # Stop as soon as the rest of the string can no longer change the outcome, such as
+                # in the dead state of a partial transition function or in a sink state
+                if stops[state]:
+                    break
+        else:
+            state = profile.step_member(state, map(symbol_index.get, symbols, repeat(other)))
+
+        stop = stops[state]
+        if stop == 1:
+            return False
+        if stop == 2:
+            # Only a symbol outside of the alphabet can still make the FSA reject
+            return self.live_symbols.issuperset(symbols)
+        return bool(self.final[state])
+
+    def recognize_endswith(self, string: str, profile: Optional[Profile] = None) -> bool:
+        """Determine if a string ends with a member of the language recognized by the FSA.
+
+        Parameters
+        ----------
+        string : str
+            The string to run through the FSA
+        profile : Optional[Profile]
+            Counters of the work done, see FSA.enable_profiling, or None to count nothing
+
+        Returns
+        -------
+        bool
+            Whether or not the FSA recognizes the string in endswith mode
+        """
+
+        # The string ends with a member of the language if any run, including the run of the empty
+        # suffix that starts after the last symbol, is in an accept state at the end of the string
+        search_table, search_final = self.search_table, self.search_final
+        search_universal = self.search_universal
+        num_columns, symbol_index, other = self.num_columns, self.symbol_index, self.other
+
+        # Every run rejects on a symbol outside of live_symbols, so only the runs that start after
+        # the last such symbol matter, and those are never stopped by a symbol outside of the
+        # alphabet once they accept every string of live_symbols
+        match = self.last_dead_symbol.match(string)
+        if match is not None:
+            string = string[match.end() :]
+
+        search_state = self.search_start
+        if search_final[search_state] and (
+            search_universal[search_state] or self._find_search_universal(search_state)
+        ) == 2:
+            return True
+        flushes = self.search_flushes
+        symbols: Iterator[str] = iter(string)
+        if profile is not None:
+            symbols = profile.count_runs(symbols, self.search_sets[search_state], "D2")
+        for symbol in symbols:
+            column = symbol_index.get(symbol, other)
+            next_state = search_table[search_state * num_columns + column]
+            if next_state < 0:
+                next_state = self._expand_search_state(search_state, column)
+                if self.search_thrashing and self.search_flushes != flushes:
+                    # The cache thrashes on this string, so the rest of it is run without it
+                    live_states, _ = self._run_live_runs(
+                        self.search_sets[next_state], map(symbol_index.get, symbols, repeat(other)),
+                        "D2",
+                    )
+                    return any(self.final[state] for state in live_states)
+            search_state = next_state
+            if search_final[search_state]:
+                universal = search_universal[search_state] or self._find_search_universal(
+                    search_state
+                )
+                if universal == 2:
+                    return True
+
+        return bool(search_final[search_state])
+
+    def recognize_substring(self, string: str, profile: Optional[Profile] = None) -> bool:
+        """Determine if a string contains a member of the language recognized by the FSA.
+
+        Parameters
+        ----------
+        string : str
+            The string to run through the FSA
+        profile : Optional[Profile]
+            Counters of the work done, see FSA.enable_profiling, or None to count nothing
+
+        Returns
+        -------
+        bool
+            Whether or not the FSA recognizes the string in substring mode
+        """
+
+        # If the empty string is in the language, the start state is final and we return right
+        # away, and if the language is empty, there is nothing to find
+        if self.search_final[self.search_start]:
+            return True
+        if self.stops[self.start] == 1:
+            return False
+
+        # Every member of the language contains the required factor and no symbol outside of
+        # live_symbols, so only the stretches between such symbols around a native regex hit of
+        # the factor are run through the automaton
+        prefilter = self.prefilter
+        if prefilter is None:
+            return self._scan_substring(string, profile)
+        scanned = 0
+        hit = prefilter.search(string)
+        while hit is not None:
+            dead = self.last_dead_symbol.match(string, scanned, hit.start())
+            start = scanned if dead is None else dead.end()
+            dead = self.dead_symbol.search(string, hit.end())
+            stop = len(string) if dead is None else dead.start()
+            if self._scan_substring(string[start:stop], profile):
+                return True
+            scanned = stop
+            hit = prefilter.search(string, stop)
+        return False
+
+    def _scan_substring(self, string: str, profile: Optional[Profile] = None) -> bool:
+        """Run a string through the "Σ* · L" automaton in substring mode, without a prefilter.
+
+        Parameters
+        ----------
+        string : str
+            The string to run through the FSA
+        profile : Optional[Profile]
+            Counters of the work done, see FSA.enable_profiling, or None to count nothing
+
+        Returns
+        -------
+        bool
+            Whether or not the FSA recognizes the string in substring mode
+        """
+
+        # In substring mode, we return True if any run reaches an accept state at any point
+        search_table, search_final = self.search_table, self.search_final
+        num_columns, symbol_index, other = self.num_columns, self.symbol_index, self.other
+
+        search_state = self.search_start
+        if search_final[search_state]:
+            return True
+        flushes = self.search_flushes
+        symbols: Iterator[str] = iter(string)
+        if profile is not None:
+            symbols = profile.count_runs(symbols, self.search_sets[search_state], "D3")
+        for symbol in symbols:
+            column = symbol_index.get(symbol, other)
+            next_state = search_table[search_state * num_columns + column]
+            if next_state < 0:
+                next_state = self._expand_search_state(search_state, column)
+                if self.search_thrashing and self.search_flushes != flushes:
+                    # The cache thrashes on this string, so the rest of it is run without it
+                    _, found = self._run_live_runs(
+                        self.search_sets[next_state], map(symbol_index.get, symbols, repeat(other)),
+                        "D3",
+                    )
+                    return found
+            search_state = next_state
+            if search_final[search_state]:
+                return True
+
+        return False
+
+    def recognize_many(self, strings: Sequence[str], mode: str = "D1") -> np.ndarray:
+        """Run a batch of strings through the FSA at once.
+
+        The batch is encoded into a matrix of columns, padded with a column that leaves every
+            state unchanged, and every string is stepped forward together with one vectorized
+            gather per column of the matrix. Endswith and substring modes run the "Σ* · L"
+            automaton, building only the transitions that the strings of the batch take before
+            every gather.
+
+        Parameters
+        ----------
+        strings : Sequence[str]
+            The strings to run through the FSA
+        mode : str
+            The task to perform, one of {'D1', 'D2', 'D3'}
+
+        Returns
+        -------
+        np.ndarray
+            Boolean array, where element <i> is whether or not the FSA recognizes strings[<i>]
+        """
+
+        if np is None:
+            raise ImportError("recognize_many requires NumPy, which is not installed.")
+        _check_mode(mode)
+
+        matrix = self._encode_many(strings)
+        if mode == "D1":
+            table, final = self._numpy_tables(self.table, self.final, self.num_states)
+            states = np.full(len(strings), self.start, dtype=table.dtype)
+            for column in matrix.T:
+                states = table[states, column]
+            return final[states]
+
+        states = np.full(len(strings), self.search_start, dtype=np.int64)
+        accepted = self._search_final_many(states)
+        for column in matrix.T:
+            states = self._search_step_many(states, column)
+            if states is None:
+                # The batch took more transitions than the cache holds, and the states of its
+                # runs were forgotten, so every string is run on its own
+                recognize = self.recognize_endswith if mode == "D2" else self.recognize_substring
+                return np.fromiter(map(recognize, strings), dtype=bool, count=len(strings))
+            if mode == "D3":
+                accepted |= self._search_final_many(states)
+
+        if mode == "D3":
+            return accepted
+        return self._search_final_many(states)
+
+    def _search_step_many(self, states: np.ndarray, columns: np.ndarray) -> Optional[np.ndarray]:
+        """Step a batch of runs of the "Σ* · L" automaton forward by one symbol each, building
+            the transitions they take that are not built yet.
+
+        Parameters
+        ----------
+        states : np.ndarray
+            Current state of the "Σ* · L" automaton of every run
+        columns : np.ndarray
+            Column of the symbol read by every run, where the padding column leaves the run in
+                its state
+
+        Returns
+        -------
+        Optional[np.ndarray]
+            Next state of the "Σ* · L" automaton of every run, or None if the cache was flushed
+                while building the transitions
+        """
+
+        padded = columns == self.num_columns
+        index = states * self.num_columns + np.where(padded, 0, columns)
+        # The table grows as transitions are built, so it is viewed anew after every change
+        next_states = np.frombuffer(self.search_table, dtype=self.search_table.typecode)[index]
+        next_states[padded] = states[padded]
+
+        missing = np.flatnonzero(next_states < 0)
+        if len(missing):
+            pairs = set(zip(states[missing].tolist(), columns[missing].tolist()))
+            flushes = self.search_flushes
+            for search_state, column in pairs:
+                self._expand_search_state(search_state, column)
+                if self.search_flushes != flushes:
+                    return None
+            search_table = np.frombuffer(self.search_table, dtype=self.search_table.typecode)
+            next_states[missing] = search_table[index[missing]]
+        return next_states
+
+    def _search_final_many(self, states: np.ndarray) -> np.ndarray:
+        """Whether or not every state of a batch of states of the "Σ* · L" automaton is final."""
+
+        return np.frombuffer(self.search_final, dtype=np.uint8)[states].astype(bool)
+
+    def recognize_shared_prefixes(self, strings: Sequence[str], mode: str = "D1") -> List[bool]:
+        """Run a batch of strings through the FSA, walking every prefix they share only once.
+
+        The strings are visited in sorted order, which is a depth-first walk of their trie. The
+            state after every prefix of the previous string is kept on a stack, so each string
+            resumes from the end of the prefix it shares with the previous one, and the work is
+            proportional to the size of the trie rather than the total length of the strings.
+            Shared prefixes are measured with native slice comparisons.
+
+        Parameters
+        ----------
+        strings : Sequence[str]
+            The strings to run through the FSA
+        mode : str
+            The task to perform, one of {'D1', 'D2', 'D3'}
+
+        Returns
+        -------
+        List[bool]
+            Whether or not the FSA recognizes every string, in the order of strings
+        """
+
+        _check_mode(mode)
+        num_columns, symbol_index, other = self.num_columns, self.symbol_index, self.other
+        if mode == "D1":
+            # Member mode walks the FSA, and stops at a state that can never accept
+            table, final, stops = self.table, self.final, self.stops
+            path = [self.start]
+            stopped = bool(stops[self.start] == 1)
+        else:
+            # Endswith and substring modes walk the "Σ* · L" automaton, where substring mode stops
+            # once it found a member of the language. The path holds the sets of live runs rather
+            # than the states, which are forgotten when the cache is flushed.
+            table, final, search_sets = self.search_table, self.search_final, self.search_sets
+            path = [search_sets[self.search_start]]
+            stopped = mode == "D3" and bool(final[self.search_start])
+
+        results = [False] * len(strings)
+        previous = ""
+        for index in sorted(range(len(strings)), key=strings.__getitem__):
+            string = strings[index]
+            # The path holds the states after the prefixes of the previous string, up to where it
+            # stopped, and this string stops there too if it shares the whole path
+            depth = _common_prefix_length(previous, string)
+            if not stopped or depth < len(path) - 1:
+                del path[depth + 1 :]
+                stopped = False
+                state = path[-1] if mode == "D1" else self._search_state_of(path[-1])
+                for symbol in string[depth:]:
+                    column = symbol_index.get(symbol, other)
+                    if mode == "D1":
+                        state = table[state * num_columns + column]
+                        stopped = stops[state] == 1
+                        path.append(state)
+                    else:
+                        next_state = table[state * num_columns + column]
+                        if next_state < 0:
+                            next_state = self._expand_search_state(state, column)
+                        state = next_state
+                        stopped = mode == "D3" and bool(final[state])
+                        path.append(search_sets[state])
+                    if stopped:
+                        break
+            # A path stopped in member mode ends in a state that is not final, and a path stopped
+            # in substring mode ends in a final state
+            if mode == "D1":
+                results[index] = bool(final[path[-1]])
+            else:
+                results[index] = bool(final[self._search_state_of(path[-1])])
+            previous = string
+
+        return results
+
+    def recognize_bytes(
+        self, data: BytesLike, mode: str = "D1", profile: Optional[Profile] = None
+    ) -> bool:
+        """Run a bytes-like object, such as a memory-mapped file, through the FSA.
+
+        The data is never decoded. Every byte is read as the symbol with the same code point, so
+            ASCII input is recognized exactly as the equivalent str. The data is read in blocks of
+            byte_block_size bytes, which are translated to columns of the table in C. Once the
+            answer can only change on a symbol outside of live_symbols, the rest of the blocks are
+            only searched for one in C.
+
+        Parameters
+        ----------
+        data : BytesLike
+            The bytes, bytearray, memoryview, or mmap to run through the FSA
+        mode : str
+            The task to perform, one of {'D1', 'D2', 'D3'}
+        profile : Optional[Profile]
+            Counters of the work done, see FSA.enable_profiling, or None to count nothing
+
+        Returns
+        -------
+        bool
+            Whether or not the FSA recognizes the data in the given mode
+        """
+
+        _check_mode(mode)
+        table, final, stops, other = self.table, self.final, self.stops, self.other
+        num_columns = self.num_columns
+        blocks = self._byte_blocks(data)
+
+        if mode == "D3":
+            # Substring mode stops once a run reaches an accept state
+            if stops[self.start] == 1:
+                return False
+            columns = chain.from_iterable(blocks)
+            live_states = frozenset((self.start,))
+            if profile is not None:
+                columns = profile.count_runs(columns, live_states, mode)
+            _, found = self._run_search(columns, live_states, mode)
+            return found
+
+        if mode == "D2":
+            live_states = frozenset((self.start,))
+            universal = False
+            for columns in blocks:
+                # Every run rejects on a symbol outside of live_symbols, so only the runs that
+                # start after the last one matter, and once a run accepts every string of
+                # live_symbols, only such a symbol can change the answer
+                last = self._rfind_dead_column(columns)
+                if last >= 0:
+                    live_states, universal = frozenset((self.start,)), False
+                    columns = columns[last + 1 :]
+                if not universal:
+                    if profile is not None:
+                        columns = profile.count_runs(columns, live_states, mode)
+                    live_states, _ = self._run_search(columns, live_states, mode)
+                    universal = any(stops[state] == 2 for state in live_states)
+            return any(final[state] for state in live_states)
+
+        # Member mode stops once the FSA rejects, can never accept, or accepts every string of
+        # live_symbols, when only a symbol outside of live_symbols in the rest of the data can
+        # make it reject
+        state = self.start
+        columns: Iterable[int] = b""
+        if stops[state]:
+            pass
+        elif profile is None:
+            for columns in blocks:
+                for column in columns:
+                    state = table[state * num_columns + column]
+                    if stops[state]:
+                        break
+                else:
+                    continue
+                break
+        else:
+            # The chain holds the rest of the data for the check below
+            columns = chain.from_iterable(blocks)
+            state = profile.step_member(state, columns)
+        if stops[state] == 1:
+            return False
+        if stops[state] == 2:
+            # No such symbol came before the state, since the FSA would have rejected
+            return other not in columns and not any(other in columns for columns in blocks)
+        return bool(final[state])
+
+    def _byte_blocks(self, data: BytesLike) -> Iterator[Sequence[int]]:
+        """Translate a bytes-like object to columns of the table, one block at a time.
+
+        Parameters
+        ----------
+        data : BytesLike
+            The bytes, bytearray, memoryview, or mmap to translate
+
+        Yields
+        ------
+        Sequence[int]
+            The columns of the next block of bytes
+        """
+
+        for start in range(0, len(data), self.byte_block_size):
+            block = bytes(data[start : start + self.byte_block_size])
+            if self.byte_columns is not None:
+                yield block.translate(self.byte_columns)
+            else:
+                yield [self.byte_column_list[byte] for byte in block]
+
+    def recognize_parallel(
+        self,
+        data: Union[str, BytesLike],
+        mode: str = "D1",
+        workers: Optional[int] = None,
+        chunk_size: int = 1 << 22,
+    ) -> bool:
+        """Run a large input through the FSA using a pool of worker processes.
+
+        The input is split into chunks and every chunk is scanned by a worker into its transition
+            mapping: the state of the FSA reached at the end of the chunk from every state at its
+            start. Workers track the runs from all states at once and merge runs as soon as they
+            enter the same state, so a chunk usually costs little more than a sequential scan of
+            it. In endswith and substring modes, workers also run the "Σ* · L" automaton over the
+            chunk from its start state, which finds the runs that start inside the chunk.
+
+        The results are then composed in order. The set of live runs at the end of a chunk is the
+            image of the live runs at its start through the mapping, along with the runs that
+            start inside the chunk, which gives exactly the runs a sequential scan would track,
+            and never needs more than the states of the FSA.
+
+        Parameters
+        ----------
+        data : Union[str, BytesLike]
+            The string or bytes-like object to run through the FSA, where every byte is read as the
+                symbol with the same code point
+        mode : str
+            The task to perform, one of {'D1', 'D2', 'D3'}
+        workers : Optional[int]
+            Number of worker processes, by default the number of CPUs
+        chunk_size : int
+            Number of symbols scanned by a worker at once
+
+        Returns
+        -------
+        bool
+            Whether or not the FSA recognizes the input in the given mode
+        """
+
+        _check_mode(mode)
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(data) <= chunk_size:
+            if not isinstance(data, str):
+                return self.recognize_bytes(data, mode)
+            if mode == "D1":
+                return self.recognize_member(data)
+            if mode == "D2":
+                return self.recognize_endswith(data)
+            return self.recognize_substring(data)
+
+        runs = frozenset((self.start,))
+        found = mode == "D3" and bool(self.final[self.start])
+
+        chunks = (data[start : start + chunk_size] for start in range(0, len(data), chunk_size))
+        with ProcessPoolExecutor(workers, initializer=_init_scan_worker, initargs=(self,)) as pool:
+            # Bound the number of chunks in flight so memory use does not depend on input length
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(_scan_chunk, chunk, mode))
+                if len(pending) < 2 * workers:
+                    continue
+                runs, found = self._compose(pending.popleft().result(), runs, found)
+                # In substring mode, the rest of the input cannot change the answer
+                if found and mode == "D3":
+                    break
+            while pending and not (found and mode == "D3"):
+                runs, found = self._compose(pending.popleft().result(), runs, found)
+            for future in pending:
+                future.cancel()
+
+        if mode == "D3":
+            return found
+        return any(self.final[state] for state in runs)
+
+    def _compose(
+        self,
+        scan: Tuple[array, bytearray, FrozenSet[int], bool],
+        runs: FrozenSet[int],
+        found: bool,
+    ) -> Tuple[FrozenSet[int], bool]:
+        """Apply the result of scanning a chunk to the live runs before the chunk.
+
+        Parameters
+        ----------
+        scan : Tuple[array, bytearray, FrozenSet[int], bool]
+            Result of scanning the chunk, see scan_chunk
+        runs : FrozenSet[int]
+            States of the runs that have not rejected before the chunk
+        found : bool
+            Whether or not a run entered a final state before the chunk
+
+        Returns
+        -------
+        Tuple[FrozenSet[int], bool]
+            States of the runs that have not rejected after the chunk, and whether or not a run
+                entered a final state so far
+        """
+
+        ends, entered_final, chunk_runs, chunk_found = scan
+        found = found or chunk_found or any(entered_final[state] for state in runs)
+        runs = frozenset(ends[state] for state in runs if ends[state] != self.dead)
+        return runs | chunk_runs, found
+
+    def scan_chunk(
+        self, chunk: Union[str, BytesLike], mode: str = "D1"
+    ) -> Tuple[array, bytearray, FrozenSet[int], bool]:
+        """Compute the transition mapping of one chunk of the input.
+
+        Parameters
+        ----------
+        chunk : Union[str, BytesLike]
+            The chunk of the input
+        mode : str
+            The task to perform, one of {'D1', 'D2', 'D3'}
+
+        Returns
+        -------
+        Tuple[array, bytearray, FrozenSet[int], bool]
+            State of the FSA reached at the end of the chunk from every state, whether or not a
+                final state was entered inside the chunk from every state, and in endswith and
+                substring modes, the states of the runs that start inside the chunk and have not
+                rejected at its end, and whether or not one of them entered a final state. A run
+                that can no longer change the answer is not followed to the end of the chunk: it
+                ends in the dead state if it can never accept, and in a state accepting every
+                string of live_symbols if it entered one, while in substring mode a run that
+                entered a final state ends in the dead state
+        """
+
+        table, final, num_columns = self.table, self.final, self.num_columns
+        num_states, dead = self.num_states, self.dead
+
+        if isinstance(chunk, str):
+            columns = [self.symbol_index.get(symbol, self.other) for symbol in chunk]
+        elif self.byte_columns is not None:
+            columns = b"".join(self._byte_blocks(chunk))
+        else:
+            columns = list(chain.from_iterable(self._byte_blocks(chunk)))
+
+        chunk_runs: FrozenSet[int] = frozenset()
+        chunk_found = False
+        if mode == "D2":
+            # Every run rejects on a symbol outside of live_symbols, so only the runs that start
+            # after the last one matter
+            last = self._rfind_dead_column(columns)
+            search_columns = columns[last + 1 :] if last >= 0 else columns
+            chunk_runs, chunk_found = self._run_search(
+                search_columns, frozenset((self.start,)), mode
+            )
+        elif mode == "D3":
+            chunk_runs, chunk_found = self._run_search(columns, frozenset((self.start,)), mode)
+            if chunk_found:
+                # The rest of the input cannot change the answer, so the mapping is not needed
+                return array("l", [dead]) * num_states, bytearray(num_states), frozenset(), True
+
+        # Runs are grouped by their current state, where runs[<state>] lists the states the runs
+        # started in, and runs that can no longer change are settled right away. A run that can
+        # never accept is dropped, like a run that rejected. In substring mode, a run that enters
+        # a final state found a member of the language, even if it rejects later in the chunk.
+        # Otherwise, a run in a state accepting every string of live_symbols stays in such a
+        # state unless the chunk holds a symbol outside of live_symbols, none of which occurred
+        # before the run entered the state, since it would have rejected.
+        stops = self.stops
+        track_final = mode == "D3"
+        has_dead = not track_final and self.other in columns
+        runs: Dict[int, List[int]] = {}
+        settled: List[int] = []
+        finished: List[Tuple[int, List[int]]] = []
+        for state in range(num_states):
+            if stops[state] == 2 and not track_final:
+                if not has_dead:
+                    finished.append((state, [state]))
+            elif stops[state] != 1:
+                runs[state] = [state]
+
+        columns = iter(columns)
+        while len(runs) > 1:
+            column = next(columns, None)
+            if column is None:
+                break
+            next_runs: Dict[int, List[int]] = {}
+            for state, starts in runs.items():
+                state = table[state * num_columns + column]
+                if stops[state] == 1:
+                    continue
+                if track_final and final[state]:
+                    settled.extend(starts)
+                    continue
+                if stops[state] == 2:
+                    if not has_dead:
+                        finished.append((state, starts))
+                    continue
+                merged = next_runs.get(state)
+                if merged is None:
+                    next_runs[state] = starts
+                elif len(merged) >= len(starts):
+                    merged.extend(starts)
+                else:
+                    starts.extend(merged)
+                    next_runs[state] = starts
+            runs = next_runs
+
+        # Once a single group of runs is left, the rest of the chunk is a sequential scan
+        if len(runs) == 1:
+            state, starts = runs.popitem()
+            for column in columns:
+                state = table[state * num_columns + column]
+                if stops[state] or (track_final and final[state]):
+                    break
+            if track_final and final[state]:
+                settled.extend(starts)
+            elif stops[state] == 2:
+                if not has_dead:
+                    finished.append((state, starts))
+            elif stops[state] != 1:
+                runs[state] = starts
+
+        ends = array("l", [dead]) * num_states
+        for state, starts in chain(runs.items(), finished):
+            for start in starts:
+                ends[start] = state
+        entered = bytearray(num_states)
+        for start in settled:
+            entered[start] = 1
+        return ends, entered, chunk_runs, chunk_found
+
+    def _rfind_dead_column(self, columns: Sequence[int]) -> int:
+        """Find the last symbol outside of live_symbols in columns of the input.
+
+        Parameters
+        ----------
+        columns : Sequence[int]
+            Columns of the symbols of the input, as bytes or a list
+
+        Returns
+        -------
+        int
+            Position of the last symbol in the column of the symbols outside of the alphabet, or
+                -1 if there is none
+        """
+
+        if isinstance(columns, (bytes, bytearray)):
+            return columns.rfind(self.other)
+        if self.other not in columns:
+            return -1
+        return len(columns) - 1 - columns[::-1].index(self.other)
+
+    def _numpy_tables(
+        self, table: array, final: bytearray, num_states: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Convert a flat transition table and final state map to NumPy arrays.
+
+        Parameters
+        ----------
+        table : array
+            Flat transition table with num_columns columns
+        final : bytearray
+            Final state map
+        num_states : int
+            Number of rows of the transition table
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            Transition table of shape (num_states, num_columns + 1), whose last column is the
+                padding column, and boolean final state map
+        """
+
+        dense = np.empty((num_states, self.num_columns + 1), dtype=np.int32)
+        dense[:, :-1] = np.asarray(table).reshape(num_states, -1)
+        dense[:, -1] = np.arange(num_states)
+        return dense, np.frombuffer(final, dtype=np.uint8).astype(bool)
+
+    def _encode_many(self, strings: Sequence[str]) -> np.ndarray:
+        """Encode a batch of strings into a padded matrix of columns.
+
+        Parameters
+        ----------
+        strings : Sequence[str]
+            The strings to encode
+
+        Returns
+        -------
+        np.ndarray
+            Matrix of shape (len(strings), <longest length>), where element [<i>, <j>] is the column
+                of strings[<i>][<j>], or the padding column past the end of strings[<i>]
+        """
+
+        lengths = np.fromiter(map(len, strings), dtype=np.int64, count=len(strings))
+        width = int(lengths.max()) if len(strings) else 0
+        matrix = np.full((len(strings), width), self.num_columns, dtype=np.int32)
+
+        # Map the code points of every symbol in the batch to columns with one lookup table, where
+        # the last entry is the column of every code point past the largest symbol in the alphabet
+        codes = np.frombuffer("".join(strings).encode("utf-32-le"), dtype=np.uint32)
+        lookup = np.frombuffer(self.code_columns, dtype=np.int32)
+        columns = lookup[np.minimum(codes, len(lookup) - 1)]
+
+        matrix[np.arange(width) < lengths[:, None]] = columns
+        return matrix
+
+    def finditer(self, string: str, policy: str = "leftmost-longest") -> Iterator[Tuple[int, int]]:
+        """Find the members of the language inside a string in a single left-to-right pass.
+
+        Every run of the FSA started at an earlier position that has not rejected yet is tracked,
+            and runs that enter the same state are merged, so the cost per symbol is bounded by the
+            number of states rather than the length of the string.
+
+        With the leftmost-longest policy, the spans do not overlap: from where the previous span
+            ends, the span that starts first is chosen, and among those the longest one. As with
+            re.finditer, an empty span is reported only where no longer span starts, and never
+            right after another empty span. With the overlapping policy, every span of the string
+            that is a member of the language is reported, ordered by end and then by start.
+
+        Parameters
+        ----------
+        string : str
+            The string to search
+        policy : str
+            One of {'leftmost-longest', 'overlapping'}
+
+        Yields
+        ------
+        Tuple[int, int]
+            The start and end of a span, such that string[<start>:<end>] is a member of the
+                language
+        """
+
+        if policy == "leftmost-longest":
+            return self._finditer_leftmost_longest(string)
+        if policy == "overlapping":
+            return self._finditer_overlapping(string)
+        raise ValueError(
+            f"The policy {policy} was not recognized. The policy should be in: "
+            "{'leftmost-longest', 'overlapping'}."
+        )
+
+    def _finditer_leftmost_longest(self, string: str) -> Iterator[Tuple[int, int]]:
+        """Find the non-overlapping leftmost-longest members of the language inside a string.
+
+        Whether a match can be reported may depend on symbols far ahead, when an earlier run is
+            still alive and could produce a match that starts before it. The matches that would
+            follow it are therefore found in the same pass and kept as a chain of levels, where
+            every level holds the pending match of the part of the string after the pending match
+            of the previous level. Runs in the same state are merged across levels, keeping the
+            first start, since that run produces the same matches and replaces an earlier pending
+            match first, so the cost per symbol is bounded by the number of states.
+
+        Parameters
+        ----------
+        string : str
+            The string to search
+
+        Yields
+        ------
+        Tuple[int, int]
+            The start and end of a span
+        """
+
+        table, final, num_columns, dead = self.table, self.final, self.num_columns, self.dead
+        symbol_index, other, coaccessible = self.symbol_index, self.other, self.coaccessible
+        start_state = self.start
+        can_start = coaccessible[start_state]
+
+        # Runs by current state, where runs[<state>] is the first start of the runs in <state>
+        runs: Dict[int, int] = {}
+        # Level <i> holds the runs that start at bounds[<i>] or later, up to the next level, and
+        # its pending match pending[<i>], where only the last level has no pending match. Levels
+        # before head were already reported.
+        bounds: List[int] = [0]
+        pending: List[Optional[Tuple[int, int]]] = [None]
+        head = 0
+        position = 0
+        while True:
+            if can_start and position >= bounds[-1]:
+                runs.setdefault(start_state, position)
+
+            # The final run with the first start replaces the pending match of its level, and
+            # the runs that start after it and the later levels overlap the new match
+            first = min((start for state, start in runs.items() if final[state]), default=None)
+            if first is not None:
+                level = bisect_right(bounds, first, head) - 1
+                pending[level] = (first, position)
+                del bounds[level + 1 :], pending[level + 1 :]
+                runs = {state: start for state, start in runs.items() if start <= first}
+                bound = position if position > first else position + 1
+                bounds.append(bound)
+                pending.append(None)
+                if can_start and position >= bound:
+                    runs.setdefault(start_state, position)
+                    # An empty match right after the new match is pending until a longer one
+                    if final[start_state]:
+                        pending[-1] = (position, position)
+                        bounds.append(position + 1)
+                        pending.append(None)
+
+            if position == len(string):
+                while pending[head] is not None:
+                    yield pending[head]
+                    head += 1
+                return
+
+            # A pending match is reported once no run can replace it
+            first = min(runs.values(), default=position)
+            while pending[head] is not None and first >= bounds[head + 1]:
+                yield pending[head]
+                head += 1
+            if head > 64 and 2 * head > len(bounds):
+                del bounds[:head], pending[:head]
+                head = 0
+
+            column = symbol_index.get(string[position], other)
+            next_runs: Dict[int, int] = {}
+            for state, start in runs.items():
+                state = table[state * num_columns + column]
+                # Runs that rejected, or can no longer reach a final state, are dropped
+                if state != dead and coaccessible[state]:
+                    if start < next_runs.get(state, start + 1):
+                        next_runs[state] = start
+            runs = next_runs
+            position += 1
+
+    def _finditer_overlapping(self, string: str) -> Iterator[Tuple[int, int]]:
+        """Find every span of a string that is a member of the language.
+
+        Parameters
+        ----------
+        string : str
+            The string to search
+
+        Yields
+        ------
+        Tuple[int, int]
+            The start and end of a span, ordered by end and then by start
+        """
+
+        table, final, num_columns, dead = self.table, self.final, self.num_columns, self.dead
+        symbol_index, other, coaccessible = self.symbol_index, self.other, self.coaccessible
+
+        # Runs by current state, where runs[<state>] lists the starts of the runs in <state>
+        runs: Dict[int, List[int]] = {}
+        for position in range(len(string) + 1):
+            if coaccessible[self.start]:
+                runs.setdefault(self.start, []).append(position)
+            starts = [start for state, run in runs.items() if final[state] for start in run]
+            for start in sorted(starts):
+                yield start, position
+
+            if position == len(string):
+                return
+
+            column = symbol_index.get(string[position], other)
+            next_runs: Dict[int, List[int]] = {}
+            for state, run in runs.items():
+                state = table[state * num_columns + column]
+                # Runs that rejected, or can no longer reach a final state, are dropped
+                if state != dead and coaccessible[state]:
+                    next_runs.setdefault(state, []).extend(run)
+            for run in next_runs.values():
+                run.sort()
+            runs = next_runs
+
+    def _add_search_state(self, live_states: FrozenSet[int]) -> int:
+        """Add a state to the "Σ* · L" automaton, with its transitions not yet computed.
+
+        Parameters
+        ----------
+        live_states : FrozenSet[int]
+            The set of live runs represented by the new state
+
+        Returns
+        -------
+        int
+            The new state of the "Σ* · L" automaton
+        """
+
+        search_state = len(self.search_sets)
+        self.search_sets.append(live_states)
+        self.search_index[live_states] = search_state
+        self.search_table.extend([-1] * self.num_columns)
+        self.search_final.append(any(self.final[state] for state in live_states))
+        self.search_universal.append(0)
+        self.search_cache_used += len(live_states) + self.num_columns
+        return search_state
+
+    def _flush_search_states(self) -> None:
+        """Forget every state of the "Σ* · L" automaton, and add its start state back.
+
+        The containers are cleared in place, so local references to them held by a running scan
+            stay valid, although the states it holds do not.
+        """
+
+        # States that were seldom returned to before the cache filled up will not be reused either
+        self.search_thrashing = self._search_returns * 8 < len(self.search_sets)
+        self.search_flushes += 1
+        self._search_returns = 0
+        self.search_cache_used = 0
+        del self.search_sets[:]
+        self.search_index.clear()
+        del self.search_table[:]
+        del self.search_final[:]
+        del self.search_universal[:]
+        self.search_start = self._add_search_state(frozenset((self.start,)))
+
+    def _search_state_of(self, live_states: FrozenSet[int]) -> int:
+        """Find the state of the "Σ* · L" automaton of a set of live runs, adding it if needed.
+
+        Adding a state to a full cache flushes it first, see search_cache_size.
+
+        Parameters
+        ----------
+        live_states : FrozenSet[int]
+            The set of live runs
+
+        Returns
+        -------
+        int
+            The state of the "Σ* · L" automaton representing the set of live runs
+        """
+
+        search_state = self.search_index.get(live_states)
+        if search_state is not None:
+            return search_state
+        size = len(live_states) + self.num_columns
+        if self.search_cache_used + size > self.search_cache_size and len(self.search_sets) > 1:
+            self._flush_search_states()
+            search_state = self.search_index.get(live_states)
+            if search_state is not None:
+                return search_state
+        return self._add_search_state(live_states)
+
+    def _find_search_universal(self, search_state: int) -> int:
+        """Compute and store whether a run of a state of the "Σ* · L" automaton accepts every
+            string of live_symbols.
+
+        Parameters
+        ----------
+        search_state : int
+            State of the "Σ* · L" automaton
+
+        Returns
+        -------
+        int
+            2 if a run accepts every string of live_symbols and 1 otherwise
+        """
+
+        stops = self.stops
+        universal = 2 if any(stops[state] == 2 for state in self.search_sets[search_state]) else 1
+        self.search_universal[search_state] = universal
+        return universal
+
+    def _step_runs(self, live_states: FrozenSet[int], column: int) -> FrozenSet[int]:
+        """Advance every live run by one symbol and start a new run at the following position.
+
+        Parameters
+        ----------
+        live_states : FrozenSet[int]
+            The set of live runs
+        column : int
+            Column of the symbol on the tape
+
+        Returns
+        -------
+        FrozenSet[int]
+            The set of live runs after the symbol
+        """
+
+        table, num_columns, stops = self.table, self.num_columns, self.stops
+        next_states = {self.start}
+        for state in live_states:
+            next_states.add(table[state * num_columns + column])
+        # Runs that rejected or can never accept are dropped
+        return frozenset(state for state in next_states if stops[state] != 1)
+
+    def _expand_search_state(self, search_state: int, column: int) -> int:
+        """Compute and store one transition of the "Σ* · L" automaton.
+
+        Reading a symbol advances every live run and starts a new run at the following position.
+            When the new state does not fit in the cache, the cache is flushed first, and the
+            transition out of the forgotten state is not stored.
+
+        Parameters
+        ----------
+        search_state : int
+            Current state of the "Σ* · L" automaton
+        column : int
+            Column of the symbol on the tape
+
+        Returns
+        -------
+        int
+            Next state of the "Σ* · L" automaton
+        """
+
+        self.search_expansions += 1
+        live_states = self._step_runs(self.search_sets[search_state], column)
+        next_state = self.search_index.get(live_states)
+        if next_state is not None:
+            self._search_returns += 1
+        else:
+            flushes = self.search_flushes
+            next_state = self._search_state_of(live_states)
+            if self.search_flushes != flushes:
+                return next_state
+        self.search_table[search_state * self.num_columns + column] = next_state
+        return next_state
+
+    def _run_search(
+        self, columns: Iterable[int], live_states: FrozenSet[int], mode: str
+    ) -> Tuple[FrozenSet[int], bool]:
+        """Run the "Σ* · L" automaton over columns of the input, from a set of live runs.
+
+        Substring mode stops at the first final state. Endswith mode stops once a run is in a
+            state accepting every string of live_symbols, since only a symbol outside of
+            live_symbols can change the answer after that, which callers check for. When the cache
+            is flushed while it thrashes, the rest of the input is run by stepping the set of live
+            runs directly, see _run_live_runs.
+
+        Parameters
+        ----------
+        columns : Iterable[int]
+            Columns of the symbols of the input
+        live_states : FrozenSet[int]
+            The set of live runs before the input
+        mode : str
+            The task to perform, one of {'D2', 'D3'}
+
+        Returns
+        -------
+        Tuple[FrozenSet[int], bool]
+            The set of live runs where the scan stopped, and whether or not a run entered a final
+                state on the way
+        """
+
+        search_table, search_final = self.search_table, self.search_final
+        search_universal = self.search_universal
+        num_columns = self.num_columns
+        search_state = self._search_state_of(live_states)
+        flushes = self.search_flushes
+        found = bool(search_final[search_state])
+        if found and (
+            mode == "D3"
+            or (search_universal[search_state] or self._find_search_universal(search_state)) == 2
+        ):
+            return live_states, found
+
+        columns = iter(columns)
+        for column in columns:
+            next_state = search_table[search_state * num_columns + column]
+            if next_state < 0:
+                next_state = self._expand_search_state(search_state, column)
+                if self.search_thrashing and self.search_flushes != flushes:
+                    live_states, rest_found = self._run_live_runs(
+                        self.search_sets[next_state], columns, mode
+                    )
+                    return live_states, found or rest_found
+            search_state = next_state
+            if search_final[search_state]:
+                found = True
+                if mode == "D3":
+                    break
+                universal = search_universal[search_state] or self._find_search_universal(
+                    search_state
+                )
+                if universal == 2:
+                    break
+
+        return self.search_sets[search_state], found
+
+    def _run_live_runs(
+        self, live_states: FrozenSet[int], columns: Iterable[int], mode: str
+    ) -> Tuple[FrozenSet[int], bool]:
+        """Run the input by stepping the set of live runs directly, without storing any state of
+            the "Σ* · L" automaton, for inputs on which its cache thrashes.
+
+        Parameters
+        ----------
+        live_states : FrozenSet[int]
+            The set of live runs before the input
+        columns : Iterable[int]
+            Columns of the symbols of the input
+        mode : str
+            The task to perform, one of {'D2', 'D3'}, where substring mode stops at the first
+                final state
+
+        Returns
+        -------
+        Tuple[FrozenSet[int], bool]
+            The set of live runs where the scan stopped, and whether or not a run entered a final
+                state on the way
+        """
+
+        accepting = frozenset(state for state in range(self.num_states) if self.final[state])
+        found = not live_states.isdisjoint(accepting)
+        if found and mode == "D3":
+            return live_states, found
+        for column in columns:
+            live_states = self._step_runs(live_states, column)
+            if not found and not live_states.isdisjoint(accepting):
+                found = True
+                if mode == "D3":
+                    break
+        return live_states, found
+
+
+class Recognizer:
+    """Recognizer that accepts its input in chunks, for streams too large to hold in memory.
+
+    The recognizer keeps only the current state of the FSA and the current set of live runs, of at
+        most one run per state. The states of the "Σ* · L" automaton built along the way are held
+        by the compiled FSA, which forgets them once they fill CompiledFSA.search_cache_size, so
+        memory use is bounded by the size of the FSA rather than by the length of the stream. How
+        the stream is split into chunks never changes the answer.
+
+    Attributes
+    ----------
+    compiled : CompiledFSA
+        Compiled form of the FSA
+    state : int
+        Current state of the FSA, or the dead state if the FSA rejected or can never accept
+    live_states : FrozenSet[int]
+        Current set of live runs, the state of the "Σ* · L" automaton, kept as a set since the
+            states of the automaton are forgotten when its cache is flushed. Once a run accepts
+            every string of live_symbols, the set is no longer stepped until a symbol outside of
+            live_symbols
+    found : bool
+        Whether or not a member of the language occurred anywhere in the input so far
+    length : int
+        Number of symbols read so far
+
+    Methods
+    -------
+    feed(chunk: str) -> None
+        Read the next chunk of the input
+    result(mode: str) -> bool
+        Whether or not the FSA recognizes the input read so far in the given mode
+    reset() -> None
+        Forget the input read so far
+
+    Examples
+    --------
+    >>> recognizer = Recognizer(FSA.from_file("./data/1-partial"))
+    >>> recognizer.feed("xa")
+    >>> recognizer.substring
+    False
+    >>> recognizer.feed("b")
+    >>> recognizer.substring
+    True
+    """
+
+    def __init__(self, fsa: FSA) -> None:
+        """Construct a recognizer that has not read any input yet.
+
+        Parameters
+        ----------
+        fsa : FSA
+            The FSA to run the stream through
+        """
+
+        self.compiled = fsa.compiled
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the input read so far."""
+
+        self.state = self.compiled.start
+        self.live_states = frozenset((self.compiled.start,))
+        self.found = bool(self.compiled.final[self.compiled.start])
+        self.length = 0
+
+    def feed(self, chunk: str) -> None:
+        """Read the next chunk of the input.
+
+        Parameters
+        ----------
+        chunk : str
+            The next chunk of the input
+        """
+
+        compiled = self.compiled
+        table, dead, num_columns = compiled.table, compiled.dead, compiled.num_columns
+        symbol_index, other, stops = compiled.symbol_index, compiled.other, compiled.stops
+
+        # The FSA stops once it rejects, can never accept, or accepts every string of
+        # live_symbols, when only a symbol outside of live_symbols can make it reject. No such
+        # symbol came before the FSA entered the state, since it would have rejected.
+        state = self.state
+        if not stops[state]:
+            for symbol in chunk:
+                state = table[state * num_columns + symbol_index.get(symbol, other)]
+                if stops[state]:
+                    break
+        if stops[state] == 1 or (stops[state] == 2 and compiled.dead_symbol.search(chunk)):
+            state = dead
+
+        if self.found:
+            live_states = self._run_endswith(chunk)
+        else:
+            # Substring mode stops at the first member of the language, and if there is one,
+            # endswith mode runs the chunk again
+            live_states, self.found = compiled._run_search(
+                map(symbol_index.get, chunk, repeat(other)), self.live_states, "D3"
+            )
+            if self.found:
+                live_states = self._run_endswith(chunk)
+
+        self.state, self.live_states = state, live_states
+        self.length += len(chunk)
+
+    def _run_endswith(self, chunk: str) -> FrozenSet[int]:
+        """Run a chunk in endswith mode, from the live runs at its start.
+
+        Parameters
+        ----------
+        chunk : str
+            The next chunk of the input
+
+        Returns
+        -------
+        FrozenSet[int]
+            The live runs at the end of the chunk, or any set of live runs including a run in a
+                state accepting every string of live_symbols if one entered such a state
+        """
+
+        compiled = self.compiled
+        symbol_index, other, stops = compiled.symbol_index, compiled.other, compiled.stops
+
+        # Every run rejects on a symbol outside of live_symbols, so only the runs that start after
+        # the last one matter, and once a run accepts every string of live_symbols, the rest of
+        # the chunk cannot change the answer
+        live_states = self.live_states
+        match = compiled.last_dead_symbol.match(chunk)
+        if match is not None:
+            live_states = frozenset((compiled.start,))
+            chunk = chunk[match.end() :]
+        if any(stops[state] == 2 for state in live_states):
+            return live_states
+        live_states, _ = compiled._run_search(
+            map(symbol_index.get, chunk, repeat(other)), live_states, "D2"
+        )
+        return live_states
+
+    @property
+    def member(self) -> bool:
+        """Whether or not the input read so far is a member of the language."""
+
+        return bool(self.compiled.final[self.state])
+
+    @property
+    def endswith(self) -> bool:
+        """Whether or not the input read so far ends with a member of the language."""
+
+        final = self.compiled.final
+        return any(final[state] for state in self.live_states)
+
+    @property
+    def substring(self) -> bool:
+        """Whether or not the input read so far contains a member of the language."""
+
+        return self.found
+
+    def result(self, mode: str = "D1") -> bool:
+        """Determine if the FSA recognizes the input read so far.
+
+        Parameters
+        ----------
+        mode : str
+            The task to perform, one of {'D1', 'D2', 'D3'}
+
+        Returns
+        -------
+        bool
+            Whether or not the FSA recognizes the input read so far in the given mode
+        """
+
+        if mode == "D1":
+            return self.member
+        if mode == "D2":
+            return self.endswith
+        _check_mode(mode)
+        return self.substring
+
+
+class FSASet:
+    """Many FSA combined into one product automaton, so an input is scanned only once.
+
+    Every state of the product automaton is the tuple of the current state of every FSA and of
+        every "Σ* · L" automaton, along with bitmasks of the FSA that accept in member mode and in
+        endswith mode there. The product automaton is built lazily like the "Σ* · L" automaton, so
+        only the tuples that actually occur in the input are built, and the cost per symbol is one
+        table lookup no matter how many FSA are combined. Like the "Σ* · L" automaton of
+        CompiledFSA, the states built so far are all forgotten once they fill
+        product_cache_size, and when few of the forgotten states were ever returned to, a scan
+        that flushes them steps every FSA on its own for the rest of its input.
+
+    Class Attributes
+    ----------------
+    product_cache_size : int
+        Largest size of the states of the product automaton kept at once, counted as the number
+            of FSA states and live runs in their tuples plus the number of entries in their rows of
+            the table
+
+    Attributes
+    ----------
+    names : List[str]
+        Names of the FSA, where bit <i> of a bitmask stands for names[<i>]
+    compiled : List[CompiledFSA]
+        Compiled form of every FSA
+    symbols : List[str]
+        Union of the alphabets of the FSA
+    symbol_index : Dict[str, int]
+        Column of every symbol in the union of the alphabets, where symbols in the same column of
+            every FSA share a column
+    other : int
+        Column of the symbols outside of every alphabet
+    num_columns : int
+        Number of columns, including the column of the symbols outside of every alphabet
+    column_maps : List[List[int]]
+        Column of every FSA, where column_maps[<i>][<column>] is the column of compiled[<i>]
+            holding the symbol of the column <column>
+    product_states : List[Tuple[Union[int, FrozenSet[int]], ...]]
+        States of the product automaton, where product_states[<state>] holds the state of every
+            FSA followed by the set of live runs of every "Σ* · L" automaton, which does not
+            depend on the cache of the automaton
+    product_index : Dict[Tuple[Union[int, FrozenSet[int]], ...], int]
+        State of the product automaton of every tuple in product_states
+    product_table : array
+        Transition function of the product automaton, where -1 is a transition not yet computed
+    member_masks : List[int]
+        Bitmask of the FSA that are in a final state, per state of the product automaton
+    search_masks : List[int]
+        Bitmask of the "Σ* · L" automata that are in a final state, per state of the product
+            automaton
+    product_start : int
+        Start state of the product automaton
+    product_flushes : int
+        Number of times the states of the product automaton were forgotten to stay within
+            product_cache_size
+    product_thrashing : bool
+        Whether or not the last flush found that few of the forgotten states were ever returned
+            to
+
+    Methods
+    -------
+    recognize(string: str) -> Dict[str, List[str]]
+        Determine which FSA recognize a string, in every mode at once
+
+    Examples
+    --------
+    >>> fsas = FSASet({"L1": FSA.from_regex("(ab)*"), "L3": FSA.from_regex("a*b*")})
+    >>> fsas.recognize("aab")
+    {'D1': ['L3'], 'D2': ['L1', 'L3'], 'D3': ['L1', 'L3']}
+    """
+
+    product_cache_size = 1 << 20
+
+    def __init__(self, fsas: Dict[str, FSA]) -> None:
+        """Combine many FSA, without building any state of the product automaton but the start.
+
+        Parameters
+        ----------
+        fsas : Dict[str, FSA]
+            The FSA to combine, by name
+        """
+
+        self.names = list(fsas)
+        self.compiled = [fsa.compiled for fsa in fsas.values()]
+        self.symbols = sorted(set().union(*(compiled.symbols for compiled in self.compiled)))
+
+        # A column of the product automaton per distinct tuple of the columns of every FSA
+        columns_of = {
+            symbol: tuple(
+                compiled.symbol_index.get(symbol, compiled.other) for compiled in self.compiled
+            )
+            for symbol in self.symbols
+        }
+        other_columns = tuple(compiled.other for compiled in self.compiled)
+        column_index: Dict[Tuple[int, ...], int] = {}
+        for columns in columns_of.values():
+            if columns != other_columns:
+                column_index.setdefault(columns, len(column_index))
+        self.other = len(column_index)
+        self.num_columns = len(column_index) + 1
+        column_index[other_columns] = self.other
+        self.symbol_index = {
+            symbol: column_index[columns] for symbol, columns in columns_of.items()
+        }
+        self.column_maps = [
+            [columns[index] for columns in column_index] for index in range(len(self.compiled))
+        ]
+
+        self.product_states: List[Tuple[Union[int, FrozenSet[int]], ...]] = []
+        self.product_index: Dict[Tuple[Union[int, FrozenSet[int]], ...], int] = {}
+        self.product_table = array("l")
+        self.member_masks: List[int] = []
+        self.search_masks: List[int] = []
+        self.product_cache_used = 0
+        self.product_flushes = 0
+        self.product_thrashing = False
+        # Number of transitions built into a state that was already in the cache
+        self._product_returns = 0
+        self._start_states = tuple(compiled.start for compiled in self.compiled) + tuple(
+            frozenset((compiled.start,)) for compiled in self.compiled
+        )
+        self.product_start = self._add_product_state(self._start_states)
+
+    def recognize(self, string: str) -> Dict[str, List[str]]:
+        """Determine which FSA recognize a string, in every mode at once.
+
+        Parameters
+        ----------
+        string : str
+            The string to run through every FSA
+
+        Returns
+        -------
+        Dict[str, List[str]]
+            Names of the FSA that recognize the string, per mode in {'D1', 'D2', 'D3'}
+        """
+
+        product_table, search_masks = self.product_table, self.search_masks
+        num_columns, symbol_index, other = self.num_columns, self.symbol_index, self.other
+
+        state = self.product_start
+        found = search_masks[state]
+        flushes = self.product_flushes
+        symbols = iter(string)
+        for symbol in symbols:
+            column = symbol_index.get(symbol, other)
+            next_state = product_table[state * num_columns + column]
+            if next_state < 0:
+                next_state = self._expand_product_state(state, column)
+                if self.product_thrashing and self.product_flushes != flushes:
+                    # The cache thrashes on this string, so the rest of it is run without it
+                    states = self.product_states[next_state]
+                    found |= search_masks[next_state]
+                    for symbol in symbols:
+                        states = self._step_product(states, symbol_index.get(symbol, other))
+                        found |= self._masks(states)[1]
+                    member_mask, search_mask = self._masks(states)
+                    return {
+                        "D1": self._names(member_mask),
+                        "D2": self._names(search_mask),
+                        "D3": self._names(found),
+                    }
+            state = next_state
+            found |= search_masks[state]
+
+        return {
+            "D1": self._names(self.member_masks[state]),
+            "D2": self._names(search_masks[state]),
+            "D3": self._names(found),
+        }
+
+    def _names(self, mask: int) -> List[str]:
+        """Names of the FSA in a bitmask."""
+
+        return [name for index, name in enumerate(self.names) if mask >> index & 1]
+
+    def _add_product_state(self, states: Tuple[Union[int, FrozenSet[int]], ...]) -> int:
+        """Add a state to the product automaton, with its transitions not yet computed.
+
+        Parameters
+        ----------
+        states : Tuple[Union[int, FrozenSet[int]], ...]
+            The state of every FSA followed by the set of live runs of every "Σ* · L" automaton
+
+        Returns
+        -------
+        int
+            The new state of the product automaton
+        """
+
+        member_mask, search_mask = self._masks(states)
+        product_state = len(self.product_states)
+        self.product_states.append(states)
+        self.product_index[states] = product_state
+        self.product_table.extend([-1] * self.num_columns)
+        self.member_masks.append(member_mask)
+        self.search_masks.append(search_mask)
+        self.product_cache_used += self._size(states)
+        return product_state
+
+    def _size(self, states: Tuple[Union[int, FrozenSet[int]], ...]) -> int:
+        """Size of a state of the product automaton counted against product_cache_size."""
+
+        count = len(self.compiled)
+        return count + sum(map(len, states[count:])) + self.num_columns
+
+    def _masks(self, states: Tuple[Union[int, FrozenSet[int]], ...]) -> Tuple[int, int]:
+        """Bitmasks of the FSA that accept in member mode and in endswith mode in a tuple of states.
+
+        Parameters
+        ----------
+        states : Tuple[Union[int, FrozenSet[int]], ...]
+            The state of every FSA followed by the set of live runs of every "Σ* · L" automaton
+
+        Returns
+        -------
+        Tuple[int, int]
+            Bitmask of the FSA in a final state, and of the "Σ* · L" automata in a final state
+        """
+
+        count = len(self.compiled)
+        member_mask = search_mask = 0
+        for index, compiled in enumerate(self.compiled):
+            if compiled.final[states[index]]:
+                member_mask |= 1 << index
+            if any(compiled.final[state] for state in states[count + index]):
+                search_mask |= 1 << index
+        return member_mask, search_mask
+
+    def _flush_product_states(self) -> None:
+        """Forget every state of the product automaton, and add its start state back.
+
+        The containers are cleared in place, so local references to them held by a running scan
+            stay valid, although the states it holds do not.
+        """
+
+        # States that were seldom returned to before the cache filled up will not be reused either
+        self.product_thrashing = self._product_returns * 8 < len(self.product_states)
+        self.product_flushes += 1
+        self._product_returns = 0
+        self.product_cache_used = 0
+        del self.product_states[:]
+        self.product_index.clear()
+        del self.product_table[:]
+        del self.member_masks[:]
+        del self.search_masks[:]
+        self.product_start = self._add_product_state(self._start_states)
+
+    def _step_product(
+        self, states: Tuple[Union[int, FrozenSet[int]], ...], column: int
+    ) -> Tuple[Union[int, FrozenSet[int]], ...]:
+        """Advance every FSA and every "Σ* · L" automaton by one symbol.
+
+        Parameters
+        ----------
+        states : Tuple[Union[int, FrozenSet[int]], ...]
+            The state of every FSA followed by the set of live runs of every "Σ* · L" automaton
+        column : int
+            Column of the symbol on the tape
+
+        Returns
+        -------
+        Tuple[Union[int, FrozenSet[int]], ...]
+            The tuple of states after the symbol
+        """
+
+        count = len(self.compiled)
+        member_states, live_states = [], []
+        for index, compiled in enumerate(self.compiled):
+            fsa_column = self.column_maps[index][column]
+            member_states.append(
+                compiled.table[states[index] * compiled.num_columns + fsa_column]
+            )
+            # The product automaton caches the sets of live runs itself
+            live_states.append(compiled._step_runs(states[count + index], fsa_column))
+        return tuple(member_states) + tuple(live_states)
+
+    def _expand_product_state(self, product_state: int, column: int) -> int:
+        """Compute and store one transition of the product automaton.
+
+        When the new state does not fit in the cache, the cache is flushed first, and the
+            transition out of the forgotten state is not stored.
+
+        Parameters
+        ----------
+        product_state : int
+            Current state of the product automaton
+        column : int
+            Column of the symbol on the tape
+
+        Returns
+        -------
+        int
+            Next state of the product automaton
+        """
+
+        next_states = self._step_product(self.product_states[product_state], column)
+        next_state = self.product_index.get(next_states)
+        if next_state is not None:
+            self._product_returns += 1
+        else:
+            if (
+                self.product_cache_used + self._size(next_states) > self.product_cache_size
+                and len(self.product_states) > 1
+            ):
+                self._flush_product_states()
+                next_state = self.product_index.get(next_states)
+                if next_state is None:
+                    next_state = self._add_product_state(next_states)
+                return next_state
+            next_state = self._add_product_state(next_states)
+        self.product_table[product_state * self.num_columns + column] = next_state
+        return next_state
+
+
+class Profile:
+    """Counters of the work done by the recognize methods of a FSA, see FSA.enable_profiling.
+
+    The counts are taken by the recognizers themselves, as they run, so they describe the work
+        actually done, including where a recognizer stopped early. Counting slows the recognizers
+        down, and the wall time includes its cost.
+
+    Attributes
+    ----------
+    compiled : CompiledFSA
+        Compiled form of the FSA
+    transitions : array
+        Transition counts, where transitions[<state> * num_columns + <column>] is the number of
+            times a run of the FSA left state <state> on a symbol in column <column>. In endswith
+            and substring modes, every live run of the "Σ* · L" automaton is counted.
+    restarts : Dict[str, int]
+        Number of runs started from the start state after the first symbol per mode, in
+            endswith and substring modes, when no live run was already in the start state
+    dead_hits : Dict[str, int]
+        Number of times a run entered a state that can never accept per mode, after which it
+            was stopped or dropped
+    calls : Dict[str, int]
+        Number of calls per mode
+    seconds : Dict[str, float]
+        Wall time in seconds per mode
+    latencies : Dict[str, List[float]]
+        Wall time in seconds of every call per mode
+    lengths : Dict[str, int]
+        Number of symbols of the inputs per mode
+    characters : Dict[str, int]
+        Number of symbols run through the FSA or the "Σ* · L" automaton per mode, fewer than
+            lengths when a recognizer stopped early or skipped symbols that cannot change the answer
+    search_expansions : int
+        Number of transitions of the "Σ* · L" automaton computed rather than looked up, in
+            endswith and substring modes
+    search_flushes : int
+        Number of times the states of the "Σ* · L" automaton were forgotten to stay within
+            CompiledFSA.search_cache_size
+
+    Methods
+    -------
+    recognize(string: str, mode: str) -> bool
+        Run a string through the FSA, counting the work done
+    recognize_bytes(data: BytesLike, mode: str) -> bool
+        Run a bytes-like object through the FSA, counting the work done
+    step_member(state: int, columns: Iterable[int]) -> int
+        Run the FSA in member mode, counting every transition
+    count_runs(symbols: Iterable[Symbol], live_states: FrozenSet[int], mode: str)
+            -> Iterator[Symbol]
+        Count the transitions of the live runs as a recognizer reads the symbols of an input
+    state_counts() -> Dict[str, int]
+        Number of transitions out of every state
+    transition_counts() -> Dict[Tuple[str, Optional[str]], int]
+        Number of transitions per (state, symbol)
+    report(top: int) -> str
+        Describe the counters in a human-readable report
+    """
+
+    def __init__(self, compiled: CompiledFSA) -> None:
+        """Construct counters that have not counted anything yet.
+
+        Parameters
+        ----------
+        compiled : CompiledFSA
+            Compiled form of the FSA to count the work of
+        """
+
+        self.compiled = compiled
+        self.transitions = array("q", bytes(8 * compiled.num_states * compiled.num_columns))
+        self.restarts = {"D1": 0, "D2": 0, "D3": 0}
+        self.dead_hits = {"D1": 0, "D2": 0, "D3": 0}
+        self.calls = {"D1": 0, "D2": 0, "D3": 0}
+        self.seconds = {"D1": 0.0, "D2": 0.0, "D3": 0.0}
+        self.latencies: Dict[str, List[float]] = {"D1": [], "D2": [], "D3": []}
+        self.lengths = {"D1": 0, "D2": 0, "D3": 0}
+        self.characters = {"D1": 0, "D2": 0, "D3": 0}
+        self.search_expansions = 0
+        self.search_flushes = 0
+
+    def recognize(self, string: str, mode: str = "D1") -> bool:
+        """Run a string through the FSA, counting the work done.
+
+        Parameters
+        ----------
+        string : str
+            The string to run through the FSA
+        mode : str
+            The task to perform, one of {'D1', 'D2', 'D3'}
+
+        Returns
+        -------
+        bool
+            Whether or not the FSA recognizes the string in the given mode
+        """
+
+        _check_mode(mode)
+        compiled = self.compiled
+        recognize = {
+            "D1": compiled.recognize_member,
+            "D2": compiled.recognize_endswith,
+            "D3": compiled.recognize_substring,
+        }[mode]
+        return self._measure(mode, len(string), lambda: recognize(string, self))
+
+    def recognize_bytes(self, data: BytesLike, mode: str = "D1") -> bool:
+        """Run a bytes-like object through the FSA, counting the work done.
+
+        Parameters
+        ----------
+        data : BytesLike
+            The bytes, bytearray, memoryview, or mmap to run through the FSA
+        mode : str
+            The task to perform, one of {'D1', 'D2', 'D3'}
+
+        Returns
+        -------
+        bool
+            Whether or not the FSA recognizes the data in the given mode
+        """
+
+        _check_mode(mode)
+        return self._measure(
+            mode, len(data), lambda: self.compiled.recognize_bytes(data, mode, self)
+        )
+
+    def _measure(self, mode: str, length: int, recognize: Callable[[], bool]) -> bool:
+        """Time one call of a recognizer, and count the states of the "Σ* · L" automaton it built.
+
+        Parameters
+        ----------
+        mode : str
+            The task performed, one of {'D1', 'D2', 'D3'}
+        length : int
+            Number of symbols of the input
+        recognize : Callable[[], bool]
+            The call of the recognizer
+
+        Returns
+        -------
+        bool
+            The result of the recognizer
+        """
+
+        compiled = self.compiled
+        expansions, flushes = compiled.search_expansions, compiled.search_flushes
+        start_time = time.perf_counter()
+        result = recognize()
+        latency = time.perf_counter() - start_time
+        self.seconds[mode] += latency
+        self.latencies[mode].append(latency)
+        self.calls[mode] += 1
+        self.lengths[mode] += length
+        self.search_expansions += compiled.search_expansions - expansions
+        self.search_flushes += compiled.search_flushes - flushes
+        return result
+
+    def step_member(self, state: int, columns: Iterable[int]) -> int:
+        """Run the FSA in member mode, counting every transition it takes.
+
+        Like CompiledFSA.recognize_member, the run stops as soon as it enters a state of
+            CompiledFSA.stops, and the rest of the columns are left unread.
+
+        Parameters
+        ----------
+        state : int
+            State to start the run from
+        columns : Iterable[int]
+            Columns of the symbols of the input
+
+        Returns
+        -------
+        int
+            State the run stopped in
+        """
+
+        compiled = self.compiled
+        table, num_columns, stops = compiled.table, compiled.num_columns, compiled.stops
+        transitions = self.transitions
+        read = 0
+        for column in columns:
+            index = state * num_columns + column
+            transitions[index] += 1
+            read += 1
+            state = table[index]
+            if stops[state]:
+                if stops[state] == 1:
+                    self.dead_hits["D1"] += 1
+                break
+        self.characters["D1"] += read
+        return state
+
+    def count_runs(
+        self, symbols: Iterable[Symbol], live_states: FrozenSet[int], mode: str
+    ) -> Iterator[Symbol]:
+        """Count the transitions of the live runs as a recognizer reads the symbols of an input.
+
+        The recognizer steps the "Σ* · L" automaton, whose every transition stands for a
+            transition of each of the live runs. The live runs are stepped here alongside it, one
+            symbol at a time as the recognizer reads them, so the counts stop where it stopped.
+
+        Parameters
+        ----------
+        symbols : Iterable[Symbol]
+            The symbols of a string, or the columns of the symbols of a bytes-like object
+        live_states : FrozenSet[int]
+            The set of live runs before the first symbol
+        mode : str
+            The task performed, one of {'D2', 'D3'}
+
+        Yields
+        ------
+        Symbol
+            The symbols, one at a time
+        """
+
+        compiled = self.compiled
+        table, num_columns, stops = compiled.table, compiled.num_columns, compiled.stops
+        symbol_index, other, start = compiled.symbol_index, compiled.other, compiled.start
+        transitions, characters = self.transitions, self.characters
+        restarts, dead_hits = self.restarts, self.dead_hits
+        for symbol in symbols:
+            column = symbol if isinstance(symbol, int) else symbol_index.get(symbol, other)
+            next_states = set()
+            for state in live_states:
+                index = state * num_columns + column
+                transitions[index] += 1
+                next_state = table[index]
+                if stops[next_state] == 1:
+                    dead_hits[mode] += 1
+                else:
+                    next_states.add(next_state)
+            if start not in next_states and stops[start] != 1:
+                restarts[mode] += 1
+                next_states.add(start)
+            live_states = frozenset(next_states)
+            characters[mode] += 1
+            yield symbol
+
+    def state_counts(self) -> Dict[str, int]:
+        """Number of transitions out of every state that was left at least once.
+
+        Returns
+        -------
+        Dict[str, int]
+            Number of transitions out of every state, by the name of the state
+        """
+
+        num_columns, transitions = self.compiled.num_columns, self.transitions
+        counts = {}
+        for state, name in enumerate(self.compiled.state_names):
+            count = sum(transitions[state * num_columns : (state + 1) * num_columns])
+            if count:
+                counts[name] = count
+        return counts
+
+    def transition_counts(self) -> Dict[Tuple[str, Optional[str]], int]:
+        """Number of transitions per (state, symbol) taken at least once.
+
+        Returns
+        -------
+        Dict[Tuple[str, Optional[str]], int]
+            Number of transitions, by the name of the state and the symbol. Symbols that share a
+                column are counted together under their concatenation in brackets, e.g., "[ab]",
+                and symbols outside of the alphabet under None.
+        """
+
+        state_names, num_columns = self.compiled.state_names, self.compiled.num_columns
+        symbols = [
+            column_symbols[0] if len(column_symbols) == 1 else f"[{''.join(column_symbols)}]"
+            for column_symbols in self.compiled.column_symbols[:-1]
+        ] + [None]
+        return {
+            (state_names[index // num_columns], symbols[index % num_columns]): count
+            for index, count in enumerate(self.transitions)
+            if count
+        }
+
+    def report(self, top: int = 10) -> str:
+        """Describe the counters in a human-readable report.
+
+        Parameters
+        ----------
+        top : int
+            Number of the hottest states and transitions to list
+
+        Returns
+        -------
+        str
+            The report
+        """
+
+        lines = [
+            "mode  calls      length  characters  restarts  dead hits  seconds   "
+            "p50 call  p99 call  max call"
+        ]
+        for mode in ("D1", "D2", "D3"):
+            latencies = sorted(self.latencies[mode]) or [0.0]
+            p50 = latencies[(len(latencies) - 1) // 2]
+            p99 = latencies[(len(latencies) - 1) * 99 // 100]
+            lines.append(
+                f"{mode:<4}  {self.calls[mode]:>5}  {self.lengths[mode]:>10}  "
+                f"{self.characters[mode]:>10}  {self.restarts[mode]:>8}  "
+                f"{self.dead_hits[mode]:>9}  {self.seconds[mode]:.6f}  {p50:.6f}  {p99:.6f}  "
+                f"{latencies[-1]:.6f}"
+            )
+        lines.append(f'"Σ* · L" transitions computed: {self.search_expansions}')
+        lines.append(f'"Σ* · L" cache flushes: {self.search_flushes}')
+        states = sorted(self.state_counts().items(), key=lambda item: -item[1])[:top]
+        lines.append(f"hottest states: {pformat(states)}")
+        transitions = sorted(self.transition_counts().items(), key=lambda item: -item[1])[:top]
+        lines.append(f"hottest transitions: {pformat(transitions)}")
+        return "\n".join(lines)
+
+
+_scan_worker_compiled: Optional[CompiledFSA] = None
+
+
+def _init_scan_worker(compiled: CompiledFSA) -> None:
+    """Store the compiled FSA in a worker process of CompiledFSA.recognize_parallel.
+
+    Parameters
+    ----------
+    compiled : CompiledFSA
+        The compiled FSA shared by every chunk
+    """
+
+    global _scan_worker_compiled
+    _scan_worker_compiled = compiled
+
+
+def _scan_chunk(
+    chunk: Union[str, BytesLike], mode: str
+) -> Tuple[array, bytearray, FrozenSet[int], bool]:
+    """Compute the transition mapping of one chunk in a worker process.
+
+    Parameters
+    ----------
+    chunk : Union[str, BytesLike]
+        The chunk of the input
+    mode : str
+        The task to perform, one of {'D1', 'D2', 'D3'}
+
+    Returns
+    -------
+    Tuple[array, bytearray, FrozenSet[int], bool]
+        Result of scanning the chunk, see CompiledFSA.scan_chunk
+    """
+
+    return _scan_worker_compiled.scan_chunk(chunk, mode)
+
+
+def _load_catalog_entry(path: Path) -> Tuple[Union[FSA, NFA], float]:
+    """Load one automaton directory in a worker process of FSA.load_catalog, compiling a FSA.
+
+    Parameters
+    ----------
+    path : Path
+        Directory containing the automaton files
+
+    Returns
+    -------
+    Tuple[Union[FSA, NFA], float]
+        Compiled FSA or NFA stored in this directory, and the seconds spent loading it
+    """
+
+    began = time.perf_counter()
+    automaton = load_automaton(path)
+    if isinstance(automaton, FSA):
+        automaton.compile()
+    return automaton, time.perf_counter() - began
+
+
+def _report_catalog_entry(name: str, seconds: float, error: Optional[Exception]) -> None:
+    """Write the outcome of loading one automaton directory of FSA.load_catalog to stderr.
+
+    Parameters
+    ----------
+    name : str
+        Name of the directory
+    seconds : float
+        Seconds spent loading the directory
+    error : Optional[Exception]
+        The error the directory failed to load with, if any
+    """
+
+    if error is not None:
+        print(f"Skipping {name}: {error!r}", file=sys.stderr)
+    else:
+        print(f"Loaded {name} in {seconds:.3f}s", file=sys.stderr)
+
+
+def _byteswapped(table: Sequence[int]) -> array:
+    """Convert 32-bit integers between little-endian and the native byte order of a big-endian
+        machine.
+
+    Parameters
+    ----------
+    table : Sequence[int]
+        The integers to convert
+
+    Returns
+    -------
+    array
+        The converted integers
+    """
+
+    table = array(CompiledFSA.table_typecode, table)
+    table.byteswap()
+    return table
+
+
+def _common_prefix_length(first: str, second: str) -> int:
+    """Find the length of the longest common prefix of two strings with a binary search over native
+        slice comparisons.
+
+    Parameters
+    ----------
+    first : str
+        The first string
+    second : str
+        The second string
+
+    Returns
+    -------
+    int
+        Length of the longest common prefix
+    """
+
+    low, high = 0, min(len(first), len(second))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if first[low:middle] == second[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _check_mode(mode: str) -> None:
+    """Ensure a mode is one of the tasks described in the project description.
+
+    Parameters
+    ----------
+    mode : str
+        The task to perform, one of {'D1', 'D2', 'D3'}
+    """
+
+    if mode not in ("D1", "D2", "D3"):
+        raise ValueError(
+            f"The mode {mode} was not recognized. The mode should be in: {{'D1', 'D2', 'D3'}}."
+        )
+
+
+def main(
+    path: Path,
+    test_str: str,
+    task: str,
+    input_file: Optional[Path] = None,
+    profile: bool = False,
+) -> None:
+    """Run the tasks described in the project description.
 
     Parameters
     ----------
     path : Path
-        Direcotry containing the FSA files
+        Directory containing the FSA or NFA files, see load_automaton
     test_str : str
         The string to run through the FSA
     task : str
         The task to perform described in the project description. One of {'D1', 'D2', 'D3'}.
+    input_file : Optional[Path]
+        File to memory-map and run through the FSA instead of test_str
+    profile : bool
+        Whether or not to write a report of the work done by the FSA to stderr
     """
 
-    fsa = FSA.from_file(path)
+    fsa = _load_cli_automaton(path, profile)
+    if input_file is not None and isinstance(fsa, NFA):
+        # A NFA has no byte recognizer, so the file is read whole, every byte as the symbol with
+        # the same code point like recognize_file does
+        test_str, input_file = Path(input_file).read_bytes().decode("latin-1"), None
 
-    if task == "D1":
+    if input_file is not None:
+        result = fsa.recognize_file(input_file, task)
+    elif task == "D1":
         result = fsa.recognize_member(test_str)
     elif task == "D2":
         result = fsa.recognize_endswith(test_str)
@@ -405,6 +4463,303 @@ def main(path: Path, test_str: str, task: str) -> None:
         )
 
     print(f"Whether or not our FSA recognizes this string: {result}")
+    if profile:
+        print(fsa.profile.report(), file=sys.stderr)
+
+
+def main_batch(
+    path: Path,
+    task: str,
+    lines: Iterable[str],
+    output: TextIO,
+    batch_size: int = 8192,
+    profile: bool = False,
+) -> None:
+    """Run many newline-delimited strings through one FSA or NFA, loading it only once.
+
+    Results are written as one line of True or False per input line, in batches of batch_size
+        lines.
+
+    Parameters
+    ----------
+    path : Path
+        Directory containing the FSA or NFA files, see load_automaton
+    task : str
+        The task to perform described in the project description. One of {'D1', 'D2', 'D3'}.
+    lines : Iterable[str]
+        The strings to run through the FSA, each optionally ending with a LF or CRLF newline
+    output : TextIO
+        Where to write the results
+    batch_size : int
+        Number of results written at once
+    profile : bool
+        Whether or not to write a report of the work done by the FSA to stderr
+    """
+
+    _check_mode(task)
+    fsa = _load_cli_automaton(path, profile)
+    recognize = {
+        "D1": fsa.recognize_member,
+        "D2": fsa.recognize_endswith,
+        "D3": fsa.recognize_substring,
+    }[task]
+
+    results = []
+    for line in lines:
+        results.append("True" if recognize(line.rstrip("\r\n")) else "False")
+        if len(results) == batch_size:
+            results.append("")
+            output.write("\n".join(results))
+            results = []
+    if results:
+        results.append("")
+        output.write("\n".join(results))
+    output.flush()
+    if profile:
+        print(fsa.profile.report(), file=sys.stderr)
+
+
+def _load_cli_automaton(path: Path, profile: bool) -> Union[FSA, NFA]:
+    """Load the automaton of the command line program with load_automaton.
+
+    Parameters
+    ----------
+    path : Path
+        Directory containing the automaton files
+    profile : bool
+        Whether or not to count the work done by the automaton, which requires a FSA
+
+    Returns
+    -------
+    Union[FSA, NFA]
+        Automaton stored in this directory, with profiling enabled if requested
+    """
+
+    automaton = load_automaton(path)
+    if profile:
+        if isinstance(automaton, NFA):
+            raise ValueError(f"{path} holds a NFA, and only a FSA can be profiled")
+        automaton.enable_profiling()
+    return automaton
+
+
+def load_automaton(path: Path) -> Union[FSA, NFA]:
+    """Load an automaton directory as a NFA if its transition function uses multi-target rows,
+        repeated rows, or epsilon moves, and as a FSA otherwise.
+
+    Parameters
+    ----------
+    path : Path
+        Directory containing the automaton files
+
+    Returns
+    -------
+    Union[FSA, NFA]
+        Automaton stored in this directory
+    """
+
+    path = Path(path)
+    if not FSA._has_current_compiled(path):
+        seen = set()
+        with open(path / FSA.trans_func_file_name) as f:
+            for line in f:
+                fields = line.replace(" ", "").strip().split(",")
+                if len(fields) > 3 or (len(fields) == 3 and fields[1] == NFA.epsilon):
+                    return NFA.from_file(path)
+                if len(fields) == 3 and fields[2] != "NULL":
+                    if (fields[0], fields[1]) in seen:
+                        return NFA.from_file(path)
+                    seen.add((fields[0], fields[1]))
+
+    return FSA.from_file(path)
+
+
+def load_registry(root: Path) -> Dict[str, Union[FSA, NFA]]:
+    """Load every automaton directory directly under a directory, skipping any that fail to load.
+
+    Parameters
+    ----------
+    root : Path
+        Directory containing the automaton directories, e.g., ./data
+
+    Returns
+    -------
+    Dict[str, Union[FSA, NFA]]
+        Automata by the name of their directory
+    """
+
+    registry = {}
+    for path in sorted(Path(root).iterdir()):
+        if not (path / FSA.trans_func_file_name).exists():
+            continue
+        try:
+            registry[path.name] = load_automaton(path)
+        except (OSError, IndexError, KeyError, ValueError) as error:
+            print(f"Skipping {path}: {error!r}", file=sys.stderr)
+    return registry
+
+
+def answer_request(registry: Dict[str, Union[FSA, NFA]], request: bytes) -> bytes:
+    """Answer one request of the recognizer server.
+
+    A request is a line of the form <automaton>\\t<task>\\t<string>, where <automaton> is the name
+        of a directory of the registry. The answer is a line holding 1 if the automaton recognizes
+        the string in the given task, 0 if not, or E followed by a message if the request failed.
+
+    Parameters
+    ----------
+    registry : Dict[str, Union[FSA, NFA]]
+        Automata by name
+    request : bytes
+        The request, without its newline
+
+    Returns
+    -------
+    bytes
+        The answer, with its newline
+    """
+
+    try:
+        name, task, string = request.decode().split("\t", 2)
+        automaton = registry[name]
+        if task == "D1":
+            result = automaton.recognize_member(string)
+        elif task == "D2":
+            result = automaton.recognize_endswith(string)
+        elif task == "D3":
+            result = automaton.recognize_substring(string)
+        else:
+            _check_mode(task)
+    except KeyError as error:
+        return f"E unknown automaton {error}\n".encode()
+    except ValueError as error:
+        return f"E {error}\n".encode()
+
+    return b"1\n" if result else b"0\n"
+
+
+async def _serve_connection(
+    registry: Dict[str, Union[FSA, NFA]],
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    max_request_length: int,
+) -> None:
+    """Answer pipelined requests on one connection until the client closes it.
+
+    Every complete request read at once is answered with a single write. A request longer than
+        max_request_length bytes, complete or not, is answered with an error, and the connection
+        is closed. A connection cancelled while the event loop shuts down is closed quietly.
+
+    Parameters
+    ----------
+    registry : Dict[str, Union[FSA, NFA]]
+        Automata by name
+    reader : asyncio.StreamReader
+        Stream of requests
+    writer : asyncio.StreamWriter
+        Stream of answers
+    max_request_length : int
+        Largest number of bytes of a request, without its newline, kept while waiting for the rest
+    """
+
+    pending = b""
+    try:
+        while True:
+            data = await reader.read(1 << 16)
+            if not data:
+                break
+            requests = (pending + data).split(b"\n")
+            pending = requests.pop()
+            # The requests before the first one that is too long are still answered
+            too_long = len(requests)
+            for index, request in enumerate(requests):
+                if len(request) > max_request_length:
+                    too_long = index
+                    break
+            answers = [answer_request(registry, request) for request in requests[:too_long]]
+            if too_long < len(requests) or len(pending) > max_request_length:
+                answers.append(f"E request longer than {max_request_length} bytes\n".encode())
+                writer.write(b"".join(answers))
+                await writer.drain()
+                break
+            writer.write(b"".join(answers))
+            await writer.drain()
+    except ConnectionError:
+        pass
+    except asyncio.CancelledError:
+        # The event loop is shutting down, and asyncio would report the cancellation of a
+        # connection task as an unhandled error
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(
+    registry: Dict[str, Union[FSA, NFA]],
+    socket_path: Optional[Path] = None,
+    port: Optional[int] = None,
+    max_request_length: int = 1 << 24,
+) -> asyncio.AbstractServer:
+    """Start the recognizer server on a Unix socket, or on a localhost TCP port.
+
+    Parameters
+    ----------
+    registry : Dict[str, Union[FSA, NFA]]
+        Automata by name, see answer_request
+    socket_path : Optional[Path]
+        Unix socket to listen on
+    port : Optional[int]
+        Localhost TCP port to listen on if socket_path is None, where 0 picks a free port
+    max_request_length : int
+        Largest number of bytes of a request, without its newline, beyond which the server
+            answers with an error and closes the connection, so a client sending no newline cannot
+            make it buffer without bound
+
+    Returns
+    -------
+    asyncio.AbstractServer
+        The running server
+    """
+
+    # Build every compiled table up front so the first requests do not pay for it
+    for automaton in registry.values():
+        if isinstance(automaton, FSA):
+            automaton.compile()
+
+    def handler(reader, writer):
+        return _serve_connection(registry, reader, writer, max_request_length)
+
+    if socket_path is not None:
+        return await asyncio.start_unix_server(handler, path=str(socket_path))
+    return await asyncio.start_server(handler, host="127.0.0.1", port=port)
+
+
+def main_serve(root: Path, socket_path: Optional[Path] = None, port: Optional[int] = None) -> None:
+    """Preload every automaton under a directory and answer recognize requests until interrupted.
+
+    Parameters
+    ----------
+    root : Path
+        Directory containing the automaton directories
+    socket_path : Optional[Path]
+        Unix socket to listen on
+    port : Optional[int]
+        Localhost TCP port to listen on if socket_path is None
+    """
+
+    registry = load_registry(root)
+
+    async def serve():
+        server = await start_server(registry, socket_path, port)
+        addresses = ", ".join(str(socket.getsockname()) for socket in server.sockets)
+        print(f"Serving {len(registry)} automata on {addresses}", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
 
 
 def debug():
@@ -419,10 +4774,53 @@ if __name__ == "__main__":
     parser.add_argument("--path", type=Path, help="Enter a path to the directory containing files.")
     parser.add_argument("--string", type=str, help="Enter a string to test on the FSA.")
     parser.add_argument("--task", type=str, help="Enter the task. One of {'D1', 'D2', 'D3'}.")
+    parser.add_argument(
+        "--input-file", type=Path, help="Enter a file to memory-map and test instead of --string."
+    )
+    parser.add_argument(
+        "--strings-from",
+        type=str,
+        help="Enter a file of newline-delimited strings to test instead of --string, - for stdin.",
+    )
+    parser.add_argument(
+        "--save-compiled",
+        action="store_true",
+        default=False,
+        help="Save the compiled FSA into --path, so later runs load it instead of parsing.",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        default=False,
+        help="Serve recognize requests for every automaton directory under --registry.",
+    )
+    parser.add_argument(
+        "--registry", type=Path, default=Path("./data"), help="Enter the directory to serve."
+    )
+    parser.add_argument("--socket", type=Path, help="Enter a Unix socket to serve on.")
+    parser.add_argument(
+        "--port", type=int, default=8765, help="Enter a localhost port to serve on."
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=False,
+        help="Write a report of the symbols read, transitions, restarts, dead-state hits, and "
+        "time per call of the FSA to stderr.",
+    )
     parser.add_argument("--debug", action="store_true", default=False, help="For developers.")
     args = parser.parse_args()
 
     if args.debug:
         debug()
+    elif args.serve:
+        main_serve(args.registry, args.socket, args.port)
+    elif args.save_compiled:
+        print(f"Saved the compiled FSA to {FSA.from_file(args.path).save_compiled(args.path)}")
+    elif args.strings_from == "-":
+        main_batch(args.path, args.task, sys.stdin, sys.stdout, profile=args.profile)
+    elif args.strings_from is not None:
+        with open(args.strings_from) as f:
+            main_batch(args.path, args.task, f, sys.stdout, profile=args.profile)
     else:
-        main(args.path, args.string, args.task)
+        main(args.path, args.string, args.task, args.input_file, args.profile)
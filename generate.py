@@ -0,0 +1,368 @@
+"""Random finite state automata and input corpora for scaling tests.
+
+Usage
+-----
+To write a random FSA in file format:
+    > python generate.py --path=<path> --states=<states> --alphabet-size=<size>
+where
+    <path> is a directory to write the FSA files into
+    <states> is the number of states
+    <size> is the number of symbols of the alphabet
+
+To also write a corpus of strings, one per line, a fraction of which the FSA accepts:
+    > python generate.py --path=<path> --states=<states> --alphabet-size=<size>
+        --corpus=<corpus> --strings=<strings> --length=<length> --accept-rate=<rate> --task=<task>
+where
+    <corpus> is a file to write the strings into
+    <strings> is the number of strings
+    <length> is the length of the strings
+    <rate> is the fraction of the strings the FSA accepts
+    <task> is the task the strings are accepted by. One of {'D1', 'D2', or 'D3'}
+
+For help with the program:
+    > python generate.py -h
+"""
+
+from __future__ import annotations
+import argparse
+from collections import deque
+from pathlib import Path
+import random
+import string
+from typing import Dict, List, Optional
+
+from fsa import FSA, _check_mode
+
+# Symbols safe to write into the FSA files, which split on commas and newlines and drop spaces
+_SYMBOLS = string.ascii_lowercase + string.ascii_uppercase + string.digits
+
+# Number of random strings to draw before giving up on finding one the FSA rejects
+_MAX_ATTEMPTS = 1000
+
+
+def make_alphabet(size: int) -> List[str]:
+    """Create an alphabet of single-character symbols.
+
+    Parameters
+    ----------
+    size : int
+        Number of symbols
+
+    Returns
+    -------
+    List[str]
+        The symbols, ASCII letters and digits first and then characters from the Latin-1
+            Supplement onward
+    """
+
+    if size < 1:
+        raise ValueError(f"Invalid alphabet size: {size}")
+    extra = [chr(0xC0 + index) for index in range(max(size - len(_SYMBOLS), 0))]
+    return list(_SYMBOLS[:size]) + extra
+
+
+def generate_fsa(
+    num_states: int,
+    alphabet_size: int,
+    density: float = 1.0,
+    final_ratio: float = 0.1,
+    seed: int = 0,
+) -> FSA:
+    """Create a random FSA whose states are all reachable from the start state.
+
+    Parameters
+    ----------
+    num_states : int
+        Number of states
+    alphabet_size : int
+        Number of symbols of the alphabet
+    density : float
+        Fraction of the (state, symbol) pairs with a transition, 1.0 for a complete transition
+            function and less for a partial one
+    final_ratio : float
+        Fraction of the states that are final, at least one state is always final
+    seed : int
+        Seed of the random number generator
+
+    Returns
+    -------
+    FSA
+        The random FSA, with states s0 to s<num_states - 1> and start state s0
+    """
+
+    if num_states < 1:
+        raise ValueError(f"Invalid number of states: {num_states}")
+    if not 0.0 <= density <= 1.0 or not 0.0 <= final_ratio <= 1.0:
+        raise ValueError(f"Invalid density or final ratio: {density}, {final_ratio}")
+
+    rng = random.Random(seed)
+    alphabet = make_alphabet(alphabet_size)
+    states = [f"s{index}" for index in range(num_states)]
+    trans_func: Dict[str, Dict[str, str]] = {state: {} for state in states}
+
+    # A random spanning tree rooted at the start state keeps every state reachable
+    for index in range(1, num_states):
+        parent = states[rng.randrange(index)]
+        free = [symbol for symbol in alphabet if symbol not in trans_func[parent]]
+        while not free:
+            parent = states[rng.randrange(index)]
+            free = [symbol for symbol in alphabet if symbol not in trans_func[parent]]
+        trans_func[parent][rng.choice(free)] = states[index]
+
+    for state in states:
+        for symbol in alphabet:
+            if symbol not in trans_func[state] and rng.random() < density:
+                trans_func[state][symbol] = rng.choice(states)
+
+    num_final = max(1, round(final_ratio * num_states))
+    final_states = set(rng.sample(states, num_final))
+    return FSA(set(states), final_states, states[0], set(alphabet), trans_func)
+
+
+def generate_corpus(
+    fsa: FSA,
+    num_strings: int,
+    length: int,
+    accept_rate: float = 0.5,
+    mode: str = "D1",
+    seed: int = 0,
+) -> List[str]:
+    """Create random strings, an exact fraction of which the FSA accepts.
+
+    Accepted strings are random walks from the start state that stay within reach of a final
+    state, and end in one. Rejected strings are random walks that steer clear of acceptance, which
+    for D3 means never passing through a final state from any starting position.
+
+    Parameters
+    ----------
+    fsa : FSA
+        The FSA to accept or reject the strings
+    num_strings : int
+        Number of strings
+    length : int
+        Length of the strings, accepted strings may be shorter or longer to end in a final state
+    accept_rate : float
+        Fraction of the strings the FSA accepts
+    mode : str
+        Task the strings are accepted by. One of {'D1', 'D2', or 'D3'}
+    seed : int
+        Seed of the random number generator
+
+    Returns
+    -------
+    List[str]
+        The strings, in random order
+
+    Raises
+    ------
+    ValueError
+        If the FSA accepts no string, accepts every string, or the walks keep failing to find a
+            string it rejects
+    """
+
+    _check_mode(mode)
+    rng = random.Random(seed)
+    distance = _distance_to_final(fsa)
+    if fsa.start_state not in distance:
+        raise ValueError("The FSA accepts no string")
+    if mode != "D1" and fsa.start_state in fsa.final_states and accept_rate < 1.0:
+        raise ValueError(f"The FSA accepts every string in task {mode}")
+
+    num_accepted = round(accept_rate * num_strings)
+    corpus = [_accepted_string(fsa, distance, length, rng) for _ in range(num_accepted)]
+    for _ in range(num_strings - num_accepted):
+        for _ in range(_MAX_ATTEMPTS):
+            rejected = _rejected_string(fsa, length, mode, rng)
+            if rejected is not None:
+                corpus.append(rejected)
+                break
+        else:
+            raise ValueError(f"Found no string of length {length} the FSA rejects")
+
+    rng.shuffle(corpus)
+    return corpus
+
+
+def write_fsa(fsa: FSA, path: Path) -> None:
+    """Write a FSA in the file format read by FSA.from_file.
+
+    Parameters
+    ----------
+    fsa : FSA
+        The FSA to write
+    path : Path
+        Directory to write the FSA files into, created if missing
+    """
+
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    (path / FSA.states_file_name).write_text("".join(f"{state}\n" for state in fsa.states))
+    (path / FSA.final_states_file_name).write_text(
+        "".join(f"{state}\n" for state in fsa.final_states)
+    )
+    (path / FSA.start_state_file_name).write_text(f"{fsa.start_state}\n")
+    (path / FSA.alphabet_file_name).write_text("".join(f"{symbol}\n" for symbol in fsa.alphabet))
+    with open(path / FSA.trans_func_file_name, "w") as f:
+        for state, transitions in fsa.trans_func.items():
+            for symbol, next_state in transitions.items():
+                f.write(f"{state},{symbol},{next_state}\n")
+
+
+def _distance_to_final(fsa: FSA) -> Dict[str, int]:
+    """Find the fewest symbols leading from every state to a final state.
+
+    Parameters
+    ----------
+    fsa : FSA
+        The FSA
+
+    Returns
+    -------
+    Dict[str, int]
+        Distance of every state that can reach a final state
+    """
+
+    predecessors: Dict[str, List[str]] = {}
+    for state, transitions in fsa.trans_func.items():
+        for next_state in transitions.values():
+            predecessors.setdefault(next_state, []).append(state)
+
+    distance = {state: 0 for state in fsa.final_states}
+    queue = deque(fsa.final_states)
+    while queue:
+        state = queue.popleft()
+        for previous in predecessors.get(state, ()):
+            if previous not in distance:
+                distance[previous] = distance[state] + 1
+                queue.append(previous)
+    return distance
+
+
+def _accepted_string(fsa: FSA, distance: Dict[str, int], length: int, rng: random.Random) -> str:
+    """Walk randomly from the start state to a final state in about length symbols.
+
+    Parameters
+    ----------
+    fsa : FSA
+        The FSA
+    distance : Dict[str, int]
+        Distance of every state that can reach a final state, see _distance_to_final
+    length : int
+        Length of the walk, shorter or longer to end in a final state
+    rng : random.Random
+        The random number generator
+
+    Returns
+    -------
+    str
+        A member of the language recognized by the FSA
+    """
+
+    state = fsa.start_state
+    symbols = []
+    remaining = length
+    while remaining > 0 or distance[state] > 0:
+        transitions = fsa.trans_func.get(state, {})
+        # Prefer any symbol that keeps a final state reachable in the remaining symbols, and
+        # otherwise head straight for the nearest final state
+        choices = [
+            symbol
+            for symbol, next_state in transitions.items()
+            if next_state in distance and distance[next_state] <= remaining - 1
+        ]
+        if not choices:
+            choices = [
+                symbol
+                for symbol, next_state in transitions.items()
+                if next_state in distance and distance[next_state] == distance[state] - 1
+            ]
+        if not choices:
+            # Only a final state runs out of choices, when no final state is reachable in time
+            break
+        symbol = rng.choice(sorted(choices))
+        symbols.append(symbol)
+        state = transitions[symbol]
+        remaining -= 1
+    return "".join(symbols)
+
+
+def _rejected_string(fsa: FSA, length: int, mode: str, rng: random.Random) -> Optional[str]:
+    """Walk randomly through the FSA in length symbols without accepting.
+
+    The walk tracks the set of states the FSA may be in, which for D2 and D3 includes a fresh run
+    from the start state at every position.
+
+    Parameters
+    ----------
+    fsa : FSA
+        The FSA
+    length : int
+        Length of the walk
+    mode : str
+        Task the string must be rejected by. One of {'D1', 'D2', or 'D3'}
+    rng : random.Random
+        The random number generator
+
+    Returns
+    -------
+    Optional[str]
+        A string rejected by the FSA, or None if the walk reached a dead end
+    """
+
+    restart = {fsa.start_state} if mode != "D1" else set()
+    states = {fsa.start_state}
+    if mode == "D3" and states & fsa.final_states:
+        return None
+    alphabet = sorted(fsa.alphabet)
+    symbols = []
+    for position in range(length):
+        # Every step must stay clear of a final state in D3, and only the last one in D1 and D2
+        careful = mode == "D3" or position == length - 1
+        for symbol in rng.sample(alphabet, len(alphabet)):
+            next_states = {
+                fsa.trans_func[state][symbol]
+                for state in states
+                if symbol in fsa.trans_func.get(state, {})
+            } | restart
+            if not careful or not next_states & fsa.final_states:
+                break
+        else:
+            return None
+        symbols.append(symbol)
+        states = next_states
+    if length == 0 and states & fsa.final_states:
+        return None
+    return "".join(symbols)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--path", type=Path, required=True, help="Enter a directory to write.")
+    parser.add_argument("--states", type=int, required=True, help="Enter the number of states.")
+    parser.add_argument(
+        "--alphabet-size", type=int, required=True, help="Enter the number of symbols."
+    )
+    parser.add_argument(
+        "--density", type=float, default=1.0, help="Enter the fraction of defined transitions."
+    )
+    parser.add_argument(
+        "--final-ratio", type=float, default=0.1, help="Enter the fraction of final states."
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Enter the random seed.")
+    parser.add_argument("--corpus", type=Path, help="Enter a file to write strings into.")
+    parser.add_argument("--strings", type=int, default=1000, help="Enter the number of strings.")
+    parser.add_argument("--length", type=int, default=100, help="Enter the length of the strings.")
+    parser.add_argument(
+        "--accept-rate", type=float, default=0.5, help="Enter the fraction of accepted strings."
+    )
+    parser.add_argument("--task", default="D1", help="Enter the task accepting the strings.")
+    args = parser.parse_args()
+
+    fsa = generate_fsa(args.states, args.alphabet_size, args.density, args.final_ratio, args.seed)
+    write_fsa(fsa, args.path)
+    if args.corpus is not None:
+        corpus = generate_corpus(
+            fsa, args.strings, args.length, args.accept_rate, args.task, args.seed
+        )
+        args.corpus.write_text("".join(f"{line}\n" for line in corpus))
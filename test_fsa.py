@@ -5,11 +5,42 @@ Note that finite state automata that accept the end string as a member of the la
 """
 
 from abc import ABC
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
 from copy import deepcopy
+from io import StringIO
+from itertools import product
+from multiprocessing import get_start_method
+import os
+from pathlib import Path
+import pickle
+from random import Random
+from re import fullmatch, search
+from tempfile import TemporaryDirectory
 from typing import List
-from unittest import TestCase
-
-from fsa import FSA
+from unittest import TestCase, skipIf
+from unittest.mock import patch
+
+from fsa import (
+    CompiledFSA,
+    FSA,
+    FSASet,
+    NFA,
+    Recognizer,
+    answer_request,
+    load_automaton,
+    load_registry,
+    main,
+    main_batch,
+    np,
+    start_server,
+)
+from generate import generate_corpus, generate_fsa, write_fsa
+
+# Directories under ./data holding a FSA, leaving out the NFA that FSA.from_file rejects
+FSA_PATHS = [
+    path for path in sorted(Path("./data").iterdir()) if isinstance(load_automaton(path), FSA)
+]
 
 
 class TestLanguage(ABC):
@@ -49,6 +80,8 @@ class TestLanguage(ABC):
         Ensure the partial FSA from data structures and files are the same
     test_same_complete
         Ensure the complete FSA from data structures and files are the same
+    test_equivalent
+        Ensure the four FSA recognize the same language
     test_recognize_membership_partial
         Test the partial FSA on membership tasks
     test_recognize_membership_partial_file
@@ -73,6 +106,10 @@ class TestLanguage(ABC):
         Test the complete FSA on substring tasks
     test_recognize_substring_complete_file
         Test the complete FSA from file FSA on substring tasks
+    test_recognize_endswith_long
+        Test the partial FSA from file on endswith tasks with very long inputs
+    test_recognize_substring_long
+        Test the partial FSA from file on substring tasks with very long inputs
     """
 
     fsa_partial: FSA
@@ -118,6 +155,12 @@ class TestLanguage(ABC):
                 msg=f"{attr} differs between fsas.",
             )
 
+    def test_equivalent(self):
+        fsas = (self.fsa_partial, self.fsa_complete, self.fsa_partial_file, self.fsa_complete_file)
+        for fsa, other in product(fsas, repeat=2):
+            self.assertTrue(fsa.equivalent(other))
+            self.assertTrue(fsa.included_in(other))
+
     def test_recognize_membership_partial(self):
         self.runner(
             self.fsa_partial.recognize_member,
@@ -202,6 +245,22 @@ class TestLanguage(ABC):
             self.substring_false_inputs,
         )
 
+    def test_recognize_endswith_long(self):
+        padding = "x" * 10_000
+        self.runner(
+            self.fsa_partial_file.recognize_endswith,
+            [padding + s for s in self.endswith_true_inputs],
+            [padding + s for s in self.endswith_false_inputs],
+        )
+
+    def test_recognize_substring_long(self):
+        padding = "x" * 10_000
+        self.runner(
+            self.fsa_partial_file.recognize_substring,
+            [padding + s + padding for s in self.substring_true_inputs],
+            [padding + s + padding for s in self.substring_false_inputs],
+        )
+
 
 class TestLanguage1(TestCase, TestLanguage):
     """Test the language of L = (ab)*"""
@@ -494,3 +553,1109 @@ class TestLanguage6(TestCase, TestLanguage):
         self.substring_true_inputs += ["d" + s + "b" for s in self.substring_true_inputs]
         self.substring_true_inputs += ["xyz" + s + "xyz" for s in self.substring_true_inputs]
         self.substring_false_inputs = ["", "b", "d", "bd", "db", "bdb", "dbd"]
+
+
+class TestCompiledFSA(TestCase):
+    """Test the integer tables of a compiled FSA."""
+
+    def setUp(self) -> None:
+
+        self.fsa = FSA.from_file("./data/1-partial")
+        self.compiled = self.fsa.compile()
+
+    def test_interning(self):
+        self.assertEqual(self.compiled.state_names, ["s0", "s1"])
+        self.assertEqual(self.compiled.symbols, ["a", "b"])
+        self.assertEqual(self.compiled.num_states, 3)
+        self.assertEqual(self.compiled.num_columns, 3)
+
+    def test_dead_state(self):
+        compiled = self.compiled
+        for column in range(compiled.num_columns):
+            self.assertEqual(compiled.table[compiled.dead * compiled.num_columns + column], 2)
+        s0 = compiled.state_names.index("s0")
+        b = compiled.symbol_index["b"]
+        self.assertEqual(compiled.table[s0 * compiled.num_columns + b], compiled.dead)
+        self.assertEqual(compiled.table[s0 * compiled.num_columns + compiled.other], compiled.dead)
+
+    def test_final(self):
+        self.assertEqual(list(self.compiled.final), [1, 0, 0])
+
+    def test_cached(self):
+        self.assertIs(self.fsa.compiled, self.compiled)
+
+    def test_search_cache_bounded(self):
+        rng = Random(2)
+        strings = ["".join(rng.choices("abcx", k=rng.randrange(300))) for _ in range(40)]
+        reference = generate_fsa(60, 3, 0.6, seed=5)
+        # A cache holding a single state thrashes, and a larger one is flushed now and then
+        for size in (1, 200):
+            fsa = generate_fsa(60, 3, 0.6, seed=5)
+            compiled = fsa.compile()
+            compiled.search_cache_size = size
+            for mode, recognize, expected in (
+                ("D2", fsa.recognize_endswith, reference.recognize_endswith),
+                ("D3", fsa.recognize_substring, reference.recognize_substring),
+            ):
+                results = [expected(s) for s in strings]
+                self.assertEqual([recognize(s) for s in strings], results, msg=mode)
+                self.assertEqual(fsa.recognize_shared_prefixes(strings, mode), results, msg=mode)
+                self.assertEqual(
+                    [fsa.recognize_bytes(s.encode(), mode) for s in strings], results, msg=mode
+                )
+                if np is not None:
+                    self.assertEqual(fsa.recognize_many(strings, mode).tolist(), results)
+            self.assertGreater(compiled.search_flushes, 0)
+            self.assertEqual(compiled.search_thrashing, size == 1)
+            # A flush keeps the start state and the state being added, even past the limit
+            largest = 1 + compiled.num_states + 2 * compiled.num_columns
+            self.assertLessEqual(compiled.search_cache_used, max(size, largest))
+
+
+@skipIf(np is None, "NumPy is not installed")
+class TestRecognizeMany(TestCase):
+    """Test batched recognition against recognizing one string at a time."""
+
+    strings = ["", "a", "b", "ab", "ba", "abab", "aabb", "abba", "cdc", "xabx", "bbab", "abcd"]
+
+    def test_recognize_many(self):
+        for path in FSA_PATHS:
+            fsa = FSA.from_file(path)
+            for mode, recognize in (
+                ("D1", fsa.recognize_member),
+                ("D2", fsa.recognize_endswith),
+                ("D3", fsa.recognize_substring),
+            ):
+                result = fsa.recognize_many(self.strings, mode=mode)
+                self.assertEqual(result.dtype, bool)
+                self.assertEqual(
+                    result.tolist(), [recognize(s) for s in self.strings], msg=f"{path} {mode}"
+                )
+
+    def test_large_automaton(self):
+        fsa = generate_fsa(200, 4, seed=3)
+        for mode, recognize in (("D2", fsa.recognize_endswith), ("D3", fsa.recognize_substring)):
+            corpus = generate_corpus(fsa, 200, 20, mode=mode, seed=4)
+            compiled = fsa.compile()
+            result = fsa.recognize_many(corpus, mode=mode).tolist()
+            # Only the transitions taken by the batch are built
+            self.assertLessEqual(len(compiled.search_sets), 1 + sum(map(len, corpus)))
+            self.assertEqual(result, [recognize(s) for s in corpus], msg=mode)
+
+    def test_empty_batch(self):
+        fsa = FSA.from_file("./data/1-partial")
+        self.assertEqual(fsa.recognize_many([], mode="D3").tolist(), [])
+
+    def test_unknown_mode(self):
+        fsa = FSA.from_file("./data/1-partial")
+        with self.assertRaises(ValueError):
+            fsa.recognize_many(["ab"], mode="D4")
+
+
+class TestRecognizer(TestCase):
+    """Test the streaming recognizer against recognizing the whole string at once."""
+
+    strings = ["", "a", "ab", "ba", "abab", "aabb", "abba", "cdc", "xabx", "bbab", "abcdxabba"]
+
+    def test_chunk_boundaries(self):
+        for path in FSA_PATHS:
+            fsa = FSA.from_file(path)
+            for s in self.strings:
+                for size in range(1, len(s) + 2):
+                    recognizer = Recognizer(fsa)
+                    for start in range(0, len(s), size):
+                        recognizer.feed(s[start : start + size])
+                    self.assertEqual(recognizer.result("D1"), fsa.recognize_member(s), msg=path)
+                    self.assertEqual(recognizer.result("D2"), fsa.recognize_endswith(s), msg=path)
+                    self.assertEqual(recognizer.result("D3"), fsa.recognize_substring(s), msg=path)
+
+    def test_mid_stream(self):
+        recognizer = Recognizer(FSA.from_file("./data/2-partial"))
+        recognizer.feed("b")
+        self.assertEqual((recognizer.member, recognizer.endswith, recognizer.substring), (0, 0, 0))
+        recognizer.feed("a")
+        self.assertEqual((recognizer.member, recognizer.endswith, recognizer.substring), (0, 1, 1))
+        recognizer.feed("b")
+        self.assertEqual((recognizer.member, recognizer.endswith, recognizer.substring), (0, 0, 1))
+        recognizer.reset()
+        recognizer.feed("aba")
+        self.assertEqual((recognizer.member, recognizer.endswith, recognizer.substring), (1, 1, 1))
+        self.assertEqual(recognizer.length, 3)
+
+    def test_early_termination(self):
+        recognizer = Recognizer(FSA.from_regex("ab(a|b)*"))
+        recognizer.feed("ab")
+        live_states = recognizer.live_states
+        # Once the FSA accepts every string of a and b, chunks are only searched for other symbols
+        for _ in range(100):
+            recognizer.feed("ba" * 100)
+        self.assertIs(recognizer.live_states, live_states)
+        self.assertEqual((recognizer.member, recognizer.endswith, recognizer.substring), (1, 1, 1))
+        recognizer.feed("bxa")
+        self.assertEqual((recognizer.member, recognizer.endswith, recognizer.substring), (0, 0, 1))
+        self.assertEqual(recognizer.state, recognizer.compiled.dead)
+        recognizer.feed("ab")
+        self.assertEqual((recognizer.member, recognizer.endswith, recognizer.substring), (0, 1, 1))
+
+    def test_long_stream(self):
+        fsa = generate_fsa(300, 4, seed=8)
+        stream = "".join(Random(9).choices("abcd", k=50_000))
+        recognizer = Recognizer(fsa)
+        compiled = fsa.compiled
+        compiled.search_cache_size = 10_000
+        for start in range(0, len(stream), 1000):
+            recognizer.feed(stream[start : start + 1000])
+            self.assertLessEqual(compiled.search_cache_used, compiled.search_cache_size)
+        self.assertGreater(compiled.search_flushes, 0)
+        reference = generate_fsa(300, 4, seed=8)
+        self.assertEqual(recognizer.result("D2"), reference.recognize_endswith(stream))
+        self.assertEqual(recognizer.result("D3"), reference.recognize_substring(stream))
+
+
+class TestRecognizeBytes(TestCase):
+    """Test the byte-oriented engine against recognizing the equivalent str."""
+
+    strings = ["", "a", "ab", "ba", "abab", "aabb", "abba", "cdc", "xabx", "bbab", "abcdxabba"]
+
+    def test_bytes_like(self):
+        for path in FSA_PATHS:
+            fsa = FSA.from_file(path)
+            for s in self.strings:
+                for data in (s.encode(), bytearray(s.encode()), memoryview(s.encode())):
+                    self.assertEqual(fsa.recognize_bytes(data, "D1"), fsa.recognize_member(s))
+                    self.assertEqual(fsa.recognize_bytes(data, "D2"), fsa.recognize_endswith(s))
+                    self.assertEqual(fsa.recognize_bytes(data, "D3"), fsa.recognize_substring(s))
+
+    def test_non_ascii_bytes(self):
+        fsa = FSA.from_file("./data/2-partial")
+        self.assertTrue(fsa.recognize_bytes("é".encode() + b"a", "D2"))
+        self.assertFalse(fsa.recognize_bytes("é".encode(), "D3"))
+
+    def test_file(self):
+        fsa = FSA.from_file("./data/4-partial")
+        with TemporaryDirectory() as directory:
+            file = Path(directory) / "input.txt"
+            file.write_bytes(b"x" * 5000 + b"aab" + b"x" * 5000)
+            self.assertFalse(fsa.recognize_file(file, "D1"))
+            self.assertFalse(fsa.recognize_file(file, "D2"))
+            self.assertTrue(fsa.recognize_file(file, "D3"))
+            file.write_bytes(b"")
+            self.assertFalse(fsa.recognize_file(file, "D3"))
+
+    def test_early_termination(self):
+        # After "ab", every string of a and b is accepted, and only a symbol outside of the
+        # alphabet, checked block by block, can still make the FSA reject
+        compiled = FSA.from_regex("ab(a|b)*").compile()
+        compiled.byte_block_size = 1000
+        data = b"ab" + b"ba" * 10_000
+        for mode in ("D1", "D2", "D3"):
+            self.assertTrue(compiled.recognize_bytes(data, mode), msg=mode)
+            self.assertEqual(compiled.recognize_bytes(data + b"x", mode), mode == "D3", msg=mode)
+        self.assertTrue(compiled.recognize_bytes(b"x" + data + b"xab" + data, "D2"))
+        self.assertFalse(compiled.recognize_bytes(b"ba" * 10_000 + b"x", "D1"))
+
+
+class TestRecognizeParallel(TestCase):
+    """Test parallel recognition against sequential recognition."""
+
+    strings = ["", "a", "ab", "abab", "aabb", "abba", "cdc", "xabx", "bbab", "abcdxabba", "ababab"]
+
+    def test_chunk_mappings(self):
+        for path in FSA_PATHS:
+            compiled = FSA.from_file(path).compile()
+            for s in self.strings:
+                for mode, recognize in (
+                    ("D1", compiled.recognize_member),
+                    ("D2", compiled.recognize_endswith),
+                    ("D3", compiled.recognize_substring),
+                ):
+                    for size in range(1, len(s) + 1):
+                        runs = frozenset((compiled.start,))
+                        found = mode == "D3" and bool(compiled.final[compiled.start])
+                        for start in range(0, len(s), size):
+                            scan = compiled.scan_chunk(s[start : start + size], mode)
+                            runs, found = compiled._compose(scan, runs, found)
+                        result = found if mode == "D3" else any(compiled.final[r] for r in runs)
+                        self.assertEqual(result, recognize(s), msg=f"{path} {mode} {s}")
+
+    def test_match_before_rejection(self):
+        # The run from "a" enters a final state in the second chunk, then rejects on "c"
+        compiled = FSA.from_regex("ab").compile()
+        runs, found = frozenset((compiled.start,)), False
+        for chunk in ("xa", "bc"):
+            runs, found = compiled._compose(compiled.scan_chunk(chunk, "D3"), runs, found)
+        self.assertTrue(found)
+
+    def test_settled_runs(self):
+        compiled = FSA.from_regex("ab(a|b)*").compile()
+        ends, _, _, _ = compiled.scan_chunk("ab" + "ba" * 100, "D1")
+        self.assertEqual(compiled.stops[ends[compiled.start]], 2)
+        ends, _, _, _ = compiled.scan_chunk("ab" + "ba" * 100 + "x", "D1")
+        self.assertEqual(ends[compiled.start], compiled.dead)
+
+    def test_large_automaton(self):
+        fsa = generate_fsa(300, 4, 0.7, seed=7)
+        compiled = fsa.compile()
+        for mode, recognize in (("D2", fsa.recognize_endswith), ("D3", fsa.recognize_substring)):
+            for s in generate_corpus(fsa, 20, 60, mode=mode, seed=8):
+                runs = frozenset((compiled.start,))
+                found = False
+                for start in range(0, len(s), 7):
+                    scan = compiled.scan_chunk(s[start : start + 7], mode)
+                    runs, found = compiled._compose(scan, runs, found)
+                result = found if mode == "D3" else any(compiled.final[r] for r in runs)
+                self.assertEqual(result, recognize(s), msg=mode)
+
+    def test_process_pool(self):
+        fsa = FSA.from_file("./data/4-partial")
+        data = "a" * 3000 + "b" * 3000
+        self.assertTrue(fsa.recognize_member_parallel(data, workers=2, chunk_size=1000))
+        self.assertFalse(fsa.recognize_member_parallel(data + "a", workers=2, chunk_size=1000))
+        self.assertTrue(fsa.recognize_substring_parallel(b"x" * 5000 + b"b", 2, 1000))
+        self.assertFalse(fsa.recognize_substring_parallel(b"xa" * 5000, 2, 1000))
+        # A final state entered before the last chunk does not decide endswith mode
+        self.assertFalse(fsa.compiled.recognize_parallel("ab" * 3000 + "ba", "D2", 2, 1000))
+        self.assertTrue(fsa.compiled.recognize_parallel("ba" * 3000 + "ab", "D2", 2, 1000))
+
+
+class TestMinimized(TestCase):
+    """Test DFA minimization."""
+
+    def test_complete_and_partial(self):
+        for language in range(1, 7):
+            complete = FSA.from_file(f"./data/{language}-complete").minimized()
+            partial = FSA.from_file(f"./data/{language}-partial").minimized()
+            for attr in ("states", "final_states", "start_state", "alphabet", "trans_func"):
+                self.assertEqual(getattr(complete, attr), getattr(partial, attr), msg=language)
+
+    def test_redundant_states(self):
+        # L = (ab)*, with every state duplicated and an unreachable state
+        fsa = FSA(
+            states={"p0", "p1", "q0", "q1", "u"},
+            final_states={"p0", "q0", "u"},
+            start_state="p0",
+            alphabet={"a", "b"},
+            trans_func={
+                "p0": {"a": "q1"},
+                "q1": {"b": "q0"},
+                "q0": {"a": "p1"},
+                "p1": {"b": "p0"},
+                "u": {"a": "u"},
+            },
+        )
+        minimized = fsa.minimized()
+        self.assertEqual(minimized.states, {"p0", "p1"})
+        self.assertEqual(minimized.final_states, {"p0"})
+        self.assertEqual(minimized.trans_func, {"p0": {"a": "p1"}, "p1": {"b": "p0"}})
+
+    def test_empty_language(self):
+        fsa = FSA({"s0", "s1"}, set(), "s0", {"a"}, {"s0": {"a": "s1"}, "s1": {"a": "s0"}})
+        minimized = fsa.minimized()
+        self.assertEqual(minimized.states, {"s0"})
+        self.assertEqual(minimized.trans_func, {})
+        self.assertFalse(minimized.recognize_substring("aaa"))
+
+
+class TestNFA(TestCase):
+    """Test the language of L = (a|b)*a(a|b)(a|b) with a NFA using multi-target rows and epsilon
+        moves.
+    """
+
+    def setUp(self) -> None:
+
+        self.nfa = NFA(
+            states={"s0", "s1", "s2", "s3", "s4"},
+            final_states={"s4"},
+            start_state="s0",
+            alphabet={"a", "b"},
+            trans_func={
+                "s0": {"a": {"s0", "s1"}, "b": {"s0"}},
+                "s1": {"a": {"s2"}, "b": {"s2"}},
+                "s2": {"a": {"s3"}, "b": {"s3"}},
+                "s3": {"": {"s4"}},
+            },
+        )
+
+        self.nfa_file = NFA.from_file("./data/7-nfa")
+
+        self.strings = ["".join(p) for n in range(8) for p in product("abx", repeat=n)]
+
+    def test_same(self):
+        for attr in ("states", "final_states", "start_state", "alphabet", "trans_func"):
+            self.assertEqual(getattr(self.nfa, attr), getattr(self.nfa_file, attr))
+
+    def test_recognize(self):
+        for nfa in (self.nfa, self.nfa_file, NFA.from_file("./data/7-nfa", cache_size=2)):
+            for s in self.strings:
+                self.assertEqual(nfa.recognize_member(s), bool(fullmatch("[ab]*a[ab]{2}", s)), s)
+                self.assertEqual(nfa.recognize_endswith(s), bool(search("a[ab]{2}$", s)), s)
+                self.assertEqual(nfa.recognize_substring(s), bool(search("a[ab]{2}", s)), s)
+
+    def test_cache_bounded(self):
+        nfa = NFA.from_file("./data/7-nfa", cache_size=3)
+        nfa.recognize_member("ab" * 1000 + "aab")
+        self.assertLessEqual(len(nfa._member_cache), 3)
+
+
+class TestFromRegex(TestCase):
+    """Test compiling the regexes of the languages L1 to L7 into FSA."""
+
+    # Regex of every language, and the equivalent Python regex
+    languages = [
+        ("(ab)*", "(ab)*"),
+        ("a(ba)*", "a(ba)*"),
+        ("a*b*", "a*b*"),
+        ("a*bb*", "a*bb*"),
+        ('(ab*a)|(cd*c)|("")', "(ab*a)|(cd*c)|"),
+        ("(ab*)|(cd*)", "(ab*)|(cd*)"),
+        ("(a|b)*a(a|b)(a|b)", "(a|b)*a(a|b)(a|b)"),
+        ("a+b?\\*", "a+b?\\*"),
+    ]
+
+    def test_recognize_member(self):
+        strings = ["".join(p) for n in range(7) for p in product("abcd*", repeat=n)]
+        for pattern, python_pattern in self.languages:
+            fsa = FSA.from_regex(pattern)
+            for s in strings:
+                self.assertEqual(
+                    fsa.recognize_member(s), bool(fullmatch(python_pattern, s)), msg=(pattern, s)
+                )
+
+    def test_minimal(self):
+        for language in range(1, 5):
+            pattern, _ = self.languages[language - 1]
+            fsa = FSA.from_file(f"./data/{language}-partial").minimized()
+            self.assertEqual(len(FSA.from_regex(pattern).states), len(fsa.states))
+        # Third from last symbol is an a, which needs 2 ** 3 states
+        self.assertEqual(len(FSA.from_regex("(a|b)*a(a|b)(a|b)").states), 8)
+
+    def test_cached(self):
+        self.assertIs(FSA.from_regex("(ab)*"), FSA.from_regex("(ab)*"))
+
+    def test_invalid(self):
+        for pattern in ("(a", "a)", "*", '"a', "a\\", "a|*"):
+            with self.assertRaises(ValueError, msg=pattern):
+                FSA.from_regex(pattern)
+
+
+class TestCompiledFile(TestCase):
+    """Test saving FSA in the binary format and loading them back through from_file."""
+
+    def setUp(self) -> None:
+
+        self.directory = TemporaryDirectory()
+        self.path = Path(self.directory.name)
+        for file in Path("./data/5-partial").iterdir():
+            (self.path / file.name).write_text(file.read_text())
+
+    def tearDown(self) -> None:
+
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        fsa = FSA.from_file(self.path)
+        file = fsa.save_compiled(self.path)
+        self.assertEqual(file.name, FSA.compiled_file_name)
+
+        loaded = FSA.from_file(self.path)
+        self.assertIsInstance(loaded.compiled.table, memoryview)
+        for attr in ("states", "final_states", "start_state", "alphabet", "trans_func"):
+            self.assertEqual(getattr(fsa, attr), getattr(loaded, attr), msg=attr)
+        for s in ("", "aa", "abba", "cdc", "xcddcx", "ab"):
+            self.assertEqual(loaded.recognize_member(s), fsa.recognize_member(s))
+            self.assertEqual(loaded.recognize_substring(s), fsa.recognize_substring(s))
+
+    def test_stale(self):
+        FSA.from_file(self.path).save_compiled(self.path)
+        compiled_file = self.path / FSA.compiled_file_name
+        modified = compiled_file.stat().st_mtime
+        (self.path / FSA.final_states_file_name).write_text("s1\n")
+        os.utime(self.path / FSA.final_states_file_name, (modified + 1, modified + 1))
+
+        fsa = FSA.from_file(self.path)
+        self.assertEqual(fsa.final_states, {"s1"})
+        self.assertIsNone(fsa._compiled)
+
+    def test_other_version(self):
+        fsa = FSA.from_file(self.path)
+        compiled_file = fsa.save_compiled(self.path)
+        # A file of version 1, and a truncated file, are both ignored
+        compiled_file.write_bytes(b"FSA\0\x01\0\0\0" + compiled_file.read_bytes()[8:])
+        loaded = FSA.from_file(self.path)
+        self.assertIsNone(loaded._compiled)
+        self.assertEqual(loaded.trans_func, fsa.trans_func)
+        compiled_file.write_bytes(b"FS")
+        self.assertIsNone(FSA.from_file(self.path)._compiled)
+
+    def test_pickle(self):
+        FSA.from_file(self.path).save_compiled(self.path)
+        compiled = pickle.loads(pickle.dumps(FSA.from_file(self.path).compiled))
+        self.assertTrue(compiled.recognize_member("abba"))
+
+
+class TestMainBatch(TestCase):
+    """Test the batch mode of the command line program."""
+
+    def test_results(self):
+        lines = ["ab\n", "abab\n", "aba\n", "\n", "xab"]
+        for task, expected in (
+            ("D1", "True\nTrue\nFalse\nTrue\nFalse\n"),
+            ("D2", "True\nTrue\nTrue\nTrue\nTrue\n"),
+        ):
+            for batch_size in (1, 2, 8192):
+                output = StringIO()
+                main_batch(Path("./data/1-partial"), task, lines, output, batch_size)
+                self.assertEqual(output.getvalue(), expected)
+
+    def test_crlf(self):
+        output = StringIO()
+        main_batch(Path("./data/1-partial"), "D1", ["ab\r\n", "abab\r\n", "\r\n", "aba"], output)
+        self.assertEqual(output.getvalue(), "True\nTrue\nTrue\nFalse\n")
+
+    def test_unknown_task(self):
+        with self.assertRaises(ValueError):
+            main_batch(Path("./data/1-partial"), "D4", [], StringIO())
+
+    def test_nfa(self):
+        output = StringIO()
+        main_batch(Path("./data/7-nfa"), "D1", ["aab\n", "baab\n", "abb\n", "ab\n"], output)
+        self.assertEqual(output.getvalue(), "True\nTrue\nTrue\nFalse\n")
+        with patch("sys.stdout", new_callable=StringIO) as stdout:
+            main(Path("./data/7-nfa"), "aab", "D1")
+        self.assertIn("True", stdout.getvalue())
+        with self.assertRaises(ValueError):
+            main(Path("./data/7-nfa"), "aab", "D1", profile=True)
+
+    def test_nfa_rejected_by_fsa(self):
+        with self.assertRaises(ValueError):
+            FSA.from_file("./data/7-nfa")
+        for rows in ("s0,a,s0,s1\n", "s0,EPSILON,s0\n", "s0,a,s0\ns0,a,s1\n"):
+            with TemporaryDirectory() as path:
+                write_fsa(FSA.from_file("./data/1-partial"), Path(path))
+                (Path(path) / FSA.trans_func_file_name).write_text(rows)
+                with self.assertRaises(ValueError, msg=rows):
+                    FSA.from_file(path)
+
+
+class TestServer(TestCase):
+    """Test the recognizer server."""
+
+    def setUp(self) -> None:
+
+        self.registry = load_registry(Path("./data"))
+
+    def test_registry(self):
+        self.assertEqual(len(self.registry), 13)
+        self.assertIsInstance(self.registry["1-partial"], FSA)
+        self.assertIsInstance(self.registry["7-nfa"], NFA)
+
+    def test_answer_request(self):
+        self.assertEqual(answer_request(self.registry, b"1-partial\tD1\tabab"), b"1\n")
+        self.assertEqual(answer_request(self.registry, b"2-complete\tD3\tbbb"), b"0\n")
+        self.assertEqual(answer_request(self.registry, b"7-nfa\tD2\tbbabb"), b"1\n")
+        self.assertEqual(answer_request(self.registry, b"1-partial\tD1\t"), b"1\n")
+        self.assertTrue(answer_request(self.registry, b"8-partial\tD1\tab").startswith(b"E "))
+        self.assertTrue(answer_request(self.registry, b"1-partial\tD4\tab").startswith(b"E "))
+        self.assertTrue(answer_request(self.registry, b"1-partial").startswith(b"E "))
+
+    def test_pipelined(self):
+        async def client():
+            server = await start_server(self.registry, port=0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            # Split a request across writes to exercise buffering of partial lines
+            writer.write(b"1-partial\tD1\tab\n4-partial\tD3\tx")
+            await writer.drain()
+            writer.write(b"aab\n3-partial\tD1\tba\n")
+            answers = [await reader.readline() for _ in range(3)]
+            writer.close()
+            await writer.wait_closed()
+            server.close()
+            await server.wait_closed()
+            return answers
+
+        self.assertEqual(asyncio.run(client()), [b"1\n", b"1\n", b"0\n"])
+
+    def test_request_too_long(self):
+        async def client(*writes):
+            server = await start_server(self.registry, port=0, max_request_length=32)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            for data in writes:
+                writer.write(data)
+                await writer.drain()
+                await asyncio.sleep(0.01)
+            # The server closes the connection after the error
+            answers = await reader.read()
+            writer.close()
+            await writer.wait_closed()
+            server.close()
+            await server.wait_closed()
+            return answers.split(b"\n")
+
+        # A request without a newline is cut off once it grows too long across reads
+        answers = asyncio.run(client(b"1-partial\tD1\tab\n1-partial\tD1\t", b"a" * 20))
+        self.assertEqual(answers[0], b"1")
+        self.assertTrue(answers[1].startswith(b"E "))
+        self.assertEqual(answers[2:], [b""])
+        # A complete request that is too long ends the connection too
+        answers = asyncio.run(client(b"1-partial\tD1\tab\n" + b"a" * 40 + b"\n1-partial\tD1\tab\n"))
+        self.assertEqual(answers[0], b"1")
+        self.assertTrue(answers[1].startswith(b"E "))
+        self.assertEqual(answers[2:], [b""])
+
+
+class TestFindAll(TestCase):
+    """Test finding the members of a language inside a string against a brute-force search."""
+
+    patterns = ["(ab)*", "a*bb*", '(ab*a)|(cd*c)|("")', "ab|abcd|bc", "(ab*c)|b", "a|aab"]
+
+    def leftmost_longest(self, fsa, s):
+        spans = []
+        position = 0
+        while position <= len(s):
+            for start in range(position, len(s) + 1):
+                ends = [
+                    end for end in range(start, len(s) + 1) if fsa.recognize_member(s[start:end])
+                ]
+                if ends:
+                    spans.append((start, max(ends)))
+                    break
+            else:
+                break
+            start, end = spans[-1]
+            position = end if end > start else end + 1
+        return spans
+
+    def overlapping(self, fsa, s):
+        return [
+            (start, end)
+            for end in range(len(s) + 1)
+            for start in range(end + 1)
+            if fsa.recognize_member(s[start:end])
+        ]
+
+    def test_find_all(self):
+        strings = ["".join(p) for n in range(7) for p in product("abcx", repeat=n)]
+        for pattern in self.patterns:
+            fsa = FSA.from_regex(pattern)
+            for s in strings:
+                self.assertEqual(fsa.find_all(s), self.leftmost_longest(fsa, s), msg=(pattern, s))
+                self.assertEqual(
+                    fsa.find_all(s, "overlapping"), self.overlapping(fsa, s), msg=(pattern, s)
+                )
+
+    def test_long_pending_match(self):
+        # The run from 0 stays alive to the end, so the later matches are only known at the end,
+        # and the work per symbol must not grow with the number of pending matches
+        n = 10**5
+        fsa = FSA.from_regex("(ab*c)|b")
+        self.assertEqual(fsa.find_all("a" + "b" * n), [(i, i + 1) for i in range(1, n + 1)])
+        self.assertEqual(fsa.find_all("a" + "b" * n + "c"), [(0, n + 2)])
+
+    def test_like_re(self):
+        self.assertEqual(FSA.from_regex("a*").find_all("baaa"), [(0, 0), (1, 4), (4, 4)])
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            FSA.from_regex("a").find_all("a", "shortest")
+
+
+class TestGenerate(TestCase):
+    """Test the random FSA and corpus generator."""
+
+    def test_write_fsa(self):
+        for density in (1.0, 0.3):
+            fsa = generate_fsa(200, 5, density, seed=1)
+            with TemporaryDirectory() as path:
+                write_fsa(fsa, Path(path))
+                loaded = FSA.from_file(path)
+            self.assertEqual(loaded.states, fsa.states)
+            self.assertEqual(loaded.final_states, fsa.final_states)
+            self.assertEqual(loaded.alphabet, fsa.alphabet)
+            self.assertEqual(loaded.trans_func, {s: t for s, t in fsa.trans_func.items() if t})
+
+    def test_reachable(self):
+        fsa = generate_fsa(500, 3, 0.1, seed=2)
+        reached, stack = {fsa.start_state}, [fsa.start_state]
+        while stack:
+            for next_state in fsa.trans_func[stack.pop()].values():
+                if next_state not in reached:
+                    reached.add(next_state)
+                    stack.append(next_state)
+        self.assertEqual(reached, fsa.states)
+
+    def test_corpus(self):
+        fsa = generate_fsa(100, 4, 0.8, final_ratio=0.05, seed=4)
+        for mode, recognize in (
+            ("D1", fsa.recognize_member),
+            ("D2", fsa.recognize_endswith),
+            ("D3", fsa.recognize_substring),
+        ):
+            corpus = generate_corpus(fsa, 100, 20, accept_rate=0.25, mode=mode, seed=4)
+            self.assertEqual(len(corpus), 100)
+            self.assertEqual(sum(map(recognize, corpus)), 25, msg=mode)
+
+    def test_empty_language(self):
+        fsa = FSA({"s0", "s1"}, {"s1"}, "s0", {"a"}, {"s0": {"a": "s0"}})
+        with self.assertRaises(ValueError):
+            generate_corpus(fsa, 10, 5)
+
+    def test_universal_language(self):
+        fsa = FSA({"s0"}, {"s0"}, "s0", {"a"}, {})
+        with self.assertRaises(ValueError):
+            generate_corpus(fsa, 10, 5, mode="D3")
+
+
+class TestProfile(TestCase):
+    """Test the opt-in instrumentation of the recognize methods."""
+
+    def test_results_unchanged(self):
+        fsa = FSA.from_regex("(ab*a)|(cd*c)")
+        strings = ["".join(p) for n in range(6) for p in product("abcdx", repeat=n)]
+        expected = [
+            (fsa.recognize_member(s), fsa.recognize_endswith(s), fsa.recognize_substring(s))
+            for s in strings
+        ]
+        profile = fsa.enable_profiling()
+        actual = [
+            (fsa.recognize_member(s), fsa.recognize_endswith(s), fsa.recognize_substring(s))
+            for s in strings
+        ]
+        self.assertEqual(actual, expected)
+        self.assertEqual(list(profile.calls.values()), [len(strings)] * 3)
+        self.assertIs(fsa.disable_profiling(), profile)
+        self.assertIsNone(fsa.profile)
+
+    def test_counters(self):
+        fsa = FSA.from_file("./data/1-partial")
+        profile = fsa.enable_profiling()
+        fsa.recognize_member("abba")
+        self.assertEqual(profile.lengths["D1"], 4)
+        self.assertEqual(profile.characters["D1"], 3)
+        self.assertEqual(
+            profile.transition_counts(), {("s0", "a"): 1, ("s1", "b"): 1, ("s0", "b"): 1}
+        )
+        self.assertEqual(profile.state_counts(), {"s0": 2, "s1": 1})
+        self.assertEqual(profile.dead_hits["D1"], 1)
+        # Only the runs that start after the last symbol outside of the alphabet are run
+        fsa.recognize_endswith("xxab")
+        self.assertEqual(profile.characters["D2"], 2)
+        self.assertEqual(profile.search_expansions, 2)
+        fsa.recognize_endswith("xxab")
+        self.assertEqual(profile.search_expansions, 2)
+        self.assertIn('"Σ* · L" transitions computed: 2', profile.report())
+
+    def test_runs(self):
+        fsa = FSA.from_regex("ab")
+        profile = fsa.enable_profiling()
+        self.assertTrue(fsa.recognize_endswith("aab"))
+        self.assertTrue(fsa.recognize_bytes(b"aab", "D3"))
+        start, second = fsa.start_state, fsa.trans_func[fsa.start_state]["a"]
+        for mode in ("D2", "D3"):
+            # A run starts on every symbol, and the runs that read "aa" and "b" die
+            self.assertEqual(profile.restarts[mode], 3)
+            self.assertEqual(profile.dead_hits[mode], 2)
+        self.assertEqual(
+            profile.transition_counts(),
+            {(start, "a"): 4, (start, "b"): 2, (second, "a"): 2, (second, "b"): 2},
+        )
+
+    def test_latencies(self):
+        fsa = FSA.from_regex("(ab*a)|(cd*c)")
+        profile = fsa.enable_profiling()
+        for string in ("abba", "cdc", "x"):
+            fsa.recognize_member(string)
+        self.assertEqual(len(profile.latencies["D1"]), 3)
+        self.assertAlmostEqual(sum(profile.latencies["D1"]), profile.seconds["D1"])
+        self.assertIn("p99 call", profile.report())
+
+    def test_stopped_early(self):
+        fsa = FSA.from_regex("a(b|c)*d")
+        profile = fsa.enable_profiling()
+        self.assertTrue(fsa.recognize_substring("bbbbadbbbb"))
+        self.assertTrue(fsa.recognize_bytes(b"bbbbadbbbb", "D3"))
+        self.assertEqual(profile.calls["D3"], 2)
+        self.assertEqual(profile.lengths["D3"], 20)
+        self.assertEqual(profile.characters["D3"], 12)
+
+    def test_file(self):
+        fsa = FSA.from_regex("(ab*a)|(cd*c)")
+        profile = fsa.enable_profiling()
+        with TemporaryDirectory() as path:
+            file = Path(path) / "input.txt"
+            file.write_bytes(b"abbba")
+            self.assertTrue(fsa.recognize_file(file, "D1"))
+        self.assertEqual(profile.calls["D1"], 1)
+        self.assertEqual(profile.characters["D1"], 5)
+        self.assertEqual(profile.state_counts()[fsa.start_state], 1)
+
+    def test_disabled(self):
+        fsa = FSA.from_file("./data/1-partial")
+        self.assertIsNone(fsa.profile)
+        self.assertIsNone(fsa.disable_profiling())
+
+
+class TestFSASet(TestCase):
+    """Test scanning many FSA at once through their product automaton."""
+
+    patterns = ["(ab)*", "a(ba)*", "a*b*", "a*bb*", '(ab*a)|(cd*c)|("")', "(ab*)|(cd*)", "xy"]
+
+    def test_recognize(self):
+        fsas = {pattern: FSA.from_regex(pattern) for pattern in self.patterns}
+        fsas["1-partial"] = FSA.from_file("./data/1-partial")
+        fsa_set = FSASet(fsas)
+        for n in range(6):
+            for s in map("".join, product("abcdxy", repeat=n)):
+                result = fsa_set.recognize(s)
+                for mode, method in (
+                    ("D1", "recognize_member"),
+                    ("D2", "recognize_endswith"),
+                    ("D3", "recognize_substring"),
+                ):
+                    expected = [name for name, fsa in fsas.items() if getattr(fsa, method)(s)]
+                    self.assertEqual(result[mode], expected, msg=(s, mode))
+
+    def test_lazy(self):
+        fsa_set = FSASet({pattern: FSA.from_regex(pattern) for pattern in self.patterns})
+        self.assertEqual(len(fsa_set.product_states), 1)
+        fsa_set.recognize("ab")
+        self.assertEqual(len(fsa_set.product_states), 3)
+
+    def test_long_stream(self):
+        fsas = {f"fsa-{index}": generate_fsa(30, 4, seed=index) for index in range(10)}
+        rng = Random(3)
+        string = "".join(rng.choice("abcd") for _ in range(5000))
+        fsa_set = FSASet(fsas)
+        fsa_set.product_cache_size = 5000
+        result = fsa_set.recognize(string)
+        self.assertGreater(fsa_set.product_flushes, 0)
+        self.assertLessEqual(fsa_set.product_cache_used, fsa_set.product_cache_size)
+        for mode, method in (
+            ("D1", "recognize_member"),
+            ("D2", "recognize_endswith"),
+            ("D3", "recognize_substring"),
+        ):
+            expected = [name for name, fsa in fsas.items() if getattr(fsa, method)(string)]
+            self.assertEqual(result[mode], expected, msg=mode)
+        # The set still answers right once the cache was flushed
+        self.assertEqual(fsa_set.recognize(string), result)
+
+
+class TestEquivalent(TestCase):
+    """Test the language equivalence and inclusion checks."""
+
+    patterns = ["(ab)*", "a(ba)*", "a*b*", "a*bb*", '(ab*a)|(cd*c)|("")', "(ab*)|(cd*)", "a|b"]
+
+    def test_against_brute_force(self):
+        strings = ["".join(p) for n in range(7) for p in product("abcd", repeat=n)]
+        fsas = [FSA.from_regex(pattern) for pattern in self.patterns]
+        languages = [{s for s in strings if fsa.recognize_member(s)} for fsa in fsas]
+        for (fsa, language), (other, other_language) in product(zip(fsas, languages), repeat=2):
+            self.assertEqual(fsa.equivalent(other), language == other_language)
+            self.assertEqual(fsa.included_in(other), language <= other_language)
+
+    def test_inclusion(self):
+        fsa_3 = FSA.from_file("./data/3-partial")
+        fsa_4 = FSA.from_file("./data/4-complete")
+        self.assertTrue(fsa_4.included_in(fsa_3))
+        self.assertFalse(fsa_3.included_in(fsa_4))
+        self.assertFalse(fsa_3.equivalent(fsa_4))
+
+    def test_different_alphabets(self):
+        fsa = FSA.from_regex("(ab)*")
+        wider = FSA.from_regex("(ab)*|(ab)*c(\"\")")
+        self.assertEqual(wider.alphabet, {"a", "b", "c"})
+        self.assertFalse(fsa.equivalent(wider))
+        self.assertTrue(fsa.included_in(wider))
+        same = FSA(
+            states=set(fsa.states),
+            final_states=set(fsa.final_states),
+            start_state=fsa.start_state,
+            alphabet=fsa.alphabet | {"c"},
+            trans_func=deepcopy(fsa.trans_func),
+        )
+        self.assertTrue(fsa.equivalent(same))
+        self.assertTrue(same.equivalent(fsa))
+
+
+class TestSymbolClasses(TestCase):
+    """Test the compression of the alphabet into classes of symbols sharing a column."""
+
+    def setUp(self):
+        # Every digit behaves the same, and so does every letter but "e"
+        letters = "abcdfgh"
+        trans_func = {
+            "s0": {**{d: "s1" for d in "0123456789"}, **{c: "s0" for c in letters}},
+            "s1": {**{d: "s1" for d in "0123456789"}, "e": "s2"},
+            "s2": {d: "s2" for d in "0123456789"},
+        }
+        self.fsa = FSA(
+            states={"s0", "s1", "s2"},
+            final_states={"s1", "s2"},
+            start_state="s0",
+            alphabet=set("0123456789e" + letters + "z"),
+            trans_func=trans_func,
+        )
+
+    def test_columns(self):
+        compiled = self.fsa.compile()
+        # Digits, letters, "e", and the column of "z" and the symbols outside of the alphabet
+        self.assertEqual(compiled.num_columns, 4)
+        self.assertEqual(len({compiled.symbol_index[d] for d in "0123456789"}), 1)
+        self.assertEqual(compiled.symbol_index["z"], compiled.other)
+        self.assertEqual(compiled.column_symbols[compiled.symbol_index["e"]], ["e"])
+
+    def test_recognize(self):
+        expected = lambda s: fullmatch("[a-dfgh]*[0-9]+(e[0-9]*)?", s) is not None
+        for s in map("".join, product("a5ez", repeat=5)):
+            self.assertEqual(self.fsa.recognize_member(s), expected(s), msg=s)
+        self.assertTrue(self.fsa.minimized().equivalent(self.fsa))
+
+    def test_save_compiled(self):
+        with TemporaryDirectory() as path:
+            write_fsa(self.fsa, Path(path))
+            self.fsa.save_compiled(path)
+            loaded = FSA.from_file(path)
+        self.assertIsNotNone(loaded._compiled)
+        self.assertEqual(loaded.trans_func, self.fsa.trans_func)
+        self.assertEqual(loaded.alphabet, self.fsa.alphabet)
+        self.assertEqual(loaded.compiled.num_columns, 4)
+        self.assertTrue(loaded.recognize_member("ab12e3"))
+
+
+class TestEarlyTermination(TestCase):
+    """Test the dead state and accepting sink analysis used to stop recognition early."""
+
+    def test_stops(self):
+        compiled = FSA.from_file("./data/6-complete").compiled
+        # The non-accepting sink "s" and the dead state can never accept
+        self.assertEqual(compiled.state_names, ["s", "s0", "s1", "s2"])
+        self.assertEqual(list(compiled.stops), [1, 0, 0, 0, 1])
+        universal = FSA.from_regex("a(a|b)*").compiled
+        self.assertEqual(universal.stops[universal.start], 0)
+        self.assertEqual(sorted(universal.stops), [0, 1, 2])
+
+    def test_accepting_sink(self):
+        fsa = FSA.from_regex("a(a|b)*")
+        padding = "ab" * 10_000
+        self.assertTrue(fsa.recognize_member("a" + padding))
+        self.assertFalse(fsa.recognize_member("a" + padding + "x"))
+        self.assertFalse(fsa.recognize_member("b" + padding))
+        self.assertTrue(fsa.recognize_endswith("x" + padding))
+        self.assertFalse(fsa.recognize_endswith("a" + padding + "x"))
+        self.assertFalse(fsa.recognize_endswith("b" * 100))
+        self.assertTrue(fsa.recognize_endswith("xa"))
+        self.assertTrue(fsa.recognize_endswith("xax" + padding))
+
+    def test_against_brute_force(self):
+        for pattern in ("a(a|b)*", "(ab)*", "(a|b)*c", "a*b*", "ab|ba"):
+            fsa = FSA.from_regex(pattern)
+            for s in map("".join, product("abcx", repeat=6)):
+                self.assertEqual(fsa.recognize_member(s), fullmatch(pattern, s) is not None)
+                self.assertEqual(
+                    fsa.recognize_endswith(s),
+                    any(fullmatch(pattern, s[i:]) for i in range(len(s) + 1)),
+                    msg=(pattern, s),
+                )
+
+
+class TestPrefilter(TestCase):
+    """Test the required factor prefilter of substring recognition."""
+
+    def test_required_factors(self):
+        for pattern, factors in (
+            ("abc", ["abc", "bc", "c"]),
+            ("(a|b)*c", ["c"]),
+            ("x(ab)*y", ["x", "y"]),
+            ("(0|1)(0|1)*e", ["e", "[01]"]),
+            ("(ab*a)|(cd*c)", []),
+            ('(ab)*|("")', []),
+            # Every path takes one of two edges of the column of b, and neither on its own
+            ("ab|cbd", ["b"]),
+        ):
+            self.assertEqual(FSA.from_regex(pattern).compiled.required_factors, factors)
+
+    def test_found_on_first_use(self):
+        compiled = FSA.from_regex("x(ab)*y").compile()
+        self.assertTrue(compiled.recognize_member("xaby"))
+        self.assertIsNone(compiled._required_factors)
+        self.assertTrue(compiled.recognize_substring("zxabyz"))
+        self.assertEqual(compiled._required_factors, ["x", "y"])
+        self.assertEqual(compiled._prefilter.pattern, "x")
+
+    def test_against_brute_force(self):
+        for pattern in ("ab+c", "(a|b)*c", "x(ab)*y", "a(b|c)a", "(ab*a)|(cd*c)"):
+            fsa = FSA.from_regex(pattern)
+            for s in map("".join, product("abcxy ", repeat=6)):
+                self.assertEqual(
+                    fsa.recognize_substring(s), search(pattern, s) is not None, msg=(pattern, s)
+                )
+
+    def test_segments(self):
+        fsa = FSA.from_regex("hello(a|b)*world")
+        words = ["hello", "abab", "world", "helloab", "bworld"]
+        text = " ".join(words[i % 3] for i in range(10_000))
+        self.assertFalse(fsa.recognize_substring(text))
+        self.assertTrue(fsa.recognize_substring(text + " helloabbaworld " + text))
+        self.assertTrue(fsa.recognize_substring(text + " " + words[3] + words[4]))
+
+
+class TestSharedPrefixes(TestCase):
+    """Test batch recognition sharing the prefixes of the strings."""
+
+    def test_against_single(self):
+        strings = ["".join(p) for n in range(6) for p in product("abcx", repeat=n)]
+        strings = strings[::-1] + ["", "ab", "ab"]
+        for path in ("./data/1-partial", "./data/5-complete", "./data/6-complete"):
+            fsa = FSA.from_file(path)
+            for mode, recognize in (
+                ("D1", fsa.recognize_member),
+                ("D2", fsa.recognize_endswith),
+                ("D3", fsa.recognize_substring),
+            ):
+                self.assertEqual(
+                    fsa.recognize_shared_prefixes(strings, mode),
+                    [recognize(s) for s in strings],
+                    msg=(path, mode),
+                )
+
+    def test_paths(self):
+        fsa = FSA.from_regex("/(a|b|/)*(ab)")
+        base = "/ab/ba/" * 100
+        strings = [base + "".join(p) for p in product("ab/", repeat=4)]
+        self.assertEqual(
+            fsa.recognize_shared_prefixes(strings), [fsa.recognize_member(s) for s in strings]
+        )
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            FSA.from_file("./data/1-partial").recognize_shared_prefixes(["ab"], "D4")
+
+
+class TestCompactLoader(TestCase):
+    """Test compiling very large FSA straight from their files."""
+
+    def test_against_from_file(self):
+        strings = ["".join(p) for n in range(6) for p in product("abcdx", repeat=n)]
+        for name in ("1-partial", "2-complete", "5-complete", "6-partial"):
+            fsa = FSA.from_file(f"./data/{name}")
+            compiled = CompiledFSA.from_file(f"./data/{name}")
+            for s in strings:
+                self.assertEqual(compiled.recognize_member(s), fsa.recognize_member(s))
+                self.assertEqual(compiled.recognize_endswith(s), fsa.recognize_endswith(s))
+                self.assertEqual(compiled.recognize_substring(s), fsa.recognize_substring(s))
+
+    def test_generated(self):
+        fsa = generate_fsa(300, 6, 0.5, seed=5)
+        updates = []
+        with TemporaryDirectory() as path:
+            write_fsa(fsa, Path(path))
+            compiled = CompiledFSA.from_file(path, lambda read, total: updates.append(read))
+            size = (Path(path) / FSA.trans_func_file_name).stat().st_size
+        self.assertEqual(updates, [2 * size])
+        self.assertEqual(compiled.num_columns, fsa.compiled.num_columns)
+        for s in generate_corpus(fsa, 100, 20, mode="D2", seed=6):
+            self.assertEqual(compiled.recognize_endswith(s), fsa.recognize_endswith(s))
+
+    def test_multi_target_rows(self):
+        with self.assertRaises(ValueError):
+            CompiledFSA.from_file("./data/7-nfa")
+
+    def test_repeated_rows(self):
+        fsa = FSA.from_regex("(a|b)c")
+        with TemporaryDirectory() as path:
+            write_fsa(fsa, Path(path))
+            file = Path(path) / FSA.trans_func_file_name
+            with open(file, "a") as f:
+                for symbol in "ab":
+                    next_state = fsa.trans_func[fsa.start_state][symbol]
+                    f.write(f"{fsa.start_state},{symbol},{next_state}\n")
+            updates = []
+            compiled = CompiledFSA.from_file(path, lambda read, total: updates.append(total))
+            # The repeated rows are found when filling the shared column of "a" and "b", so the
+            # file is read again to give them a column each
+            self.assertEqual(updates, [3 * file.stat().st_size])
+            self.assertNotEqual(compiled.symbol_index["a"], compiled.symbol_index["b"])
+            for s in ("ac", "bc", "abc", "c", ""):
+                self.assertEqual(compiled.recognize_member(s), fsa.recognize_member(s))
+
+            with open(file, "a") as f:
+                f.write(f"{fsa.start_state},a,{fsa.start_state}\n")
+            with self.assertRaises(ValueError):
+                CompiledFSA.from_file(path)
+
+    def test_table_typecode(self):
+        fsa = FSA.from_file("./data/1-partial")
+        compiled = CompiledFSA.from_file("./data/1-partial")
+        self.assertEqual(compiled.table.typecode, CompiledFSA.table_typecode)
+        self.assertEqual(fsa.compiled.table.typecode, CompiledFSA.table_typecode)
+
+
+class TestLoadCatalog(TestCase):
+    """Test loading every automaton directory under a directory at once."""
+
+    def test_data(self):
+        reports = {}
+        catalog = FSA.load_catalog(
+            "./data", workers=2, report=lambda name, seconds, error: reports.update({name: error})
+        )
+        names = sorted(path.name for path in Path("./data").iterdir())
+        self.assertEqual(list(catalog), names)
+        self.assertEqual(reports, dict.fromkeys(names))
+        strings = ["".join(p) for n in range(6) for p in product("abcd", repeat=n)]
+        for name in names:
+            if name == "7-nfa":
+                # A NFA is not determinized, like in load_registry
+                self.assertIsInstance(catalog[name], NFA)
+                automaton = NFA.from_file(f"./data/{name}")
+            else:
+                self.assertIsNotNone(catalog[name]._compiled)
+                automaton = FSA.from_file(f"./data/{name}")
+            for s in strings:
+                self.assertEqual(catalog[name].recognize_member(s), automaton.recognize_member(s))
+
+    def test_failures(self):
+        reports = []
+
+        def load_or_run_out_of_memory(path):
+            if path.name == "huge":
+                raise MemoryError
+            return load_automaton(path)
+
+        with TemporaryDirectory() as root:
+            for name in ("good", "huge"):
+                write_fsa(generate_fsa(20, 3, 0.5, seed=1), Path(root) / name)
+            (Path(root) / "broken").mkdir()
+            (Path(root) / "broken" / FSA.trans_func_file_name).write_text("a,b,c\n")
+            (Path(root) / "other").mkdir()
+            with patch("fsa.load_automaton", load_or_run_out_of_memory):
+                catalog = FSA.load_catalog(
+                    root, workers=1, report=lambda *outcome: reports.append(outcome)
+                )
+        self.assertEqual(list(catalog), ["good"])
+        outcomes = [(name, error is None) for name, _, error in reports]
+        self.assertEqual(outcomes, [("broken", False), ("good", True), ("huge", False)])
+        self.assertIsInstance(reports[2][2], MemoryError)
+        self.assertGreater(reports[1][1], 0)
+
+    @skipIf(get_start_method() != "fork", "The workers must inherit the patched loader")
+    def test_worker_dies(self):
+        reports = []
+
+        def load_or_die(path):
+            if path.name == "dies":
+                os._exit(1)
+            return load_automaton(path)
+
+        names = [f"good-{index}" for index in range(9)]
+        with TemporaryDirectory() as root:
+            for index, name in enumerate(names + ["dies"]):
+                write_fsa(generate_fsa(20, 3, 0.5, seed=index), Path(root) / name)
+            with patch("fsa.load_automaton", load_or_die):
+                catalog = FSA.load_catalog(
+                    root, workers=3, report=lambda *outcome: reports.append(outcome)
+                )
+        self.assertEqual(list(catalog), names)
+        failures = [(name, type(error)) for name, _, error in reports if error is not None]
+        self.assertEqual(failures, [("dies", BrokenProcessPool)])